@@ -2,6 +2,7 @@
 
 import os
 from agentic_toolset.utils.display import display_console
+from agentic_toolset.utils.tracing import span
 
 class ArchitectAgent:
     def __init__(self):
@@ -44,7 +45,7 @@ class ArchitectAgent:
 
     def _create_file(self, path, content):
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w") as f:
+        with span("write file", "file", path=path), open(path, "w") as f:
             f.write(content + "\n")
         display_console(f"Created file: {path}", "Architect", "green")
         return path
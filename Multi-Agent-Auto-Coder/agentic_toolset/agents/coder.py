@@ -1,6 +1,8 @@
 # agents/coder.py
 
 from agentic_toolset.utils.display import display_console
+from agentic_toolset.core.llm_client import LLMError
+from agentic_toolset.utils.llm import chat_text, code_blocks_complete
 from agentic_toolset.config import CODER_MODEL
 
 class CoderAgent:
@@ -9,16 +11,22 @@ class CoderAgent:
         self.coder_model = CODER_MODEL
         self.coder_log = []
 
-    def generate_code(self, prompt):
+    def generate_code(self, prompt, files=1, options=None, title="Generated Code", cancelled=None):
+        """``files`` is how many code blocks to wait for before the stream is cut short.
+
+        ``options`` (e.g. seed and temperature) go to the model; setting the
+        ``cancelled`` event stops a streamed generation early.
+        """
         try:
-            response = self.client.chat(
+            response_text = chat_text(
+                self.client,
                 model=self.coder_model,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": prompt}],
+                title=title, color="cyan", agent="coder",
+                stop_when=code_blocks_complete(files), cancelled=cancelled, options=options
             )
-            response_text = response['message']['content']
             self.coder_log.append({"prompt": prompt, "response": response_text})
-            display_console(response_text, "Generated Code", "cyan")
             return response_text
-        except Exception as e:
+        except LLMError as e:
             display_console(f"Error in Code Generation call: {e}", "Error", "red")
-            return "Code generation encountered an error."
+            raise
@@ -1,6 +1,8 @@
 # agents/consultant.py
 
 from agentic_toolset.utils.display import display_console
+from agentic_toolset.core.llm_client import LLMError
+from agentic_toolset.utils.llm import chat_text
 from agentic_toolset.config import CONSULTANT_MODEL
 
 class ConsultantAgent:
@@ -11,14 +13,14 @@ class ConsultantAgent:
 
     def provide_advice(self, prompt):
         try:
-            response = self.client.chat(
+            response_text = chat_text(
+                self.client,
                 model=self.consultant_model,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": prompt}],
+                title="Consultant Advice", color="green", agent="consultant"
             )
-            response_text = response['message']['content']
             self.consultant_log.append({"prompt": prompt, "response": response_text})
-            display_console(response_text, "Consultant Advice", "green")
             return response_text
-        except Exception as e:
+        except LLMError as e:
             display_console(f"Error in Consultant call: {e}", "Error", "red")
-            return "Consultant encountered an error."
+            raise
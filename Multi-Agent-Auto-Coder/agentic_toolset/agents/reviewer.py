@@ -1,32 +1,75 @@
 # agents/reviewer.py
 
+import json
+
 from agentic_toolset.utils.display import display_console
-from agentic_toolset.config import REFINER_MODEL, BUGFIXER_MODEL
+from agentic_toolset.core.llm_client import LLMError
+from agentic_toolset.utils.llm import chat_text, code_block_complete, code_blocks_complete
+from agentic_toolset.config import REFINER_MODEL, BUGFIXER_MODEL, REVIEW_JSON_VERDICTS
+
+APPROVAL_PHRASES = ("looks good", "no issues", "well written")
+# Structured verdict requested through Ollama's ``format`` parameter
+REVIEW_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "approved": {"type": "boolean"},
+        "issues": {"type": "array", "items": {"type": "string"}},
+        "summary": {"type": "string"},
+    },
+    "required": ["approved", "issues", "summary"],
+}
+
+
+def parse_review(review_text):
+    """The review's JSON verdict as a dict, or None for a free-text review."""
+    try:
+        verdict = json.loads(review_text)
+    except (TypeError, ValueError):
+        return None
+    if isinstance(verdict, dict) and isinstance(verdict.get("approved"), bool):
+        return verdict
+    return None
+
+
+def review_approves(review_text):
+    """True if a review approves the code; free-text (possibly partial) reviews are matched on phrases."""
+    verdict = parse_review(review_text)
+    if verdict is not None:
+        return verdict["approved"]
+    return any(k in review_text.lower() for k in APPROVAL_PHRASES)
 
 class CodeReviewerAgent:
-    def __init__(self, client):
+    def __init__(self, client, memory=None):
         self.client = client
+        self.memory = memory  # Optional SolutionMemory with past error fixes
         self.reviewer_model = REFINER_MODEL
         self.bugfixer_model = BUGFIXER_MODEL
+        self.json_verdicts = REVIEW_JSON_VERDICTS
 
-    def review_code(self, code):
-        prompt = f"""You are a senior code reviewer. Analyze the following Python code for correctness, quality, and bugs. Respond with a short summary of any issues or confirm it looks good.
+    def review_code(self, code, objective=None):
+        if self.json_verdicts:
+            answer = ('Respond with JSON: "approved" is true only if the code is correct and complete, '
+                      '"issues" lists each problem, and "summary" is one sentence.')
+        else:
+            answer = "Respond with a short summary of any issues or confirm it looks good."
+        goal = f" The code must accomplish this objective: {objective}" if objective else ""
+        prompt = f"""You are a senior code reviewer. Analyze the following Python code for correctness, quality, and bugs.{goal} {answer}
 
 # --- CODE START ---
 {code}
 # --- CODE END ---
 """
         try:
-            response = self.client.chat(
+            return chat_text(
+                self.client,
                 model=self.reviewer_model,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": prompt}],
+                title="Code Review Result", color="magenta", agent="reviewer",
+                format=REVIEW_SCHEMA if self.json_verdicts else None
             )
-            response_text = response['message']['content']
-            display_console(response_text, "Code Review Result", "magenta")
-            return response_text
-        except Exception as e:
+        except LLMError as e:
             display_console(f"Error in Code Review: {e}", "Error", "red")
-            return "Code review encountered an error."
+            raise
 
     def fix_bugs(self, code):
         prompt = f"""You are a Python bug fixer. Analyze and fix any issues in this code. Return only the corrected code.
@@ -36,20 +79,32 @@ class CodeReviewerAgent:
 # --- CODE END ---
 """
         try:
-            response = self.client.chat(
+            return chat_text(
+                self.client,
                 model=self.bugfixer_model,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": prompt}],
+                title="Fixed Code Output", color="red", agent="bugfixer",
+                stop_when=code_block_complete
             )
-            response_text = response['message']['content']
-            display_console(response_text, "Fixed Code Output", "red")
-            return response_text
-        except Exception as e:
+        except LLMError as e:
             display_console(f"Error in Code Fixing: {e}", "Error", "red")
-            return "Bug fixing encountered an error."
-
-    def fix_from_error_log(self, code, stderr):
-        prompt = f"""You are a Python bug fixer. The following Python script fails to run due to the error shown below. Fix the code so it executes correctly.
+            raise
 
+    def fix_from_error_log(self, code, stderr, usage=None, files=1):
+        """Asks for ``code`` fixed so that ``stderr`` goes away; ``files`` is how many files ``code`` holds."""
+        if files > 1:
+            subject = "project"
+            answer = ("Return every file, fixed or not, as its own fenced code block with the file's relative path "
+                      "as a comment on its first line. No explanation.")
+        else:
+            subject = "script"
+            answer = "Return only the fixed code, no explanation."
+        examples = self.memory.fix_examples(stderr) if self.memory else ""
+        if examples:
+            display_console(examples[:500], "Similar Past Fixes", "blue")
+            examples = f"\n# --- SIMILAR ERRORS FIXED BEFORE ---\n{examples}\n"
+        prompt = f"""You are a Python bug fixer. The following Python {subject} fails to run due to the error shown below. Fix the code so it executes correctly.
+{examples}
 # --- ORIGINAL CODE ---
 {code}
 
@@ -57,16 +112,17 @@ class CodeReviewerAgent:
 {stderr}
 
 # --- END ---
-Return only the fixed code, no explanation.
+{answer}
 """
         try:
-            response = self.client.chat(
+            return chat_text(
+                self.client,
                 model=self.bugfixer_model,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": prompt}],
+                title="Fixed from Error Log", color="red", agent="bugfixer",
+                stop_when=code_blocks_complete(files),
+                usage=usage
             )
-            response_text = response['message']['content']
-            display_console(response_text, "Fixed from Error Log", "red")
-            return response_text
-        except Exception as e:
+        except LLMError as e:
             display_console(f"Error in Traceback-Based Fixing: {e}", "Error", "red")
-            return "Bug fix from traceback failed."
+            raise
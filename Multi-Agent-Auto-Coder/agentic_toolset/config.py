@@ -10,3 +10,117 @@ CONSULTANT_MODEL = os.getenv('CONSULTANT_MODEL', 'llama3.1:latest')
 BUGFIXER_MODEL = os.getenv('BUGFIXER_MODEL', 'llama3.1:latest')
 CODER_MODEL = os.getenv('CODER_MODEL', 'llama3.1:latest')
 OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://localhost:11434') #Change to your Ollama server IP
+
+# Stream LLM tokens to the display as they are generated
+STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', 'true').lower() in ('1', 'true', 'yes')
+
+# Display pipeline settings
+DISPLAY_MODE = os.getenv('DISPLAY_MODE', 'rich')  # rich, plain, json or silent
+DISPLAY_DELAY = float(os.getenv('DISPLAY_DELAY', '0'))  # Seconds the writer pauses after each panel
+DISPLAY_QUEUE_SIZE = int(os.getenv('DISPLAY_QUEUE_SIZE', '1000'))
+HEADLESS = os.getenv('HEADLESS', os.getenv('CI', '')).lower() in ('1', 'true', 'yes')
+
+# LLM response cache
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.join(os.path.expanduser('~'), '.cache', 'agentic_toolset', 'llm_cache.sqlite3'))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', '256'))
+LLM_CACHE_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600)))  # Seconds, 0 disables expiry
+LLM_CACHE_EXCLUDE = [a.strip() for a in os.getenv('LLM_CACHE_EXCLUDE', '').split(',') if a.strip()]  # e.g. "coder,consultant"
+
+# Concurrent requests allowed per model when agent steps run in parallel
+MODEL_CONCURRENCY_DEFAULT = int(os.getenv('MODEL_CONCURRENCY_DEFAULT', '1'))
+MODEL_CONCURRENCY = {  # e.g. "llama3.1:latest=2,codestral=1"
+    name.strip(): int(limit)
+    for name, _, limit in (
+        item.partition('=') for item in os.getenv('MODEL_CONCURRENCY', '').split(',') if '=' in item
+    )
+}
+
+# Batch mode limits
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '4'))  # Objectives processed at the same time
+BATCH_MAX_LLM_REQUESTS = int(os.getenv('BATCH_MAX_LLM_REQUESTS', '4'))  # In-flight chat requests across all runs
+BATCH_MAX_EXECUTIONS = int(os.getenv('BATCH_MAX_EXECUTIONS', '2'))  # Generated scripts running at the same time
+
+# Pool of reusable venvs and the local wheel cache used to fill them
+VENV_POOL_ENABLED = os.getenv('VENV_POOL_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+VENV_POOL_DIR = os.getenv('VENV_POOL_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'agentic_toolset', 'venv_pool'))
+VENV_POOL_MAX_IDLE = int(os.getenv('VENV_POOL_MAX_IDLE', '4'))  # Idle envs kept per dependency set
+WHEEL_CACHE_DIR = os.getenv('WHEEL_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'agentic_toolset', 'wheels'))
+
+# Limits for running generated scripts
+SANDBOX_TIMEOUT = float(os.getenv('SANDBOX_TIMEOUT', '60'))  # Wall-clock seconds
+SANDBOX_CPU_TIME = int(os.getenv('SANDBOX_CPU_TIME', '60'))  # CPU seconds
+SANDBOX_MEMORY_MB = int(os.getenv('SANDBOX_MEMORY_MB', '1024'))  # Address-space limit
+SANDBOX_MAX_OUTPUT = int(os.getenv('SANDBOX_MAX_OUTPUT', str(256 * 1024)))  # Bytes of stdout+stderr kept from the start
+OUTPUT_TAIL_BYTES = int(os.getenv('OUTPUT_TAIL_BYTES', str(32 * 1024)))  # Bytes per stream kept from the end once the head is full
+TRACEBACK_MAX_FRAMES = int(os.getenv('TRACEBACK_MAX_FRAMES', '8'))  # Project frames of a traceback sent to the bug fixer
+SANDBOX_PRELOAD = [m.strip() for m in os.getenv('SANDBOX_PRELOAD', '').split(',') if m.strip()]  # Modules the warm worker imports up front
+
+# Budgets for the execute-and-fix loop
+FIX_MAX_ATTEMPTS = int(os.getenv('FIX_MAX_ATTEMPTS', '3'))  # Fix rounds after the first run
+FIX_TOKEN_BUDGET = int(os.getenv('FIX_TOKEN_BUDGET', '20000'))  # Prompt + completion tokens across fix calls
+FIX_TIME_BUDGET = float(os.getenv('FIX_TIME_BUDGET', '300'))  # Wall-clock seconds for the whole loop
+
+# Orchestrator context window
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '3000'))  # Tokens of sub-task history per prompt
+CONTEXT_SUMMARY_TOKENS = int(os.getenv('CONTEXT_SUMMARY_TOKENS', '800'))  # Share of the budget for older results
+CONTEXT_SUMMARY_MODEL = os.getenv('CONTEXT_SUMMARY_MODEL', '')  # Cheap model for summaries; empty uses extractive compression
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '30m')  # How long the server keeps a model loaded between calls
+
+# LLM client pool: requests are spread across these Ollama servers
+OLLAMA_HOSTS = [h.strip() for h in os.getenv('OLLAMA_HOSTS', OLLAMA_HOST).split(',') if h.strip()]  # e.g. "http://gpu1:11434,http://gpu2:11434"
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '5'))  # Seconds to open a connection before failing over
+LLM_READ_TIMEOUT = float(os.getenv('LLM_READ_TIMEOUT', '600'))  # Seconds to wait for the next response bytes
+LLM_POOL_CONNECTIONS = int(os.getenv('LLM_POOL_CONNECTIONS', '8'))  # Keep-alive connections kept per host
+LLM_HOST_PARALLEL = int(os.getenv('LLM_HOST_PARALLEL', '2'))  # In-flight requests per host before others are preferred
+LLM_RETRIES = int(os.getenv('LLM_RETRIES', '3'))  # Retries after the first attempt
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', '0.5'))  # Seconds; doubles per retry, with jitter
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', '10'))
+LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', '3'))  # Consecutive failures that take a host out
+LLM_BREAKER_RESET = float(os.getenv('LLM_BREAKER_RESET', '30'))  # Seconds before a failed host is tried again
+LLM_MODEL_REFRESH = float(os.getenv('LLM_MODEL_REFRESH', '15'))  # Seconds between checks of each host's loaded models
+
+# Model residency scheduling: group requests by model to avoid swapping models in and out of memory
+MODEL_SCHEDULER_ENABLED = os.getenv('MODEL_SCHEDULER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+MODEL_RESIDENT_LIMIT = int(os.getenv('MODEL_RESIDENT_LIMIT', '1'))  # Models the server(s) can hold loaded at once
+MODEL_SCHEDULER_MAX_BATCH = int(os.getenv('MODEL_SCHEDULER_MAX_BATCH', '8'))  # Requests for a loaded model admitted while others wait
+MODEL_SCHEDULER_MAX_WAIT = float(os.getenv('MODEL_SCHEDULER_MAX_WAIT', '30'))  # Seconds a request can wait before forcing a swap
+MODEL_IDLE_KEEP_ALIVE = os.getenv('MODEL_IDLE_KEEP_ALIVE', '1m')  # keep_alive for models outside the working set
+
+# Static checks run before a generated project is executed
+STATIC_GATE_ENABLED = os.getenv('STATIC_GATE_ENABLED', 'true').lower() in ('1', 'true', 'yes')  # Compile and undefined-name check
+STATIC_GATE_INSTALL = os.getenv('STATIC_GATE_INSTALL', 'true').lower() in ('1', 'true', 'yes')  # Install third-party imports first
+
+# Run checkpoints: state saved under Projects/<name>/.state after every orchestrator iteration
+CHECKPOINT_ENABLED = os.getenv('CHECKPOINT_ENABLED', 'true').lower() in ('1', 'true', 'yes')  # Needed for --resume
+
+# Speculative code generation: several coder candidates per sub-task, the first that runs cleanly wins
+SPECULATIVE_CANDIDATES = int(os.getenv('SPECULATIVE_CANDIDATES', '1'))  # 1 disables speculation
+SPECULATIVE_TEMPERATURES = [float(t) for t in os.getenv('SPECULATIVE_TEMPERATURES', '0.2,0.6,0.9').split(',') if t.strip()]  # Cycled over candidates
+SPECULATIVE_SEED = int(os.getenv('SPECULATIVE_SEED', '0'))  # Candidate i samples with seed SPECULATIVE_SEED + i
+
+# Local fast paths that skip LLM round-trips for decisions that can be made without a model
+FAST_PATH_ENABLED = os.getenv('FAST_PATH_ENABLED', 'true').lower() in ('1', 'true', 'yes')  # Slug project names, pre-check reviews
+REVIEW_JSON_VERDICTS = os.getenv('REVIEW_JSON_VERDICTS', 'true').lower() in ('1', 'true', 'yes')  # Reviewer answers via a JSON schema
+ROUTER_EMBED_MODEL = os.getenv('ROUTER_EMBED_MODEL', '')  # e.g. "nomic-embed-text"; breaks keyword ties by similarity
+ROUTER_LLM_FALLBACK = os.getenv('ROUTER_LLM_FALLBACK', 'true').lower() in ('1', 'true', 'yes')  # Ask the orchestrator model when still unsure
+
+# Daemon mode (main.py --serve): a local job-queue API with warm clients and venvs
+DAEMON_HOST = os.getenv('DAEMON_HOST', '127.0.0.1')
+DAEMON_PORT = int(os.getenv('DAEMON_PORT', '8765'))
+DAEMON_WORKERS = int(os.getenv('DAEMON_WORKERS', '4'))  # Jobs running at the same time
+DAEMON_CLIENT_CONCURRENCY = int(os.getenv('DAEMON_CLIENT_CONCURRENCY', '2'))  # Running jobs per client id
+DAEMON_MAX_QUEUE = int(os.getenv('DAEMON_MAX_QUEUE', '100'))  # Queued jobs before submissions are refused
+DAEMON_EVENT_HISTORY = int(os.getenv('DAEMON_EVENT_HISTORY', '2000'))  # Progress events kept per job
+DAEMON_PREWARM = int(os.getenv('DAEMON_PREWARM', '2'))  # Pooled venvs built at start-up
+
+# Semantic memory of past solutions and fixes
+MEMORY_ENABLED = os.getenv('MEMORY_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+MEMORY_EMBED_MODEL = os.getenv('MEMORY_EMBED_MODEL', 'nomic-embed-text')  # Ollama embedding model
+MEMORY_DIR = os.getenv('MEMORY_DIR', os.path.join('Projects', '.memory'))
+MEMORY_EXAMPLES = int(os.getenv('MEMORY_EXAMPLES', '2'))  # Past solutions/fixes added to a prompt
+MEMORY_MIN_SIMILARITY = float(os.getenv('MEMORY_MIN_SIMILARITY', '0.75'))  # Cosine similarity to count as related
+MEMORY_REUSE_SIMILARITY = float(os.getenv('MEMORY_REUSE_SIMILARITY', '0.97'))  # Reuse candidate; reviewed unless the text matches
+MEMORY_ANN_THRESHOLD = int(os.getenv('MEMORY_ANN_THRESHOLD', '4096'))  # Entries scanned exactly before LSH kicks in
+MEMORY_EXAMPLE_CHARS = int(os.getenv('MEMORY_EXAMPLE_CHARS', '3000'))  # Per example in a prompt
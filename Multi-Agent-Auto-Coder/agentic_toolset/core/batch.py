@@ -0,0 +1,189 @@
+# core/batch.py
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agentic_toolset.config import BATCH_WORKERS, BATCH_MAX_LLM_REQUESTS, BATCH_MAX_EXECUTIONS
+from agentic_toolset.core.project_manager import build_project_manager
+from agentic_toolset.core.venv_manager import VenvManagerAgent
+from agentic_toolset.utils.display import display_console
+
+
+class BoundedClient:
+    """Limits the number of in-flight chat requests on a shared client.
+
+    A streamed request holds its slot until the stream is exhausted or closed.
+    """
+
+    def __init__(self, client, slots):
+        self.client = client
+        self.slots = slots
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def chat(self, *args, stream=False, **kwargs):
+        if not stream:
+            with self.slots:
+                return self.client.chat(*args, **kwargs)
+        self.slots.acquire()
+        try:
+            chunks = self.client.chat(*args, stream=True, **kwargs)
+        except BaseException:
+            self.slots.release()
+            raise
+        return SlotStream(chunks, self.slots)
+
+
+class SlotStream:
+    """A streamed response that gives its slot back once exhausted or closed."""
+
+    def __init__(self, chunks, slots):
+        self.chunks = chunks
+        self.slots = slots
+        self.released = False
+
+    def __iter__(self):
+        try:
+            yield from self.chunks
+        finally:
+            self.close()
+
+    def complete(self):
+        # Lets a caching client underneath store an answer that was cut short on purpose
+        if hasattr(self.chunks, "complete"):
+            self.chunks.complete()
+
+    def close(self):
+        if self.released:
+            return
+        self.released = True
+        if hasattr(self.chunks, "close"):
+            self.chunks.close()
+        self.slots.release()
+
+
+class BoundedVenvManager:
+    """Limits how many generated scripts run at the same time across runs."""
+
+    def __init__(self, venv_manager, slots):
+        self.venv_manager = venv_manager
+        self.slots = slots
+
+    def __getattr__(self, name):
+        return getattr(self.venv_manager, name)
+
+    def run_script(self, *args, **kwargs):
+        with self.slots:
+            return self.venv_manager.run_script(*args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        with self.slots:
+            return self.venv_manager.execute(*args, **kwargs)
+
+    def execution_slot(self):
+        return self.slots
+
+
+def load_objectives(path):
+    """Reads objectives from a JSON lines file.
+
+    Each line is either a JSON string or an object with an ``objective`` key
+    and optional ``id`` and ``dry_run`` keys. Blank lines are skipped.
+    """
+    jobs = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"objective": record}
+            if not record.get("objective"):
+                raise ValueError(f"{path}:{line_number}: missing 'objective'")
+            record.setdefault("id", f"{len(jobs) + 1:04d}")
+            jobs.append(record)
+    return jobs
+
+
+class BatchScheduler:
+    """Runs many ProjectManager pipelines at once from a list of objectives.
+
+    Every run gets its own agents, output directory and venv, while in-flight
+    LLM requests and script executions are bounded across all runs. One JSON
+    line with the outcome and timings is written per objective.
+    """
+
+    def __init__(self, client_for, output_root, results_path, workers=BATCH_WORKERS,
+                 max_llm_requests=BATCH_MAX_LLM_REQUESTS, max_executions=BATCH_MAX_EXECUTIONS,
+                 dry_run=False, cleanup=True, venv_pool=None):
+        self.client_for = client_for
+        self.output_root = output_root
+        self.results_path = results_path
+        self.workers = workers
+        self.dry_run = dry_run
+        self.cleanup = cleanup
+        self.venv_pool = venv_pool
+        self.llm_slots = threading.BoundedSemaphore(max_llm_requests)
+        self.execution_slots = threading.BoundedSemaphore(max_executions)
+        self._results_lock = threading.Lock()
+
+    def _bounded_client_for(self, agent_name):
+        return BoundedClient(self.client_for(agent_name), self.llm_slots)
+
+    def run_one(self, job):
+        run_dir = os.path.join(self.output_root, str(job["id"]))
+        os.makedirs(run_dir, exist_ok=True)
+        venv_manager = VenvManagerAgent(venv_path=os.path.join(run_dir, "project_venv"), pool=self.venv_pool)
+        project_manager = build_project_manager(
+            self._bounded_client_for,
+            BoundedVenvManager(venv_manager, self.execution_slots),
+            projects_root=run_dir
+        )
+
+        result = {"id": job["id"], "objective": job["objective"], "run_dir": run_dir}
+        started = time.time()
+        dry_run = job.get("dry_run", self.dry_run)
+        try:
+            output = project_manager.manage_task(job["objective"], dry_run=dry_run)
+            # None means the pipeline finished but the code never ran cleanly
+            result.update(status="ok" if output is not None or dry_run else "failed", output=output)
+        except Exception as e:
+            result.update(status="error", error=str(e))
+        finally:
+            if self.cleanup:
+                venv_manager.cleanup()
+
+        result.update(
+            output_dir=project_manager.output_dir,
+            started=started,
+            duration=round(time.time() - started, 3),
+            iterations=len(project_manager.task_log),
+        )
+        self._write_result(result)
+        return result
+
+    def _write_result(self, result):
+        with self._results_lock:
+            with open(self.results_path, "a") as f:
+                f.write(json.dumps(result, default=str) + "\n")
+
+    def run(self, jobs):
+        display_console(
+            f"Running {len(jobs)} objectives with {self.workers} workers.\nResults: {self.results_path}",
+            "Batch", "blue"
+        )
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(self.run_one, jobs))
+
+        failed = sum(1 for r in results if r["status"] != "ok")
+        display_console(
+            f"Completed {len(results)} objectives in {time.time() - started:.1f}s ({failed} failed).",
+            "Batch", "red" if failed else "green"
+        )
+        return results
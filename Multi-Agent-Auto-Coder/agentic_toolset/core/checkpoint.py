@@ -0,0 +1,81 @@
+# core/checkpoint.py
+
+import json
+import os
+import time
+
+from agentic_toolset.core.project_writer import atomic_write
+from agentic_toolset.utils.display import display_console
+
+STATE_DIR = ".state"
+CHECKPOINT_FILE = "checkpoint.json"
+CHECKPOINT_VERSION = 1
+# Statuses a run can be resumed from
+RESUMABLE = ("running", "failed")
+
+
+def venv_fingerprint(venv_manager):
+    """What a resumed run needs to rebuild an equivalent venv."""
+    return {
+        "path": venv_manager.venv_path,
+        "python": venv_manager.python_executable,
+        "pooled": venv_manager.pool is not None,
+        "distributions": venv_manager.resolver.distributions(),
+    }
+
+
+class CheckpointStore:
+    """Saves and loads the state of one run under ``<project>/.state``.
+
+    Each save atomically replaces ``checkpoint.json``, so an interrupted
+    run always leaves the last complete checkpoint behind.
+    """
+
+    def __init__(self, project_dir):
+        self.project_dir = project_dir
+        self.path = os.path.join(project_dir, STATE_DIR, CHECKPOINT_FILE)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def save(self, state):
+        state = dict(state, version=CHECKPOINT_VERSION, updated_at=time.time())
+        # Sub-task results are usually text, but anything else is stored as its repr
+        atomic_write(self.path, json.dumps(state, indent=2, default=str))
+
+    def load(self):
+        """Returns the saved state, or None when there is no readable checkpoint."""
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("version") != CHECKPOINT_VERSION:
+            display_console(f"Ignoring checkpoint with unknown version: {self.path}", "Checkpoint", "yellow")
+            return None
+        # The project may have been moved since the checkpoint was written
+        state["output_dir"] = self.project_dir
+        return state
+
+
+def find_checkpoint(target="", projects_root="Projects"):
+    """Finds the run to resume.
+
+    ``target`` may be a project directory or a project name under
+    ``projects_root``; when empty, the most recently updated resumable run
+    is used. Returns a CheckpointStore, or None.
+    """
+    if target:
+        for project_dir in (target, os.path.join(projects_root, target)):
+            store = CheckpointStore(project_dir)
+            if store.exists():
+                return store
+        return None
+
+    candidates = []
+    for name in os.listdir(projects_root) if os.path.isdir(projects_root) else ():
+        store = CheckpointStore(os.path.join(projects_root, name))
+        state = store.load() if store.exists() else None
+        if state and state.get("status") in RESUMABLE:
+            candidates.append((state.get("updated_at", 0), store))
+    return max(candidates, key=lambda c: c[0])[1] if candidates else None
@@ -0,0 +1,112 @@
+# core/context_window.py
+
+import hashlib
+import re
+
+from agentic_toolset.config import CONTEXT_TOKEN_BUDGET, CONTEXT_SUMMARY_TOKENS
+from agentic_toolset.utils.llm import estimate_tokens
+
+# Lines worth keeping when compressing a result without a model
+_SALIENT_LINE = re.compile(r"^\s*(def |class |import |from |#{1,3} |\d+\.|- |\* )|error|exception|fail", re.IGNORECASE)
+
+
+def extractive_summary(text, max_chars=300):
+    """Keeps the first line plus structurally salient lines, up to ``max_chars``."""
+    lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+    if not lines:
+        return ""
+    kept = [lines[0]] + [line for line in lines[1:] if _SALIENT_LINE.search(line)]
+    summary = " | ".join(line.strip() for line in kept)
+    return summary if len(summary) <= max_chars else summary[:max_chars - 3] + "..."
+
+
+class ContextWindow:
+    """Token-budgeted history of sub-task results for the orchestrator prompt.
+
+    The newest results are kept verbatim while they fit in the budget. Older
+    results are folded one at a time into a running summary, using
+    ``summarizer(text)`` (e.g. a cheap model) or extractive compression when
+    no summarizer is given. Results whose content was already seen are
+    dropped.
+    """
+
+    def __init__(self, token_budget=CONTEXT_TOKEN_BUDGET, summary_tokens=CONTEXT_SUMMARY_TOKENS, summarizer=None):
+        self.token_budget = token_budget
+        self.summary_tokens = min(summary_tokens, token_budget // 2)
+        self.summarizer = summarizer
+        self.recent = []
+        self.summary_lines = []
+        self.duplicates = 0
+        self._seen = set()
+
+    @staticmethod
+    def _fingerprint(text):
+        normalized = re.sub(r"\s+", " ", text).strip().lower()
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+    def add(self, result):
+        text = "" if result is None else str(result)
+        fingerprint = self._fingerprint(text)
+        if not text.strip() or fingerprint in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(fingerprint)
+        self.recent.append(text)
+        self._fit()
+        return True
+
+    def _summarize(self, text):
+        if self.summarizer is not None:
+            try:
+                summary = self.summarizer(text)
+                if summary and summary.strip():
+                    return " ".join(summary.split())
+            except Exception:
+                pass
+        return extractive_summary(text)
+
+    def _fit(self):
+        recent_budget = self.token_budget - self.summary_tokens
+        # Always keep the newest result, trimmed if it alone exceeds the budget
+        while len(self.recent) > 1 and sum(estimate_tokens(t) for t in self.recent) > recent_budget:
+            line = self._summarize(self.recent.pop(0))
+            if line and line not in self.summary_lines:
+                self.summary_lines.append(line)
+        if self.recent and estimate_tokens(self.recent[0]) > recent_budget:
+            self.recent[0] = self.recent[0][:recent_budget * 4]
+
+        # Drop the oldest summary lines once the summary is over its budget
+        while len(self.summary_lines) > 1 and estimate_tokens("\n".join(self.summary_lines)) > self.summary_tokens:
+            self.summary_lines.pop(0)
+
+    def state(self):
+        """JSON-serializable contents, for checkpoints."""
+        return {
+            "recent": list(self.recent),
+            "summary_lines": list(self.summary_lines),
+            "duplicates": self.duplicates,
+            "seen": sorted(self._seen),
+        }
+
+    def restore(self, state):
+        self.recent = list(state.get("recent", []))
+        self.summary_lines = list(state.get("summary_lines", []))
+        self.duplicates = state.get("duplicates", 0)
+        self._seen = set(state.get("seen", []))
+        return self
+
+    def __len__(self):
+        return len(self.summary_lines) + len(self.recent)
+
+    @property
+    def summary(self):
+        return "\n".join(f"- {line}" for line in self.summary_lines)
+
+    def render(self):
+        parts = []
+        if self.summary_lines:
+            parts.append(f"Summary of earlier sub-tasks:\n{self.summary}")
+        if self.recent:
+            recent = "\n\n".join(f"[{i + 1}] {text}" for i, text in enumerate(self.recent))
+            parts.append(f"Most recent sub-task results:\n{recent}")
+        return "\n\n".join(parts) or "None yet."
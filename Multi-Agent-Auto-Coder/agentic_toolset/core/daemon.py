@@ -0,0 +1,422 @@
+# core/daemon.py
+
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from urllib.parse import urlparse, parse_qs
+
+from agentic_toolset.config import (
+    DAEMON_WORKERS, DAEMON_CLIENT_CONCURRENCY, DAEMON_MAX_QUEUE, DAEMON_EVENT_HISTORY
+)
+from agentic_toolset.core.batch import BatchScheduler
+from agentic_toolset.utils.display import display_console, display_listener
+
+FINISHED = ("ok", "failed", "error", "cancelled")
+METRICS_WINDOW = 300  # Seconds of finished jobs behind the throughput and latency figures
+MAX_FINISHED_JOBS = 1000  # Finished jobs kept for GET /jobs
+
+
+class QueueFull(Exception):
+    """The daemon is refusing new jobs: its queue is full or it is shutting down."""
+
+
+class Job:
+    """One objective submitted to the daemon, with its progress events."""
+
+    def __init__(self, objective, client="anonymous", priority=0, dry_run=False, history=DAEMON_EVENT_HISTORY):
+        self.id = uuid.uuid4().hex[:12]
+        self.objective = objective
+        self.client = client
+        self.priority = priority
+        self.dry_run = dry_run
+        self.status = "queued"
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.events = deque(maxlen=history)
+        self.last_seq = 0
+        self._cond = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    def record(self, event):
+        """Display listener: stores an event under the next sequence number."""
+        with self._cond:
+            self.last_seq += 1
+            self.events.append(dict(event, seq=self.last_seq))
+            self._cond.notify_all()
+
+    def set_status(self, status):
+        self.status = status
+        self.record({"kind": "status", "time": time.time(), "title": "Job", "color": "blue", "text": status})
+
+    def events_after(self, seq, timeout):
+        """Events newer than ``seq``, waiting up to ``timeout`` seconds for one to arrive."""
+        with self._cond:
+            if self.last_seq <= seq and not self.done:
+                self._cond.wait(timeout)
+            return [e for e in self.events if e["seq"] > seq]
+
+    def to_dict(self, result=True):
+        info = {
+            "id": self.id,
+            "objective": self.objective,
+            "client": self.client,
+            "priority": self.priority,
+            "dry_run": self.dry_run,
+            "status": self.status,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "events": self.last_seq,
+        }
+        if result:
+            info["result"] = self.result
+        return info
+
+
+class JobQueue:
+    """Jobs ordered by priority (higher first, FIFO within a priority).
+
+    ``get`` skips jobs whose client already has ``per_client`` jobs running,
+    so one busy client can't take every worker.
+    """
+
+    def __init__(self, per_client=DAEMON_CLIENT_CONCURRENCY, max_queued=DAEMON_MAX_QUEUE):
+        self.per_client = max(1, per_client)
+        self.max_queued = max_queued
+        self.running = Counter()
+        self.closed = False
+        self._entries = []  # (-priority, sequence, job), kept sorted
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def put(self, job):
+        with self._cond:
+            if self.closed:
+                raise QueueFull("The daemon is shutting down.")
+            if len(self._entries) >= self.max_queued:
+                raise QueueFull(f"Queue is full ({self.max_queued} jobs).")
+            self._entries.append((-job.priority, next(self._sequence), job))
+            self._entries.sort(key=lambda e: e[:2])
+            self._cond.notify_all()
+
+    def get(self):
+        """Blocks until a job may start; returns None once the queue is closed."""
+        with self._cond:
+            while not self.closed:
+                for index, (_, _, job) in enumerate(self._entries):
+                    if self.running[job.client] < self.per_client:
+                        del self._entries[index]
+                        self.running[job.client] += 1
+                        return job
+                self._cond.wait()
+            return None
+
+    def task_done(self, job):
+        with self._cond:
+            self.running[job.client] -= 1
+            self.running += Counter()  # Drop clients with nothing running
+            self._cond.notify_all()
+
+    def remove(self, job):
+        """Takes a queued job out; False if it already started."""
+        with self._cond:
+            for index, entry in enumerate(self._entries):
+                if entry[2] is job:
+                    del self._entries[index]
+                    return True
+            return False
+
+    def position(self, job):
+        with self._cond:
+            return next((i for i, entry in enumerate(self._entries) if entry[2] is job), None)
+
+    def snapshot(self):
+        with self._cond:
+            return [entry[2] for entry in self._entries], dict(self.running)
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class AgentDaemon:
+    """Long-running job server that keeps the LLM clients and venv pool warm between objectives.
+
+    Jobs run through a BatchScheduler, so in-flight LLM requests and script
+    executions stay bounded across all jobs. Each job gets fresh agents
+    (they hold per-run state) but shares the client pool, response cache,
+    model scheduler and pooled venvs with every other job.
+    """
+
+    def __init__(self, client_for, output_root, workers=DAEMON_WORKERS, per_client=DAEMON_CLIENT_CONCURRENCY,
+                 max_queued=DAEMON_MAX_QUEUE, venv_pool=None, stats=None, dry_run=False, cleanup=True):
+        self.batch = BatchScheduler(client_for, output_root, os.path.join(output_root, "results.jsonl"),
+                                    workers=workers, dry_run=dry_run, cleanup=cleanup, venv_pool=venv_pool)
+        self.workers = workers
+        self.dry_run = dry_run
+        self.queue = JobQueue(per_client, max_queued)
+        self.stats = stats  # Optional callable returning extra metrics, e.g. LLM host stats
+        self.jobs = OrderedDict()
+        self.submitted = 0
+        self.finished = deque(maxlen=MAX_FINISHED_JOBS)  # (finished at, queue wait, run time, status)
+        self.started = time.time()
+        self._threads = []
+        self._lock = threading.Lock()
+        os.makedirs(output_root, exist_ok=True)
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"daemon-worker-{index + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, objective, client="anonymous", priority=0, dry_run=None):
+        job = Job(objective, client, priority, self.dry_run if dry_run is None else dry_run)
+        job.set_status("queued")
+        # Registered before it is queued, so a worker can't start a job that get() doesn't know yet
+        with self._lock:
+            self.jobs[job.id] = job
+        try:
+            self.queue.put(job)
+        except QueueFull:
+            with self._lock:
+                self.jobs.pop(job.id, None)
+            raise
+        with self._lock:
+            self.submitted += 1
+            self._prune()
+        return job
+
+    def _prune(self):
+        done = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in done[:max(0, len(done) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        with self._lock:
+            return list(self.jobs.values())
+
+    def cancel(self, job_id):
+        """Cancels a queued job; returns False if it is already running or finished."""
+        job = self.get(job_id)
+        if job is None or not self.queue.remove(job):
+            return False
+        job.finished = time.time()
+        job.set_status("cancelled")
+        return True
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            try:
+                self._run(job)
+            finally:
+                self.queue.task_done(job)
+
+    def _run(self, job):
+        job.started = time.time()
+        job.set_status("running")
+        with display_listener(job.record):
+            result = self.batch.run_one({"id": job.id, "objective": job.objective, "dry_run": job.dry_run})
+        job.result = result
+        job.finished = time.time()
+        with self._lock:
+            self.finished.append((job.finished, job.started - job.submitted, job.finished - job.started,
+                                  result["status"]))
+        job.set_status(result["status"])
+
+    def metrics(self):
+        now = time.time()
+        queued, running = self.queue.snapshot()
+        with self._lock:
+            finished = list(self.finished)
+            submitted = self.submitted
+        recent = [f for f in finished if now - f[0] <= METRICS_WINDOW]
+        window = min(METRICS_WINDOW, max(now - self.started, 1.0))
+        metrics = {
+            "uptime_s": round(now - self.started, 1),
+            "workers": self.workers,
+            "queue_depth": len(queued),
+            "queued_by_client": dict(Counter(job.client for job in queued)),
+            "running": sum(running.values()),
+            "running_by_client": running,
+            "submitted": submitted,
+            "finished": dict(Counter(f[3] for f in finished)),
+            "throughput_per_min": round(len(recent) / window * 60, 3),
+            "avg_wait_s": round(sum(f[1] for f in recent) / len(recent), 3) if recent else None,
+            "avg_run_s": round(sum(f[2] for f in recent) / len(recent), 3) if recent else None,
+        }
+        if self.stats is not None:
+            metrics.update(self.stats())
+        return metrics
+
+    def shutdown(self):
+        """Stops taking jobs and waits for the running ones to finish."""
+        self.queue.close()
+        for job in self.queue.snapshot()[0]:
+            self.cancel(job.id)
+        for thread in self._threads:
+            thread.join()
+
+
+def make_handler(daemon, heartbeat=15.0):
+    """HTTP handler for the daemon's JSON API.
+
+    POST   /jobs               {"objective", "priority", "client", "dry_run"} -> 202 with the job
+    GET    /jobs               all known jobs
+    GET    /jobs/<id>          one job, with its result once finished
+    GET    /jobs/<id>/events   progress as JSON lines until the job finishes (``?after=<seq>`` to resume)
+    DELETE /jobs/<id>          cancels a queued job
+    GET    /metrics            queue depth, throughput and latency
+    GET    /health
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, payload, status=200):
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _route(self):
+            url = urlparse(self.path)
+            return [p for p in url.path.split("/") if p], parse_qs(url.query)
+
+        def _job(self, job_id):
+            job = daemon.get(job_id)
+            if job is None:
+                self._send_json({"error": f"Unknown job {job_id}"}, 404)
+            return job
+
+        def do_GET(self):
+            parts, query = self._route()
+            if parts == ["health"]:
+                self._send_json({"status": "ok"})
+            elif parts == ["metrics"]:
+                self._send_json(daemon.metrics())
+            elif parts == ["jobs"]:
+                self._send_json({"jobs": [job.to_dict(result=False) for job in daemon.list_jobs()]})
+            elif len(parts) == 2 and parts[0] == "jobs":
+                job = self._job(parts[1])
+                if job is not None:
+                    self._send_json(dict(job.to_dict(), position=daemon.queue.position(job)))
+            elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+                job = self._job(parts[1])
+                if job is not None:
+                    self._stream_events(job, int(query.get("after", ["0"])[0] or 0))
+            else:
+                self._send_json({"error": "Not found"}, 404)
+
+        def do_POST(self):
+            parts, _ = self._route()
+            if parts != ["jobs"]:
+                self._send_json({"error": "Not found"}, 404)
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                objective = str(payload.get("objective") or "").strip()
+                priority = int(payload.get("priority", 0))
+            except (ValueError, TypeError, AttributeError) as e:
+                self._send_json({"error": f"Invalid request: {e}"}, 400)
+                return
+            if not objective:
+                self._send_json({"error": "Missing 'objective'"}, 400)
+                return
+            client = str(payload.get("client") or self.headers.get("X-Client-Id") or "anonymous")
+            dry_run = payload.get("dry_run")
+            try:
+                job = daemon.submit(objective, client, priority, None if dry_run is None else bool(dry_run))
+            except QueueFull as e:
+                self._send_json({"error": str(e)}, 503 if daemon.queue.closed else 429)
+                return
+            self._send_json(dict(job.to_dict(), position=daemon.queue.position(job)), 202)
+
+        def do_DELETE(self):
+            parts, _ = self._route()
+            if len(parts) != 2 or parts[0] != "jobs":
+                self._send_json({"error": "Not found"}, 404)
+                return
+            job = self._job(parts[1])
+            if job is None:
+                return
+            if daemon.cancel(job.id):
+                self._send_json(job.to_dict())
+            else:
+                self._send_json({"error": f"Job is {job.status}; only queued jobs can be cancelled."}, 409)
+
+        def _write_chunk(self, payload):
+            data = (json.dumps(payload, default=str) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def _stream_events(self, job, seq):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                while True:
+                    events = job.events_after(seq, heartbeat)
+                    for event in events:
+                        self._write_chunk(event)
+                        seq = event["seq"]
+                    if job.done and seq >= job.last_seq:
+                        break
+                    if not events:
+                        # Keeps proxies from closing the stream and notices clients that went away
+                        self._write_chunk({"kind": "heartbeat", "time": time.time(), "seq": seq})
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+    return Handler
+
+
+class UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("local", 0)  # The handler expects a (host, port) client address
+
+
+def serve(daemon, host="127.0.0.1", port=0, socket_path=None):
+    """Creates (but doesn't start) the HTTP server for ``daemon`` on TCP or a Unix socket."""
+    handler = make_handler(daemon)
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # Left over from a previous run
+        server = UnixHTTPServer(socket_path, handler)
+        server.address = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+        server.address = f"http://{host}:{server.server_address[1]}"
+    display_console(f"Listening on {server.address}", "Daemon", "green")
+    return server
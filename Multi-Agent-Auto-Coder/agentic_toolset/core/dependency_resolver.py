@@ -0,0 +1,201 @@
+# core/dependency_resolver.py
+
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+
+from agentic_toolset.core.venv_pool import site_packages
+from agentic_toolset.utils.tracing import span
+
+# Import names whose distribution is published under a different name
+IMPORT_TO_DISTRIBUTION = {
+    "attr": "attrs",
+    "bs4": "beautifulsoup4",
+    "cv2": "opencv-python",
+    "Crypto": "pycryptodome",
+    "dateutil": "python-dateutil",
+    "docx": "python-docx",
+    "dotenv": "python-dotenv",
+    "fitz": "PyMuPDF",
+    "google.protobuf": "protobuf",
+    "jwt": "PyJWT",
+    "magic": "python-magic",
+    "PIL": "Pillow",
+    "pptx": "python-pptx",
+    "serial": "pyserial",
+    "skimage": "scikit-image",
+    "sklearn": "scikit-learn",
+    "usb": "pyusb",
+    "yaml": "PyYAML",
+}
+
+_PROBE_SCRIPT = (
+    "import importlib.util, json, sys\n"
+    "found = {}\n"
+    "for name in sys.argv[1:]:\n"
+    "    try:\n"
+    "        found[name] = importlib.util.find_spec(name) is not None\n"
+    "    except (ImportError, ValueError):\n"
+    "        found[name] = False\n"
+    "print(json.dumps(found))\n"
+)
+
+# site-packages path -> (fingerprint, distributions, import names)
+_scan_cache = {}
+_scan_lock = threading.Lock()
+
+
+def normalize_distribution(name):
+    """PEP 503 normalisation, e.g. 'Py_YAML' and 'py-yaml' compare equal."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _requirement_name(requirement):
+    # Strip version specifiers and extras: "rich[jupyter]>=13" -> "rich"
+    return re.split(r"[\s\[<>=!~;]", requirement.strip(), maxsplit=1)[0]
+
+
+def _read_lines(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+
+def _metadata_name(info_dir):
+    for filename in ("METADATA", "PKG-INFO"):
+        for line in _read_lines(os.path.join(info_dir, filename)):
+            if line.startswith("Name:"):
+                return line.split(":", 1)[1].strip()
+            if not line.strip():
+                break
+    return os.path.basename(info_dir).split("-")[0]
+
+
+def _top_level_modules(info_dir):
+    modules = {line.strip() for line in _read_lines(os.path.join(info_dir, "top_level.txt")) if line.strip()}
+    if modules:
+        return modules
+    for line in _read_lines(os.path.join(info_dir, "RECORD")):
+        path = line.split(",", 1)[0]
+        first = path.split("/", 1)[0]
+        if not first or first.startswith("..") or first.endswith((".dist-info", ".egg-info", ".data")):
+            continue
+        if first == "__pycache__":
+            continue
+        if "/" not in path and not first.endswith(".py"):
+            continue
+        modules.add(first[:-3] if first.endswith(".py") else first)
+    return modules
+
+
+def _fingerprint(directory):
+    stat = os.stat(directory)
+    return stat.st_mtime_ns, len(os.listdir(directory))
+
+
+def _scan(directory):
+    distributions = {}
+    imports = set()
+    for entry in os.listdir(directory):
+        path = os.path.join(directory, entry)
+        if entry.endswith((".dist-info", ".egg-info")) and os.path.isdir(path):
+            name = _metadata_name(path)
+            modules = _top_level_modules(path)
+            distributions[normalize_distribution(name)] = sorted(modules)
+            imports.update(modules)
+        elif entry.endswith(".py"):
+            imports.add(entry[:-3])
+        elif os.path.isdir(path) and not entry.startswith(("_", ".")) and "-" not in entry:
+            imports.add(entry)
+        elif entry.endswith((".so", ".pyd")):
+            imports.add(entry.split(".", 1)[0])
+    return distributions, imports
+
+
+class DependencyResolver:
+    """Answers "is this requirement installed?" for a venv without running Python.
+
+    Installed distributions and their top-level import names are read from
+    the venv's ``.dist-info`` metadata. Scans are cached per site-packages
+    directory until its contents change. When no site-packages directory can
+    be found, all names are probed in a single interpreter launch instead.
+    """
+
+    def __init__(self, venv_path, python_executable=None):
+        self.venv_path = venv_path
+        self.python_executable = python_executable
+
+    def _installed(self):
+        directory = site_packages(self.venv_path)
+        if directory is None:
+            return None
+        fingerprint = _fingerprint(directory)
+        with _scan_lock:
+            cached = _scan_cache.get(directory)
+            if cached and cached[0] == fingerprint:
+                return cached[1], cached[2]
+        distributions, imports = _scan(directory)
+        with _scan_lock:
+            _scan_cache[directory] = (fingerprint, distributions, imports)
+        return distributions, imports
+
+    def invalidate(self):
+        directory = site_packages(self.venv_path)
+        with _scan_lock:
+            _scan_cache.pop(directory, None)
+
+    def distribution_for(self, name):
+        """Maps an import name to the distribution that provides it."""
+        name = _requirement_name(name)
+        installed = self._installed()
+        if installed:
+            for distribution, modules in installed[0].items():
+                if name in modules:
+                    return distribution
+        return IMPORT_TO_DISTRIBUTION.get(name, IMPORT_TO_DISTRIBUTION.get(name.split(".")[0], name))
+
+    def missing(self, requirements):
+        """Returns the requirements (import or distribution names) not installed."""
+        requirements = list(requirements)
+        installed = self._installed()
+        if installed is None:
+            return self._probe_missing(requirements)
+
+        distributions, imports = installed
+        missing = []
+        for requirement in requirements:
+            name = _requirement_name(requirement)
+            top_level = name.split(".")[0]
+            if normalize_distribution(name) in distributions or top_level in imports:
+                continue
+            if top_level in sys.stdlib_module_names:
+                continue
+            missing.append(requirement)
+        return missing
+
+    def distributions(self):
+        """Sorted names of the installed distributions; empty when site-packages can't be read."""
+        installed = self._installed()
+        return sorted(installed[0]) if installed else []
+
+    def is_installed(self, requirement):
+        return not self.missing([requirement])
+
+    def _probe_missing(self, requirements):
+        """Fallback: checks every import in one interpreter launch."""
+        names = [_requirement_name(r) for r in requirements]
+        with span("import probe", "subprocess", modules=len(names)):
+            result = subprocess.run(
+                [self.python_executable or sys.executable, "-c", _PROBE_SCRIPT] + names,
+                capture_output=True, text=True
+            )
+        try:
+            found = json.loads(result.stdout)
+        except ValueError:
+            found = {}
+        return [r for r, name in zip(requirements, names) if not found.get(name)]
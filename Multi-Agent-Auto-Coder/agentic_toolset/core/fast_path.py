@@ -0,0 +1,171 @@
+# core/fast_path.py
+
+import hashlib
+import json
+import math
+import re
+
+from agentic_toolset.config import ROUTER_EMBED_MODEL, ROUTER_LLM_FALLBACK
+from agentic_toolset.core.llm_client import LLMError
+from agentic_toolset.core.project_writer import extract_code_blocks, strip_prose, syntax_error
+from agentic_toolset.utils.display import display_console
+from agentic_toolset.utils.llm import chat_text
+
+# Words that say nothing about what a project does
+_NAME_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "from", "by", "as", "at", "into", "that",
+    "which", "who", "it", "its", "is", "are", "be", "this", "these", "then", "than", "using", "use", "uses", "me",
+    "my", "i", "we", "our", "you", "your", "please", "can", "should", "will", "would", "create", "write", "build",
+    "make", "develop", "implement", "generate", "program", "script", "code", "python", "simple", "small", "basic",
+    "tool", "function", "app", "application", "print", "prints", "printing", "some", "all", "each", "every",
+}
+MAX_NAME_WORDS = 4
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def slugify(text, max_words=MAX_NAME_WORDS):
+    """Lowercase, underscore-separated, folder-safe form of ``text``."""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return "_".join(words[:max_words])
+
+
+def objective_key(objective):
+    """Objective text with case, punctuation and spacing normalised away."""
+    return " ".join(_NON_WORD.sub(" ", objective.lower()).split())
+
+
+def objective_digest(objective, length=6):
+    """Short hash of the normalised objective; tells apart objectives whose slugs collide."""
+    return hashlib.sha256(objective_key(objective).encode("utf-8")).hexdigest()[:length]
+
+
+def project_slug(objective):
+    """A folder name built from the objective's content words, or None when there are too few to be descriptive."""
+    words = [w for w in re.findall(r"[a-z0-9]+", objective.lower()) if w not in _NAME_STOPWORDS and len(w) > 1]
+    if len(words) < 2:
+        return None
+    return "_".join(words[:MAX_NAME_WORDS])
+
+
+def local_review(response_text):
+    """Rejects a response without asking the reviewer when that is certain.
+
+    Returns False when the response has no code or a Python block that
+    doesn't parse, and None when it needs a real review.
+    """
+    blocks = [strip_prose(b.code) for b in extract_code_blocks(response_text) if b.is_python]
+    if not blocks:
+        return False
+    for code in blocks:
+        # A block that is all prose is stripped to nothing
+        if not code.strip() or syntax_error(code) is not None:
+            return False
+    return None
+
+
+# Route -> keyword patterns; the first routes win ties when nothing else decides
+ROUTES = {
+    "architecture": (r"\barchitecture\b", r"\b(project|file|folder|directory) (structure|layout)\b", r"\bscaffold"),
+    "review": (r"\breview (the |this )?code\b", r"\bcode review\b"),
+    "consult": (r"\bconsult", r"\badvice\b", r"\brecommendations?\b", r"\bbest practices?\b"),
+    "bug_fix": (r"\bbug ?fix", r"\bfix (the |this |any )?bugs?\b", r"\bdebug", r"\btraceback\b"),
+    "code": (r"\bimplement", r"\b(write|create|add) (a |an |the )?(python )?(function|class|script|module|code)\b",
+             r"```"),
+}
+ROUTE_DESCRIPTIONS = {
+    "architecture": "Design the project architecture: decide the files, folders and modules to create.",
+    "review": "Review existing code for correctness, quality and bugs.",
+    "consult": "Give advice, recommendations or best practices about an approach.",
+    "bug_fix": "Fix bugs in existing code or debug an error.",
+    "code": "Write or implement new code: functions, classes, scripts.",
+}
+DEFAULT_ROUTE = "code"
+_ROUTE_PATTERNS = {route: [re.compile(p, re.IGNORECASE) for p in patterns] for route, patterns in ROUTES.items()}
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class TaskRouter:
+    """Chooses which agent handles a sub-task prompt.
+
+    Keyword patterns decide when a single route scores highest, and a
+    prompt that matches nothing goes to the coder. Ties are broken by
+    embedding similarity to each route's description when an embedding
+    model is set, then by asking ``fallback_model`` for a JSON answer,
+    and finally by route order.
+    """
+
+    def __init__(self, client, embed_model=ROUTER_EMBED_MODEL, llm_fallback=ROUTER_LLM_FALLBACK, margin=0.05):
+        self.client = client
+        self.embed_model = embed_model
+        self.llm_fallback = llm_fallback
+        self.margin = margin
+        self.decisions = {"keyword": 0, "embedding": 0, "llm": 0, "order": 0}
+        self._route_vectors = None
+
+    @staticmethod
+    def scores(prompt, routes):
+        return {route: sum(1 for p in _ROUTE_PATTERNS[route] if p.search(prompt)) for route in routes}
+
+    def _embed(self, texts):
+        response = self.client.embed(model=self.embed_model, input=texts)
+        return response["embeddings"]
+
+    def _by_embedding(self, prompt, candidates):
+        if self._route_vectors is None:
+            self._route_vectors = dict(zip(ROUTE_DESCRIPTIONS, self._embed(list(ROUTE_DESCRIPTIONS.values()))))
+        vector = self._embed([prompt])[0]
+        ranked = sorted(candidates, key=lambda r: _cosine(vector, self._route_vectors[r]), reverse=True)
+        best = _cosine(vector, self._route_vectors[ranked[0]])
+        if len(ranked) == 1 or best - _cosine(vector, self._route_vectors[ranked[1]]) >= self.margin:
+            return ranked[0]
+        return None
+
+    def _by_llm(self, prompt, candidates, model):
+        options = "\n".join(f"- {r}: {ROUTE_DESCRIPTIONS[r]}" for r in candidates)
+        response = chat_text(
+            self.client,
+            model=model,
+            messages=[{
+                "role": "user",
+                "content": f"Which agent should handle this sub-task?\n{options}\n\nSub-task:\n{prompt}\n\n"
+                           "Answer with JSON: {\"route\": \"<one of the names above>\"}",
+            }],
+            agent="router",
+            format={"type": "object", "properties": {"route": {"type": "string", "enum": candidates}},
+                    "required": ["route"]},
+        )
+        route = json.loads(response).get("route")
+        return route if route in candidates else None
+
+    def route(self, prompt, routes=tuple(ROUTES), fallback_model=None):
+        """Returns the route for ``prompt`` out of the available ``routes``."""
+        scores = self.scores(prompt, routes)
+        best = max(scores.values(), default=0)
+        if best == 0:
+            self.decisions["keyword"] += 1
+            return DEFAULT_ROUTE if DEFAULT_ROUTE in routes else routes[-1]
+        candidates = [r for r in routes if scores[r] == best]
+        if len(candidates) == 1:
+            self.decisions["keyword"] += 1
+            return candidates[0]
+
+        try:
+            if self.embed_model:
+                route = self._by_embedding(prompt, candidates)
+                if route:
+                    self.decisions["embedding"] += 1
+                    return route
+            if self.llm_fallback and fallback_model:
+                route = self._by_llm(prompt, candidates, fallback_model)
+                if route:
+                    self.decisions["llm"] += 1
+                    return route
+        except (LLMError, ValueError, KeyError, TypeError, AttributeError) as e:
+            display_console(f"Routing fallback failed ({e}); using route order.", "Router", "yellow")
+        self.decisions["order"] += 1
+        return candidates[0]
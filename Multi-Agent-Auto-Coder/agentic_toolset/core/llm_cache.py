@@ -0,0 +1,212 @@
+# core/llm_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from agentic_toolset.config import (
+    LLM_CACHE_PATH, LLM_CACHE_MEMORY_ENTRIES, LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL
+)
+
+# Arguments that change how a response is delivered, not what it contains
+_UNKEYED_ARGS = ("stream", "keep_alive")
+
+
+def cache_key(model, messages, **kwargs):
+    """Content address for a chat request: model, messages and options."""
+    payload = {
+        "model": model,
+        "messages": [dict(m) for m in messages or []],
+        "args": {k: v for k, v in kwargs.items() if k not in _UNKEYED_ARGS and v is not None},
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ResponseCache:
+    """In-memory LRU in front of a SQLite store with size and TTL eviction."""
+
+    def __init__(self, path=LLM_CACHE_PATH, memory_entries=LLM_CACHE_MEMORY_ENTRIES,
+                 max_bytes=LLM_CACHE_MAX_BYTES, ttl=LLM_CACHE_TTL):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.commit()
+            self._purge_expired()
+
+    def _expired(self, created):
+        return self.ttl and time.time() - created > self.ttl
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and not self._expired(row[1]):
+                    self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self.disk_hits += 1
+                    return value
+                if row:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self.stores += 1
+            if self._db is None:
+                return
+            encoded = json.dumps(value)
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded), now, now)
+            )
+            self._evict_to_size()
+            self._db.commit()
+
+    def _remember(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_to_size(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+
+    def _purge_expired(self):
+        if self.ttl:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+            self._db.commit()
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class CachedClient:
+    """Wraps an Ollama client so identical chat requests are answered from cache.
+
+    Anything other than ``chat`` is passed straight through to the wrapped
+    client.
+    """
+
+    def __init__(self, client, cache):
+        self.client = client
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def chat(self, model="", messages=None, stream=False, **kwargs):
+        key = cache_key(model, messages, **kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            if stream:
+                return iter([cached])
+            return cached
+
+        if not stream:
+            response = self.client.chat(model=model, messages=messages, **kwargs)
+            self.cache.put(key, cache_entry(response['message']['content']))
+            return response
+        return CachingStream(self.cache, key, self.client.chat(model=model, messages=messages, stream=True, **kwargs))
+
+
+def cache_entry(text):
+    return {"message": {"role": "assistant", "content": text}, "done": True}
+
+
+class CachingStream:
+    """Passes streamed chunks through and caches their text once it is final.
+
+    The text is stored when the server sends its ``done`` chunk, or when
+    the reader calls ``complete()`` because it stopped at a point where the
+    partial text is the whole answer (e.g. a closed code block). A stream
+    closed any other way (cancellation, Ctrl-C, an error in the reader) is
+    never cached.
+    """
+
+    def __init__(self, cache, key, chunks):
+        self.cache = cache
+        self.key = key
+        self.chunks = chunks
+        self.parts = []
+        self.stored = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.parts.append(chunk['message']['content'])
+            if chunk.get('done'):
+                self._store()
+            yield chunk
+
+    def _store(self):
+        if not self.stored:
+            self.stored = True
+            self.cache.put(self.key, cache_entry("".join(self.parts)))
+
+    def complete(self):
+        """Marks the text read so far as the final answer and caches it."""
+        if self.parts:
+            self._store()
+
+    def close(self):
+        if hasattr(self.chunks, "close"):
+            self.chunks.close()
@@ -0,0 +1,314 @@
+# core/llm_client.py
+
+import random
+import threading
+import time
+
+import httpx
+from ollama import Client, ResponseError
+
+from agentic_toolset.config import (
+    OLLAMA_HOSTS, LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT, LLM_POOL_CONNECTIONS, LLM_HOST_PARALLEL, LLM_RETRIES,
+    LLM_BACKOFF_BASE, LLM_BACKOFF_MAX, LLM_BREAKER_FAILURES, LLM_BREAKER_RESET, LLM_MODEL_REFRESH
+)
+from agentic_toolset.utils.display import display_console
+
+
+class LLMError(Exception):
+    """Base class for failed LLM requests."""
+
+    def __init__(self, message, host=None, status_code=None):
+        super().__init__(message)
+        self.host = host
+        self.status_code = status_code
+
+
+class LLMConnectionError(LLMError):
+    """The server could not be reached or dropped the connection."""
+
+
+class LLMTimeoutError(LLMConnectionError):
+    """The server did not answer within the configured timeout."""
+
+
+class LLMResponseError(LLMError):
+    """The server answered with an error, e.g. an unknown model."""
+
+
+class LLMUnavailableError(LLMError):
+    """Every host is failing or has its circuit breaker open."""
+
+
+def to_llm_error(error, host=None):
+    """Translates an ollama/httpx exception into the matching LLMError."""
+    if isinstance(error, LLMError):
+        return error
+    if isinstance(error, httpx.TimeoutException):
+        return LLMTimeoutError(f"Timed out talking to {host or 'Ollama'}: {error}", host)
+    if isinstance(error, ResponseError):
+        return LLMResponseError(error.error, host, error.status_code)
+    if isinstance(error, (ConnectionError, httpx.TransportError)):
+        return LLMConnectionError(f"Connection to {host or 'Ollama'} failed: {error}", host)
+    return LLMError(f"{type(error).__name__}: {error}", host)
+
+
+def _retryable(error):
+    if isinstance(error, LLMResponseError):
+        # 429 and 5xx are transient; other statuses mean the request itself is wrong
+        return error.status_code in (-1, 429) or (error.status_code or 0) >= 500
+    return isinstance(error, LLMConnectionError)
+
+
+class CircuitBreaker:
+    """Stops traffic to a host after repeated failures.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    the host is skipped. Once ``reset_timeout`` has passed a single trial
+    request is let through (half-open); its outcome closes or reopens it.
+    """
+
+    def __init__(self, failure_threshold=LLM_BREAKER_FAILURES, reset_timeout=LLM_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def available(self):
+        state = self.state
+        return state == "closed" or (state == "half-open" and not self._trial_running)
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class HostState:
+    """One Ollama server: its pooled connection, load and loaded models."""
+
+    def __init__(self, host, connect_timeout, read_timeout, connections):
+        self.host = host
+        self.client = Client(
+            host=host,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+        )
+        self.breaker = CircuitBreaker()
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.latency = 0.0  # Moving average of request time in seconds
+        self.loaded_models = set()
+        self.models_checked = 0.0
+
+    def record_latency(self, seconds):
+        self.latency = seconds if not self.latency else 0.8 * self.latency + 0.2 * seconds
+
+
+class PooledClient:
+    """Drop-in replacement for ``ollama.Client`` that spreads requests over several hosts.
+
+    Each request goes to the least-loaded healthy host, preferring hosts that
+    already have the requested model loaded (checked with ``ps``) until they
+    are serving ``host_parallel`` requests. Transient failures are retried on
+    another host with exponential backoff and jitter; hosts that keep failing
+    are taken out by a circuit breaker. Failures surface as ``LLMError``
+    subclasses.
+
+    A streamed request is only retried until its first chunk arrives; after
+    that a failure is raised, since part of the answer was already used.
+    """
+
+    def __init__(self, hosts=None, retries=LLM_RETRIES, backoff_base=LLM_BACKOFF_BASE, backoff_max=LLM_BACKOFF_MAX,
+                 connect_timeout=LLM_CONNECT_TIMEOUT, read_timeout=LLM_READ_TIMEOUT,
+                 connections=LLM_POOL_CONNECTIONS, host_parallel=LLM_HOST_PARALLEL, model_refresh=LLM_MODEL_REFRESH):
+        hosts = list(hosts or OLLAMA_HOSTS)
+        if not hosts:
+            raise ValueError("PooledClient needs at least one Ollama host")
+        self.hosts = [HostState(h, connect_timeout, read_timeout, connections) for h in hosts]
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.host_parallel = host_parallel
+        self.model_refresh = model_refresh
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Anything without a model to route on (list, pull, show, ...) goes to the first healthy host
+        hosts = [h for h in self.hosts if h.breaker.available()] or self.hosts
+        return getattr(hosts[0].client, name)
+
+    def _refresh_models(self, host):
+        if not self.model_refresh or time.monotonic() - host.models_checked < self.model_refresh:
+            return
+        host.models_checked = time.monotonic()
+        try:
+            running = host.client.ps().models
+        except Exception:
+            return
+        host.loaded_models = {getattr(m, "model", None) or getattr(m, "name", None) for m in running}
+
+    def _pick_host(self, model, exclude):
+        candidates = [h for h in self.hosts if h not in exclude and h.breaker.available()]
+        if not candidates:
+            return None
+        if model and len(candidates) > 1:
+            for host in candidates:
+                self._refresh_models(host)
+        with self._lock:
+            candidates.sort(key=lambda h: (h.in_flight >= self.host_parallel, model not in h.loaded_models,
+                                           h.in_flight, h.latency))
+            for host in candidates:
+                if host.breaker.allow():
+                    host.in_flight += 1
+                    host.requests += 1
+                    return host
+        return None
+
+    def _finish(self, host, error=None, started=None):
+        with self._lock:
+            host.in_flight -= 1
+            if error is not None:
+                host.failures += 1
+        if error is None:
+            host.breaker.record_success()
+            if started is not None:
+                host.record_latency(time.monotonic() - started)
+        elif _retryable(error):
+            host.breaker.record_failure()
+        else:
+            # The host answered; the request was at fault
+            host.breaker.record_success()
+
+    def _backoff(self, attempt):
+        cap = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        time.sleep(random.uniform(cap / 2, cap))
+
+    def _call(self, method, model, *args, **kwargs):
+        """Runs ``method`` on a host's client, retrying transient failures on other hosts."""
+        last_error = None
+        tried = set()
+        missing_model = set()
+        for attempt in range(self.retries + 1):
+            host = self._pick_host(model, tried | missing_model)
+            if host is None and tried - missing_model:
+                # Every host was tried once; start another round over the healthy ones
+                tried = set()
+                host = self._pick_host(model, missing_model)
+            if host is None:
+                break
+            tried.add(host)
+            started = time.monotonic()
+            try:
+                result = method(host, *args, **kwargs)
+            except Exception as e:
+                error = to_llm_error(e, host.host)
+                self._finish(host, error)
+                last_error = error
+                if error.status_code == 404 and len(self.hosts) > 1:
+                    # Model not pulled on this host; another host may have it
+                    missing_model.add(host)
+                    continue
+                if not _retryable(error):
+                    raise error from e
+                if attempt < self.retries:
+                    display_console(f"{error} (attempt {attempt + 1}/{self.retries + 1}); retrying.",
+                                    "LLM Client", "yellow")
+                    self._backoff(attempt)
+                continue
+            return host, started, result
+
+        if last_error is None or (isinstance(last_error, LLMConnectionError) and len(self.hosts) > 1):
+            raise LLMUnavailableError(
+                f"No Ollama host could serve model {model!r}" + (f": {last_error}" if last_error else "")
+            ) from last_error
+        raise last_error
+
+    def chat(self, model="", messages=None, stream=False, **kwargs):
+        if not stream:
+            host, started, response = self._call(
+                lambda h: h.client.chat(model=model, messages=messages, **kwargs), model
+            )
+            self._finish(host, started=started)
+            host.loaded_models.add(model)
+            return response
+        return self._stream_chat(model, messages, **kwargs)
+
+    def _stream_chat(self, model, messages, **kwargs):
+        def first_chunk(host):
+            chunks = host.client.chat(model=model, messages=messages, stream=True, **kwargs)
+            try:
+                return chunks, next(chunks)
+            except StopIteration:
+                return chunks, None
+            except BaseException:
+                chunks.close()
+                raise
+
+        host, started, (chunks, first) = self._call(first_chunk, model)
+        error = None
+        try:
+            if first is not None:
+                yield first
+            yield from chunks
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            error = to_llm_error(e, host.host)
+            raise error from e
+        finally:
+            chunks.close()
+            self._finish(host, error, started)
+            if error is None:
+                host.loaded_models.add(model)
+
+    def embed(self, model="", input="", **kwargs):
+        host, started, response = self._call(lambda h: h.client.embed(model=model, input=input, **kwargs), model)
+        self._finish(host, started=started)
+        return response
+
+    def stats(self):
+        return [
+            {
+                "host": h.host,
+                "state": h.breaker.state,
+                "requests": h.requests,
+                "failures": h.failures,
+                "in_flight": h.in_flight,
+                "latency": round(h.latency, 3),
+                "models": sorted(m for m in h.loaded_models if m),
+            }
+            for h in self.hosts
+        ]
+
+    def close(self):
+        for host in self.hosts:
+            host.client.close()
@@ -0,0 +1,328 @@
+# core/memory.py
+
+import difflib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from agentic_toolset.config import (
+    MEMORY_DIR, MEMORY_EMBED_MODEL, MEMORY_EXAMPLES, MEMORY_MIN_SIMILARITY, MEMORY_REUSE_SIMILARITY,
+    MEMORY_ANN_THRESHOLD, MEMORY_EXAMPLE_CHARS
+)
+from agentic_toolset.core.llm_client import LLMError
+from agentic_toolset.core.fast_path import objective_key, slugify
+from agentic_toolset.core.project_writer import atomic_write, content_hash, fenced_files
+from agentic_toolset.utils.display import display_console
+from agentic_toolset.utils.tracing import span
+
+try:
+    import numpy as np
+except ImportError:  # Memory is optional; without NumPy every run starts cold
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: the index is only guarded within one process
+    fcntl = None
+
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.f32"
+SIGNATURES_FILE = "signatures.u16"
+ENTRIES_FILE = "entries.jsonl"
+LOCK_FILE = "index.lock"
+# Random-hyperplane LSH: each table hashes a vector to LSH_BITS sign bits
+LSH_TABLES = 8
+LSH_BITS = 12
+LSH_SEED = 1234
+MAX_FILE_CHARS = 20000  # Larger files are not stored in memory
+
+_QUOTED_PATH = re.compile(r'"(?:[^"]*[/\\])?([^"/\\]+)"')
+
+
+def _error_key(error):
+    """Error text without the directories that differ between projects."""
+    return _QUOTED_PATH.sub(r'"\1"', error.strip())
+
+
+class VectorIndex:
+    """Append-only on-disk index of unit vectors with metadata.
+
+    Vectors are stored in a float32 file that is memory-mapped for search,
+    so the index never has to fit in RAM. Small indexes are scanned
+    exactly; past ``ann_threshold`` rows a query is only scored against
+    rows that share a random-hyperplane hash with it in at least one of
+    ``LSH_TABLES`` tables (falling back to a full scan when too few do).
+    Several processes (a daemon, the CLI, batch runs) may share an index:
+    writes hold an exclusive ``flock`` and searches a shared one, and both
+    first pick up entries the other processes appended. Entries are
+    appended last, so a crash mid-write leaves at most a partial row that
+    the next writer drops.
+    """
+
+    _open = {}
+    _open_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, directory, dim):
+        """Returns the index for ``directory``, shared by every caller in the process."""
+        key = (os.path.abspath(directory), dim)
+        with cls._open_lock:
+            if key not in cls._open:
+                cls._open[key] = cls(directory, dim)
+            return cls._open[key]
+
+    def __init__(self, directory, dim, ann_threshold=MEMORY_ANN_THRESHOLD):
+        self.directory = directory
+        self.dim = dim
+        self.ann_threshold = ann_threshold
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._signatures = None
+        self.entries = []
+        self._entries_size = 0  # Bytes of entries.jsonl read so far
+        self._kinds = np.array([], dtype=object)
+        os.makedirs(directory, exist_ok=True)
+        self._planes = np.random.default_rng(LSH_SEED).standard_normal((LSH_TABLES * LSH_BITS, dim)).astype(np.float32)
+        self._weights = (1 << np.arange(LSH_BITS)).astype(np.uint16)
+        with self._locked(exclusive=True):
+            meta_path = os.path.join(directory, META_FILE)
+            if os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                if meta.get("dim") != dim:
+                    raise ValueError(f"Memory index {directory} holds {meta.get('dim')}-d vectors, not {dim}-d")
+            else:
+                atomic_write(meta_path, json.dumps({"dim": dim, "tables": LSH_TABLES, "bits": LSH_BITS, "seed": LSH_SEED}))
+            self._refresh(repair=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _locked(self, exclusive):
+        """Holds the in-process lock and, where ``fcntl`` exists, a lock on the index files."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._path(LOCK_FILE), "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                yield
+
+    def _refresh(self, repair=False):
+        """Reads entries appended since the last call, e.g. by another process.
+
+        With ``repair`` (only under the exclusive lock) a partial entry and
+        vector rows without an entry, left by a crashed writer, are dropped.
+        """
+        path = self._path(ENTRIES_FILE)
+        if os.path.exists(path) and os.path.getsize(path) > self._entries_size:
+            kinds = []
+            with open(path, "rb") as f:
+                f.seek(self._entries_size)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    self.entries.append(entry)
+                    kinds.append(entry.get("kind", ""))
+                    self._entries_size += len(line)
+            if kinds:
+                self._kinds = np.append(self._kinds, np.array(kinds, dtype=object))
+            if repair and os.path.getsize(path) != self._entries_size:
+                os.truncate(path, self._entries_size)
+        for name, row_bytes in ((VECTORS_FILE, self.dim * 4), (SIGNATURES_FILE, LSH_TABLES * 2)):
+            # Entries are written last, so every entry has its rows unless the files were damaged
+            size = os.path.getsize(self._path(name)) if os.path.exists(self._path(name)) else 0
+            if size < len(self.entries) * row_bytes:
+                raise ValueError(f"Memory index {self.directory} is corrupt: {name} is too short")
+            if repair and size > len(self.entries) * row_bytes:
+                os.truncate(self._path(name), len(self.entries) * row_bytes)
+        if self._matrix is not None and len(self._matrix) != len(self.entries):
+            self._matrix = self._signatures = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def signature(self, vector):
+        bits = (self._planes @ vector > 0).reshape(LSH_TABLES, LSH_BITS)
+        return (bits * self._weights).sum(axis=1).astype(np.uint16)
+
+    def add(self, vector, entry):
+        vector = np.asarray(vector, dtype=np.float32)
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._locked(exclusive=True):
+            self._refresh(repair=True)
+            with open(self._path(VECTORS_FILE), "ab") as f:
+                f.write(vector.tobytes())
+            with open(self._path(SIGNATURES_FILE), "ab") as f:
+                f.write(self.signature(vector).tobytes())
+            with open(self._path(ENTRIES_FILE), "ab") as f:
+                f.write(line)
+            self.entries.append(entry)
+            self._entries_size += len(line)
+            self._kinds = np.append(self._kinds, entry.get("kind", ""))
+            self._matrix = self._signatures = None
+
+    def _mapped(self):
+        if self._matrix is None:
+            n = len(self.entries)
+            self._matrix = np.memmap(self._path(VECTORS_FILE), dtype=np.float32, mode="r", shape=(n, self.dim))
+            self._signatures = np.memmap(self._path(SIGNATURES_FILE), dtype=np.uint16, mode="r",
+                                         shape=(n, LSH_TABLES))
+        return self._matrix, self._signatures
+
+    def search(self, vector, k=MEMORY_EXAMPLES, kind=None):
+        """The ``k`` most similar entries as (cosine similarity, entry) pairs, best first."""
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._locked(exclusive=False):
+            self._refresh()
+            if not self.entries:
+                return []
+            matrix, signatures = self._mapped()
+            rows = np.arange(len(self.entries))
+            if kind is not None:
+                rows = rows[self._kinds == kind]
+            if len(rows) > self.ann_threshold:
+                candidates = rows[(signatures[rows] == self.signature(vector)).any(axis=1)]
+                if len(candidates) >= k:
+                    rows = candidates
+            if not len(rows):
+                return []
+            scores = matrix[rows] @ vector
+            top = np.argsort(-scores)[:k]
+            return [(float(scores[i]), self.entries[rows[i]]) for i in top]
+
+
+class SolutionMemory:
+    """Past solutions and error fixes, retrieved by embedding similarity.
+
+    Objectives of finished runs are stored with their final code, and
+    errors the bug fixer made go away are stored with the diff that fixed
+    them. Embeddings come from ``model`` through the LLM client; if that
+    fails (e.g. the model isn't pulled) memory switches itself off for the
+    rest of the run instead of failing it.
+    """
+
+    def __init__(self, client, directory=MEMORY_DIR, model=MEMORY_EMBED_MODEL):
+        self.client = client
+        self.directory = os.path.join(directory, slugify(model, max_words=8) or "default")
+        self.model = model
+        self.enabled = True
+        self.stats = {"recalled": 0, "reused": 0, "stored": 0}
+        self._index = None
+        self._cache = OrderedDict()  # Text -> unit vector; a fix round embeds the same error twice
+
+    def _embed(self, text):
+        if text in self._cache:
+            self._cache.move_to_end(text)
+            return self._cache[text]
+        try:
+            with span("embed", "memory", model=self.model, chars=len(text)):
+                response = self.client.embed(model=self.model, input=[text])
+            vector = np.asarray(response["embeddings"][0], dtype=np.float32)
+        except (LLMError, KeyError, IndexError, TypeError, ValueError) as e:
+            display_console(f"Embedding with {self.model} failed ({e}); memory is off for this run.", "Memory", "yellow")
+            self.enabled = False
+            return None
+        norm = float(np.linalg.norm(vector))
+        vector = vector / norm if norm else vector
+        self._cache[text] = vector
+        if len(self._cache) > 64:
+            self._cache.popitem(last=False)
+        return vector
+
+    def _index_for(self, vector):
+        if self._index is None:
+            try:
+                self._index = VectorIndex.open(self.directory, len(vector))
+            except (OSError, ValueError) as e:
+                display_console(f"Could not open memory index: {e}", "Memory", "yellow")
+                self.enabled = False
+        return self._index
+
+    def _search(self, text, kind, k, threshold):
+        if not self.enabled or not text.strip():
+            return []
+        vector = self._embed(text)
+        index = self._index_for(vector) if vector is not None else None
+        if index is None:
+            return []
+        return [(score, entry) for score, entry in index.search(vector, k, kind) if score >= threshold]
+
+    def _add(self, text, entry):
+        vector = self._embed(text) if self.enabled else None
+        index = self._index_for(vector) if vector is not None else None
+        if index is None:
+            return False
+        index.add(vector, dict(entry, created=time.time()))
+        self.stats["stored"] += 1
+        return True
+
+    def match(self, objective):
+        """The stored solution to a near-identical objective as (similarity, entry), or None.
+
+        Similar wording can still ask for different behaviour, so a match
+        is only a candidate; see ``is_same_objective``.
+        """
+        matches = self._search(objective, "solution", 1, MEMORY_REUSE_SIMILARITY)
+        return matches[0] if matches else None
+
+    @staticmethod
+    def is_same_objective(objective, entry):
+        """True if ``entry`` was stored for the same objective text, up to case and punctuation."""
+        return entry.get("key", objective_key(entry["objective"])) == objective_key(objective)
+
+    def solution_examples(self, objective, k=MEMORY_EXAMPLES):
+        """Similar past objectives and their code, formatted for the orchestrator."""
+        matches = self._search(objective, "solution", k, MEMORY_MIN_SIMILARITY)
+        self.stats["recalled"] += len(matches)
+        sections = []
+        for score, entry in matches:
+            blocks = fenced_files(entry["files"])
+            sections.append(f"### {entry['objective']} (similarity {score:.2f})\n{blocks[:MEMORY_EXAMPLE_CHARS]}")
+        return "\n\n".join(sections)
+
+    def fix_examples(self, error, k=MEMORY_EXAMPLES):
+        """Similar errors fixed before, with the diffs that fixed them."""
+        matches = self._search(_error_key(error), "fix", k, MEMORY_MIN_SIMILARITY)
+        self.stats["recalled"] += len(matches)
+        return "\n\n".join(
+            f"Error:\n{entry['error']}\nFix:\n{entry['diff'][:MEMORY_EXAMPLE_CHARS]}" for _, entry in matches
+        )
+
+    def add_solution(self, objective, files, output=""):
+        """Stores the code of a run that finished cleanly; ``files`` maps relative paths to contents."""
+        files = {rel: code for rel, code in files.items() if code.strip() and len(code) <= MAX_FILE_CHARS}
+        if not files:
+            return False
+        digest = content_hash(json.dumps(files, sort_keys=True))
+        if any(entry.get("hash") == digest for _, entry in self._search(objective, "solution", 3, 0.0)):
+            return False
+        return self._add(objective, {"kind": "solution", "objective": objective, "key": objective_key(objective),
+                                     "files": files, "output": output[:MEMORY_EXAMPLE_CHARS], "hash": digest})
+
+    def add_fix(self, error, before, after):
+        """Stores a fix that made ``error`` go away."""
+        diff = "".join(difflib.unified_diff(before.splitlines(True), after.splitlines(True), "before", "after"))
+        if not diff:
+            return False
+        key = _error_key(error)
+        return self._add(key, {"kind": "fix", "error": key[-MEMORY_EXAMPLE_CHARS:], "diff": diff})
+
+
+def open_memory(client, directory=MEMORY_DIR, model=MEMORY_EMBED_MODEL):
+    """A SolutionMemory, or None when NumPy or an embedding model is missing."""
+    if not model:
+        return None
+    if np is None:
+        display_console("NumPy is not installed; running without memory.", "Memory", "yellow")
+        return None
+    return SolutionMemory(client, directory, model)
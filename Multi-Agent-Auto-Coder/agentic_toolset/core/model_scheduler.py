@@ -0,0 +1,195 @@
+# core/model_scheduler.py
+
+import itertools
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+from agentic_toolset.config import (
+    MODEL_RESIDENT_LIMIT, MODEL_SCHEDULER_MAX_BATCH, MODEL_SCHEDULER_MAX_WAIT, OLLAMA_KEEP_ALIVE,
+    MODEL_IDLE_KEEP_ALIVE
+)
+from agentic_toolset.utils.display import display_console
+
+
+class ModelScheduler:
+    """Orders concurrent chat requests so the server swaps models as rarely as possible.
+
+    At most ``resident_limit`` models are treated as loaded. A request for a
+    loaded model runs at once; a request for another model waits until a
+    loaded model goes idle, and the waiting model with the most queued
+    requests is loaded next, so requests are served in per-model groups.
+    To avoid starvation, a loaded model stops admitting new requests after
+    ``max_batch`` admissions while others wait, or once a waiter has been
+    queued for ``max_wait`` seconds.
+
+    Models in a declared working set (see ``working_set``) are sent with a
+    long ``keep_alive`` so they stay loaded between iterations; other models
+    get ``idle_keep_alive`` so they free memory for the next-needed one.
+    """
+
+    def __init__(self, client, resident_limit=MODEL_RESIDENT_LIMIT, max_batch=MODEL_SCHEDULER_MAX_BATCH,
+                 max_wait=MODEL_SCHEDULER_MAX_WAIT, keep_alive=OLLAMA_KEEP_ALIVE, idle_keep_alive=MODEL_IDLE_KEEP_ALIVE):
+        self.client = client
+        self.resident_limit = max(1, resident_limit)
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.keep_alive = keep_alive
+        self.idle_keep_alive = idle_keep_alive
+        self.resident = OrderedDict()  # model -> in-flight requests, least recently used first
+        self.waiting = OrderedDict()  # ticket -> (model, enqueued at)
+        self.expected = Counter()  # Working-set models declared by running pipelines
+        self.requests = Counter()
+        self.loads = 0
+        self.swaps = 0
+        self.wait_seconds = 0.0
+        self._streak = Counter()
+        self._tickets = itertools.count()
+        self._cond = threading.Condition()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    @contextmanager
+    def working_set(self, models):
+        """Declares the models a pipeline will keep returning to while the block runs."""
+        models = {m for m in models if m}
+        with self._cond:
+            self.expected.update(models)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.expected.subtract(models)
+                self.expected += Counter()  # Drop models no pipeline expects any more
+
+    def _waiting_models(self, exclude=None):
+        return Counter(model for model, _ in self.waiting.values() if model != exclude)
+
+    def _oldest_wait(self, exclude=None):
+        now = time.monotonic()
+        return max((now - since for model, since in self.waiting.values() if model != exclude), default=0.0)
+
+    def _starving_others(self, model):
+        others = self._waiting_models(exclude=model)
+        if not others or any(m in self.resident for m in others):
+            return False
+        return self._streak[model] >= self.max_batch or self._oldest_wait(exclude=model) >= self.max_wait
+
+    def _next_to_load(self):
+        """The non-resident waiting model that should be loaded next."""
+        candidates = {}
+        now = time.monotonic()
+        for model, since in self.waiting.values():
+            if model in self.resident:
+                continue
+            count, oldest = candidates.get(model, (0, 0.0))
+            candidates[model] = (count + 1, max(oldest, now - since))
+        if not candidates:
+            return None
+        overdue = [m for m, (_, oldest) in candidates.items() if oldest >= self.max_wait]
+        if overdue:
+            return max(overdue, key=lambda m: candidates[m][1])
+        return max(candidates, key=lambda m: candidates[m])
+
+    def _evictable(self):
+        idle = [m for m, in_flight in self.resident.items() if in_flight == 0]
+        if not idle:
+            return None
+        waiting = self._waiting_models()
+        # Least recently used among the idle models nobody is queued for, else the least wanted one
+        unwanted = [m for m in idle if not waiting[m]]
+        return unwanted[0] if unwanted else min(idle, key=lambda m: waiting[m])
+
+    def _can_admit(self, model):
+        if model in self.resident:
+            return not self._starving_others(model)
+        if model != self._next_to_load():
+            return False
+        return len(self.resident) < self.resident_limit or self._evictable() is not None
+
+    def _admit(self, model):
+        if model not in self.resident:
+            if len(self.resident) >= self.resident_limit:
+                evicted = self._evictable()
+                del self.resident[evicted]
+                self._streak.pop(evicted, None)
+                self.swaps += 1
+            self.loads += 1
+            self._streak[model] = 0
+            self.resident[model] = 0
+        self.resident[model] += 1
+        self.resident.move_to_end(model)
+        if self._waiting_models(exclude=model):
+            self._streak[model] += 1
+        else:
+            self._streak[model] = 0
+        self.requests[model] += 1
+
+    def _acquire(self, model):
+        with self._cond:
+            ticket = next(self._tickets)
+            started = time.monotonic()
+            self.waiting[ticket] = (model, started)
+            try:
+                while not self._can_admit(model):
+                    # Wake up periodically so max_wait is honoured without a notifier
+                    self._cond.wait(timeout=min(1.0, self.max_wait or 1.0))
+            finally:
+                del self.waiting[ticket]
+            self._admit(model)
+            self.wait_seconds += time.monotonic() - started
+            self._cond.notify_all()
+
+    def _release(self, model):
+        with self._cond:
+            self.resident[model] -= 1
+            self._cond.notify_all()
+
+    def _keep_alive(self, model, kwargs):
+        if not self.expected:
+            return kwargs.get("keep_alive", self.keep_alive)
+        return self.keep_alive if model in self.expected else self.idle_keep_alive
+
+    def chat(self, model="", messages=None, stream=False, **kwargs):
+        kwargs["keep_alive"] = self._keep_alive(model, kwargs)
+        if stream:
+            return self._stream_chat(model, messages, **kwargs)
+        self._acquire(model)
+        try:
+            return self.client.chat(model=model, messages=messages, **kwargs)
+        finally:
+            self._release(model)
+
+    def _stream_chat(self, model, messages, **kwargs):
+        # Admission happens on the first read, and the model stays busy until the stream is closed
+        self._acquire(model)
+        chunks = None
+        try:
+            chunks = self.client.chat(model=model, messages=messages, stream=True, **kwargs)
+            yield from chunks
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+            self._release(model)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "requests": sum(self.requests.values()),
+                "per_model": dict(self.requests),
+                "loads": self.loads,
+                "swaps": self.swaps,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "resident": list(self.resident),
+            }
+
+    def report(self):
+        stats = self.stats()
+        per_model = ", ".join(f"{m}: {n}" for m, n in sorted(stats["per_model"].items()))
+        display_console(
+            f"Requests: {stats['requests']} ({per_model}) | Loads: {stats['loads']} | "
+            f"Swaps: {stats['swaps']} | Queued: {stats['wait_seconds']:.1f}s",
+            "Model Scheduler", "blue"
+        )
@@ -0,0 +1,183 @@
+# core/output_buffer.py
+
+import codecs
+import contextvars
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+from agentic_toolset.config import SANDBOX_MAX_OUTPUT, OUTPUT_TAIL_BYTES, TRACEBACK_MAX_FRAMES
+
+TRACEBACK_HEADER = "Traceback (most recent call last):"
+_FRAME = re.compile(r'^\s*File "(?P<path>[^"]+)", line \d+')
+# Frames from the interpreter or installed packages rather than the project
+_LIBRARY_PATH = re.compile(r"([/\\](site|dist)-packages[/\\])|([/\\]lib[/\\]python\d[\d.]*[/\\])|(^<)", re.IGNORECASE)
+
+
+def omitted_marker(count, unit="characters"):
+    return f"\n... [{count} {unit} omitted] ...\n"
+
+
+class OutputBuffer:
+    """Keeps the first ``head`` and last ``tail`` characters of a stream.
+
+    Text past the head goes into a ring of chunks that is trimmed as it
+    grows, so memory stays bounded however much is written, and the end of
+    the output (usually where the error is) is never lost. A ``head`` of 0
+    keeps everything.
+    """
+
+    def __init__(self, head=SANDBOX_MAX_OUTPUT, tail=OUTPUT_TAIL_BYTES):
+        self.head_limit = head or sys.maxsize
+        self.tail_limit = tail
+        self.total = 0
+        self._head = []
+        self._head_size = 0
+        self._tail = deque()
+        self._tail_size = 0
+
+    def write(self, text):
+        self.total += len(text)
+        room = self.head_limit - self._head_size
+        if room > 0:
+            self._head.append(text[:room])
+            self._head_size += min(room, len(text))
+            text = text[room:]
+        if not text or not self.tail_limit:
+            return
+        self._tail.append(text)
+        self._tail_size += len(text)
+        while self._tail_size - len(self._tail[0]) >= self.tail_limit:
+            self._tail_size -= len(self._tail.popleft())
+
+    @property
+    def omitted(self):
+        return self.total - self._head_size - min(self._tail_size, self.tail_limit)
+
+    @property
+    def truncated(self):
+        return self.omitted > 0
+
+    def getvalue(self):
+        head = "".join(self._head)
+        tail = "".join(self._tail)[-self.tail_limit:] if self.tail_limit else ""
+        return head + omitted_marker(self.omitted) + tail if self.omitted else head + tail
+
+
+def stream_process(command, on_output=None, head=SANDBOX_MAX_OUTPUT, tail=OUTPUT_TAIL_BYTES, timeout=None,
+                   **popen_kwargs):
+    """Runs ``command``, reading its output incrementally instead of all at once.
+
+    ``on_output(stream, text)`` is called with chunks as they arrive, from
+    reader threads running in a copy of the caller's context (so display
+    listeners such as a daemon job's still receive them), and each stream
+    is kept in an OutputBuffer. Returns a CompletedProcess
+    whose stdout/stderr are the head+tail windows, with ``timed_out``,
+    ``truncated`` and ``duration`` attributes added.
+    """
+    started = time.monotonic()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **popen_kwargs)
+    buffers = {"stdout": OutputBuffer(head, tail), "stderr": OutputBuffer(head, tail)}
+    lock = threading.Lock()
+
+    def pump(pipe, stream):
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        while True:
+            data = os.read(pipe.fileno(), 65536)
+            text = decoder.decode(data, final=not data)
+            if text:
+                with lock:
+                    buffers[stream].write(text)
+                    if on_output:
+                        on_output(stream, text)
+            if not data:
+                break
+        pipe.close()
+
+    readers = [threading.Thread(target=contextvars.copy_context().run, args=(pump, pipe, stream), daemon=True)
+               for pipe, stream in ((process.stdout, "stdout"), (process.stderr, "stderr"))]
+    for reader in readers:
+        reader.start()
+    timed_out = False
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        process.kill()
+        process.wait()
+    for reader in readers:
+        # Grandchildren may hold the pipes open after a kill
+        reader.join(timeout=5 if timed_out else None)
+
+    with lock:
+        result = subprocess.CompletedProcess(command, process.returncode, buffers["stdout"].getvalue(),
+                                             buffers["stderr"].getvalue())
+        result.truncated = any(b.truncated for b in buffers.values())
+    result.timed_out = timed_out
+    result.duration = time.monotonic() - started
+    return result
+
+
+def _is_project_frame(path, paths):
+    if _LIBRARY_PATH.search(path):
+        return False
+    path = os.path.abspath(path)
+    return not paths or any(path.startswith(p.rstrip(os.sep) + os.sep) for p in paths)
+
+
+def _split_traceback(lines):
+    """Splits the lines after a traceback header into frames (lists of lines) and the exception lines."""
+    frames, index = [], 0
+    while index < len(lines) and _FRAME.match(lines[index]):
+        frame = [lines[index]]
+        index += 1
+        # Source and caret lines are indented further than "File"
+        while index < len(lines) and lines[index].startswith("    ") and not _FRAME.match(lines[index]):
+            frame.append(lines[index])
+            index += 1
+        frames.append(frame)
+    return frames, lines[index:]
+
+
+def extract_traceback(stderr, paths=(), max_frames=TRACEBACK_MAX_FRAMES, max_chars=4000):
+    """Reduces stderr to the part the bug fixer needs.
+
+    Keeps the last traceback's frames that are in the project (under
+    ``paths`` when given, and never in site-packages), at most ``max_frames`` of them counting from the innermost,
+    plus the innermost frame wherever it is and the exception itself.
+    Library frames in between are replaced by a count. Output without a
+    traceback is cut to its last ``max_chars`` characters.
+    """
+    stderr = stderr.strip()
+    lines = stderr.splitlines()
+    starts = [i for i, line in enumerate(lines) if line.startswith(TRACEBACK_HEADER)]
+    if not starts:
+        return stderr[-max_chars:]
+
+    paths = [os.path.abspath(p) for p in paths]
+    frames, exception = _split_traceback(lines[starts[-1] + 1:])
+    keep = [i for i, frame in enumerate(frames) if _is_project_frame(_FRAME.match(frame[0])["path"], paths)]
+    keep = set(keep[-max_frames:]) | ({len(frames) - 1} if frames else set())
+
+    out = []
+    if len(starts) > 1:
+        # A chained exception is summarised by its exception line and the "During handling..." sentence
+        _, cause = _split_traceback(lines[starts[-2] + 1:starts[-1]])
+        out = [line for line in cause if line.strip()]
+    out.append(TRACEBACK_HEADER)
+    skipped = 0
+    for i, frame in enumerate(frames):
+        if i not in keep:
+            skipped += 1
+            continue
+        if skipped:
+            out.append(f"  ... {skipped} library frame(s) omitted ...")
+            skipped = 0
+        out.extend(frame)
+    out.extend(exception)
+    text = "\n".join(out)
+    return text if len(text) <= max_chars else text[-max_chars:]
@@ -1,73 +1,293 @@
 # core/project_manager.py
 
 import os
+from contextlib import nullcontext
 from agentic_toolset.utils.display import display_console
+from agentic_toolset.utils.llm import chat_text
+from agentic_toolset.agents.reviewer import review_approves
+from agentic_toolset.core.task_graph import TaskGraph
+from agentic_toolset.core.repair_loop import RepairLoop
+from agentic_toolset.core.context_window import ContextWindow
+from agentic_toolset.core.project_writer import ProjectWriter, fenced_files
+from agentic_toolset.core.static_gate import StaticGate
+from agentic_toolset.core.checkpoint import CheckpointStore, venv_fingerprint
+from agentic_toolset.core.speculation import SpeculativeCoder
+from agentic_toolset.core.fast_path import TaskRouter, project_slug, slugify, local_review, objective_digest
+from agentic_toolset.core.llm_client import LLMError
+
+# Libraries every project venv starts with
+BASE_LIBRARIES = ["rich", "ollama"]
 
 class ProjectManager:
-    def __init__(self, client, overseer, architect, code_reviewer, venv_manager, consultant=None, coder=None):
-        from agentic_toolset.config import ORCHESTRATOR_MODEL, SUBAGENT_MODEL
+    def __init__(self, client, overseer, architect, code_reviewer, venv_manager, consultant=None, coder=None,
+                 projects_root="Projects", base_libraries=BASE_LIBRARIES, memory=None):
+        from agentic_toolset.config import (
+            ORCHESTRATOR_MODEL, SUBAGENT_MODEL, CONTEXT_SUMMARY_MODEL, OLLAMA_KEEP_ALIVE, STATIC_GATE_ENABLED,
+            STATIC_GATE_INSTALL, CHECKPOINT_ENABLED, SPECULATIVE_CANDIDATES, FAST_PATH_ENABLED
+        )
         self.client = client
         self.orchestrator_model = ORCHESTRATOR_MODEL
         self.subagent_model = SUBAGENT_MODEL
+        self.summary_model = CONTEXT_SUMMARY_MODEL
+        self.keep_alive = OLLAMA_KEEP_ALIVE
+        self.static_gate = STATIC_GATE_ENABLED
+        self.install_imports = STATIC_GATE_INSTALL
+        self.checkpointing = CHECKPOINT_ENABLED
+        self.speculative_candidates = SPECULATIVE_CANDIDATES
+        self.fast_path = FAST_PATH_ENABLED
+        self.router = TaskRouter(client)
         self.overseer = overseer
         self.architect = architect
         self.code_reviewer = code_reviewer
         self.venv_manager = venv_manager
         self.consultant = consultant
         self.coder = coder
+        self.memory = memory  # Optional SolutionMemory of past runs
         self.task_log = []
+        self.repair_attempts = []
         self.project_files = []
+        self.writer = None
+        self.checkpoint = None
+        self.verified = None  # Speculative candidate that already ran cleanly
+        self.dry_run = False
+        self.projects_root = projects_root
+        self.base_libraries = list(base_libraries)
         self.output_dir = None  # Set dynamically based on the project
+        self._examples = None  # (objective, formatted past solutions)
 
-    def manage_task(self, objective, file_content=None, dry_run=False):
-        display_console(f"Managing task: {objective}", "ProjectManager Init", "blue")
+    def working_models(self):
+        """Models this pipeline returns to on every iteration."""
+        models = [self.orchestrator_model, self.summary_model, self.code_reviewer.reviewer_model,
+                  self.code_reviewer.bugfixer_model]
+        if self.coder:
+            models.append(self.coder.coder_model)
+        else:
+            models.append(self.subagent_model)
+        if self.memory:
+            models.append(self.memory.model)
+        return models
 
-        # 🔧 Suggest output folder name using LLM
-        folder_name = self.suggest_project_name(objective)
-        self.output_dir = os.path.join("Projects", folder_name)
-        os.makedirs(self.output_dir, exist_ok=True)
+    def manage_task(self, objective, file_content=None, dry_run=False, resume=None):
+        """Runs the orchestrator loop for ``objective``; ``resume`` is a loaded checkpoint to continue from."""
+        # Tell a model scheduler, if the client has one, which models to keep loaded
+        working_set = getattr(self.client, "working_set", None)
+        with working_set(self.working_models()) if working_set else nullcontext():
+            return self._manage_task(objective, file_content, dry_run, resume)
 
-        # 🏗 Create project file structure
-        project_type = self.architect.create_project_structure(objective, self.output_dir)
-        self.project_files = self.architect.create_architecture(objective, project_type, self.output_dir)
+    def _manage_task(self, objective, file_content=None, dry_run=False, resume=None):
+        display_console(f"Managing task: {objective}", "ProjectManager Init", "blue")
+        self.dry_run = dry_run
+        self.verified = None
+
+        # 🔧 Name the project, scaffold it and prepare the venv; the venv
+        # steps don't depend on the project name, so they overlap with it
+        setup = TaskGraph()
+        libraries = list(self.base_libraries)
+        if resume:
+            setup.add("restore", lambda: self.restore_project(resume))
+            # Reinstall whatever the checkpointed venv had, in case it was cleaned up
+            libraries += [d for d in resume.get("venv", {}).get("distributions", []) if d not in libraries]
+        else:
+            setup.add("suggest_name", lambda: self.suggest_project_name(objective), model=self.orchestrator_model)
+            setup.add("scaffold", lambda: self.scaffold_project(objective, setup.results["suggest_name"]),
+                      deps=["suggest_name"])
+        setup.add("create_venv", lambda: self.venv_manager.create_venv(self.base_libraries))
+        setup.add("install_libraries", lambda: self.venv_manager.install_libraries(libraries),
+                  deps=["create_venv"])
+        setup.run()
+        setup.report("Project Setup")
 
-        # 🛠 Prepare environment
-        self.venv_manager.create_venv()
-        self.venv_manager.install_libraries(["rich", "ollama"])
+        previous_results = ContextWindow(summarizer=self.summarize_result if self.summary_model else None)
+        pending = None
+        if resume:
+            previous_results.restore(resume.get("context", {}))
+            self.task_log = list(resume.get("task_log", []))
+            file_content = resume.get("file_content", file_content)
+            pending = resume.get("pending")
+        self.checkpoint = CheckpointStore(self.output_dir) if self.checkpointing else None
+        self.save_checkpoint(objective, previous_results, file_content, pending)
 
-        previous_results = []
-        task_complete = False
+        if self.memory and not resume and file_content is None:
+            # A near-identical objective that was solved before is run again instead of regenerated
+            final_output = self.reuse_solution(objective, previous_results)
+            if final_output is not None:
+                self.save_checkpoint(objective, previous_results, status="completed")
+                if not dry_run:
+                    self.venv_manager.cleanup()
+                return final_output
 
-        while not task_complete:
-            display_console("Breaking down task with Orchestrator...", "ProjectManager", "blue")
-            response_text, file_content = self.call_orchestrator(objective, file_content, previous_results)
+        while True:
+            if pending:
+                # The orchestrator and review for this iteration finished before the run stopped
+                display_console(f"Resuming iteration {len(self.task_log) + 1} from checkpoint.", "ProjectManager", "blue")
+                response_text, approved = pending["response"], pending["approved"]
+                pending = None
+            else:
+                display_console("Breaking down task with Orchestrator...", "ProjectManager", "blue")
+                response_text, file_content = self.call_orchestrator(objective, file_content, previous_results)
 
-            # 🧠 Run code review before deciding finalization
-            review_summary = self.code_reviewer.review_code(response_text)
-            if any(k in review_summary.lower() for k in ["looks good", "no issues", "well written"]):
-                task_complete = True
+                # 🧠 Run code review before deciding finalization, unless the response can't pass anyway
+                approved = local_review(response_text) if self.fast_path else None
+                if approved is None:
+                    review_summary = self.code_reviewer.review_code(response_text)
+                    approved = review_approves(review_summary)
+                else:
+                    display_console("No runnable code in this response; skipping review.", "Fast Path", "blue")
+            iteration = {"response": response_text, "approved": approved}
+            self.save_checkpoint(objective, previous_results, file_content, iteration)
 
-            if task_complete or self.is_task_finalized(objective, response_text):
+            if approved or self.is_task_finalized(objective, response_text):
                 display_console("Finalizing and writing script...", "ProjectManager", "green")
                 self.write_to_project_files(response_text)
+                self.save_checkpoint(objective, previous_results, file_content, iteration)
 
                 if dry_run:
                     display_console("Dry run: skipping execution of generated code.", "Dry Run", "yellow")
                     return "Dry run completed. Code written but not executed."
 
                 final_output = self.execute_project()
-                self.venv_manager.cleanup()
+                self.save_checkpoint(objective, previous_results, file_content, iteration,
+                                     status="completed" if final_output is not None else "failed")
+                if final_output is not None:
+                    self.remember_solution(objective, final_output)
+                    self.venv_manager.cleanup()
                 return final_output
 
             # 🔁 Continue to next sub-task
             sub_task_result = self.delegate_task(response_text)
-            previous_results.append(sub_task_result)
+            previous_results.add(sub_task_result)
             self.task_log.append({"task": response_text, "result": sub_task_result})
+            self.save_checkpoint(objective, previous_results, file_content)
             display_console(f"Sub-task completed: {sub_task_result}", "Sub-task", "cyan")
 
+            if self.verified is not None:
+                # A speculative candidate already passed the static gate and ran cleanly in a copy of the project
+                final_output = self.accept_candidate(self.verified)
+                self.save_checkpoint(objective, previous_results, file_content, status="completed")
+                self.remember_solution(objective, final_output)
+                self.venv_manager.cleanup()
+                return final_output
+
+    def save_checkpoint(self, objective, context, file_content=None, pending=None, status="running"):
+        """Persists the run so ``--resume`` can continue after the last finished LLM call."""
+        if self.checkpoint is None:
+            return
+        try:
+            self.checkpoint.save({
+                "objective": objective,
+                "status": status,
+                "iteration": len(self.task_log),
+                "pending": pending,
+                "context": context.state(),
+                "task_log": self.task_log,
+                "file_content": file_content,
+                "layout": self.writer.layout,
+                "file_hashes": self.writer.hashes,
+                "venv": venv_fingerprint(self.venv_manager),
+            })
+        except (OSError, TypeError, ValueError) as e:
+            display_console(f"Could not save checkpoint: {e}", "Checkpoint", "yellow")
+
+    def reuse_solution(self, objective, previous_results):
+        """Writes and runs the stored solution to a near-identical objective.
+
+        A solution stored under different wording is only used if the
+        reviewer approves it for this objective. Returns the run's output,
+        or None when there is no such solution or it no longer runs; in the
+        latter case the orchestrator is told about it.
+        """
+        match = self.memory.match(objective)
+        if match is None:
+            return None
+        score, entry = match
+        if not self.memory.is_same_objective(objective, entry):
+            # Similar wording can ask for different behaviour (another format, limit or library)
+            if not review_approves(self.code_reviewer.review_code(fenced_files(entry["files"]), objective)):
+                display_console(f"The solution to '{entry['objective']}' (similarity {score:.3f}) does not fit "
+                                "this objective; generating a new one.", "Memory", "yellow")
+                return None
+        self.memory.stats["reused"] += 1
+        display_console(f"Reusing the solution to '{entry['objective']}' (similarity {score:.3f}).", "Memory", "blue")
+        files = [os.path.join(self.output_dir, rel) for rel in entry["files"]]
+        self.project_files += [f for f in files if f not in self.project_files]
+        self.writer.add_layout(files)
+        for rel, code in entry["files"].items():
+            self.writer.write(rel, code)
+        if self.dry_run:
+            display_console("Dry run: skipping execution of generated code.", "Dry Run", "yellow")
+            return "Dry run completed. Code written but not executed."
+        final_output = self.execute_project()
+        if final_output is None:
+            previous_results.add(f"A stored solution to '{entry['objective']}' was written to the project "
+                                 "but failed to run here; fix or replace it.")
+        return final_output
+
+    def remember_solution(self, objective, output):
+        """Adds the project's Python files to memory after a clean run."""
+        if not self.memory or self.dry_run:
+            return
+        files = {}
+        for rel in self.writer.layout:
+            path = os.path.join(self.output_dir, rel)
+            if rel.endswith(".py") and os.path.isfile(path):
+                with open(path) as f:
+                    files[rel] = f.read()
+        self.memory.add_solution(objective, files, output or "")
+
+    def restore_project(self, state):
+        """Points the manager at a checkpointed project without scaffolding it again."""
+        self.output_dir = state["output_dir"]
+        self.project_files = [os.path.join(self.output_dir, rel) for rel in state.get("layout", [])]
+        self.writer = ProjectWriter(self.output_dir, self.project_files)
+        changed = self.writer.restore(state.get("file_hashes", {}))
+        if changed:
+            display_console(f"Files changed since the checkpoint (keeping the versions on disk): {', '.join(changed)}",
+                            "Checkpoint", "yellow")
+        venv = state.get("venv", {})
+        reused = venv.get("path") and not venv.get("pooled") and os.path.exists(venv["path"])
+        display_console(
+            f"Resuming {self.output_dir} after {state.get('iteration', 0)} iteration(s); "
+            + ("reusing venv " + venv["path"] if reused else "rebuilding venv from its fingerprint"),
+            "Checkpoint", "blue"
+        )
+        return self.project_files
+
+    def scaffold_project(self, objective, folder_name):
+        self.output_dir = os.path.join(self.projects_root, folder_name)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # 🏗 Create project file structure
+        project_type = self.architect.create_project_structure(objective, self.output_dir)
+        self.project_files = self.architect.create_architecture(objective, project_type, self.output_dir)
+        self.writer = ProjectWriter(self.output_dir, self.project_files)
+        return self.project_files
+
+    def layout_instructions(self):
+        """Asks for one labelled code block per file when the project has several files."""
+        if len(self.project_files) < 2:
+            return ""
+        files = ", ".join(os.path.relpath(p, self.output_dir) for p in self.project_files)
+        return (
+            f"\n\nThe project has these files: {files}. Return one fenced code block per file, "
+            "with the file's relative path as a comment on its first line (e.g. `# utils/helpers.py`)."
+        )
+
     def suggest_project_name(self, objective):
+        """A folder name for the objective, suffixed with a hash of it.
+
+        Different objectives that start the same way would otherwise share
+        a folder and overwrite each other's files and checkpoints; the same
+        objective keeps mapping to the same folder.
+        """
+        return f"{self._project_name(objective)}_{objective_digest(objective)}"
+
+    def _project_name(self, objective):
+        slug = project_slug(objective) if self.fast_path else None
+        if slug:
+            return slug
         try:
-            response = self.client.chat(
+            response_text = chat_text(
+                self.client,
                 model=self.orchestrator_model,
                 messages=[{
                     "role": "user",
@@ -76,10 +296,11 @@ class ProjectManager:
                         "Suggest a short folder-safe name (3-5 words, lowercase, underscores only). "
                         "Only return the name. No explanation or formatting."
                     )
-                }]
+                }],
+                agent="project_namer"
             )
-            return response['message']['content'].strip().replace(" ", "_")
-        except Exception as e:
+            return slugify(response_text) or "default_project"
+        except LLMError as e:
             display_console(f"Folder naming error: {e}. Defaulting to fallback folder.", "Error", "red")
             return "default_project"
 
@@ -87,46 +308,92 @@ class ProjectManager:
         return "def " in response_text and ("__main__" in response_text or "print" in response_text)
 
     def delegate_task(self, task_prompt):
-        if "architecture" in task_prompt:
-            return self.architect.create_architecture(task_prompt, "multi-file", self.output_dir)
-        elif "review code" in task_prompt:
+        routes = ["architecture", "review", "bug_fix", "code"]
+        if self.consultant:
+            routes.insert(2, "consult")
+        route = self.router.route(task_prompt, routes, fallback_model=self.orchestrator_model)
+
+        if route == "architecture":
+            files = self.architect.create_architecture(task_prompt, "multi-file", self.output_dir)
+            self.project_files += [f for f in files if f not in self.project_files]
+            self.writer.add_layout(files)
+            return files
+        elif route == "review":
             return self.code_reviewer.review_code(task_prompt)
-        elif "consult" in task_prompt and self.consultant:
+        elif route == "consult":
             return self.consultant.provide_advice(task_prompt)
-        elif "bug fix" in task_prompt:
+        elif route == "bug_fix":
             return self.code_reviewer.fix_bugs(task_prompt)
         elif self.coder:
-            return self.coder.generate_code(task_prompt)
+            prompt = task_prompt + self.layout_instructions()
+            files = max(1, len(self.project_files))
+            if self.speculative_candidates > 1 and not self.dry_run:
+                return self.speculate(prompt, files)
+            return self.coder.generate_code(prompt, files=files)
         else:
             return self.call_sub_agent(task_prompt)
+
+    def speculate(self, prompt, files):
+        """Samples several coder candidates in parallel.
+
+        A candidate that ran cleanly and is a complete program is kept in
+        ``self.verified`` so the run can finish without another iteration.
+        """
+        speculative = SpeculativeCoder(self.coder, self.venv_manager, self.output_dir, self.project_files,
+                                       count=self.speculative_candidates, install=self.install_imports)
+        candidate = speculative.run(prompt, files)
+        if candidate.ok:
+            if self.is_task_finalized(prompt, candidate.response):
+                self.verified = candidate
+            return candidate.response
+        feedback = candidate.feedback()
+        return f"{candidate.response}\n\nExecution feedback:\n{feedback}" if feedback else candidate.response
+
+    def accept_candidate(self, candidate):
+        """Writes a verified candidate into the project and returns the output of its run."""
+        display_console("Finalizing with the verified candidate...", "ProjectManager", "green")
+        self.write_to_project_files(candidate.response)
+        self.repair_attempts = []
+        stdout = candidate.result.stdout.strip()
+        display_console(f"{candidate.result.summary()}\n\n{stdout}", "Execution Output", "green")
+        return stdout
+
     def write_to_project_files(self, content):
-        # 🧹 Strip Markdown code fences if present
-        if content.strip().startswith("```"):
-            content = "\n".join(
-                line for line in content.strip().splitlines()
-                if not line.strip().startswith("```")
-            )
-    
-        main_file = os.path.join(self.output_dir, "src", "main.py")
-        os.makedirs(os.path.dirname(main_file), exist_ok=True)
-        with open(main_file, "w") as f:
-            f.write(content)
+        # 🧹 Split the response into per-file code blocks; unchanged files are not rewritten
+        results = self.writer.write_response(content)
+        lines = []
+        for result in results:
+            status = "written" if result.changed else "unchanged"
+            if result.repaired:
+                status += ", prose stripped"
+            lines.append(f"{result.path}: {status}")
+            if result.error:
+                lines.append(result.error)
         display_console(
-            f"Code written to: {main_file}\n\nContent size: {len(content)} characters",
-            "File Write", "green"
+            f"Code written to: {self.output_dir}\n\n" + ("\n".join(lines) or "No code blocks found."),
+            "File Write", "red" if any(r.error for r in results) else "green"
         )
+        return results
 
     def execute_project(self):
         main_script_path = os.path.join(self.output_dir, "src", "main.py")
         try:
-            stdout, stderr = self.venv_manager.run_script(main_script_path)
+            # Compile, lint and install imports in-process before anything runs
+            gate = StaticGate(self.output_dir, self.writer.layout, self.venv_manager,
+                              install=self.install_imports) if self.static_gate else None
+            # The project root is importable so src/main.py can use utils/ and config/
+            repair = RepairLoop(self.venv_manager, self.code_reviewer, paths=[self.output_dir], gate=gate,
+                                memory=self.memory, writer=self.writer)
+            result = repair.run(main_script_path, self.write_to_project_files)
+            self.repair_attempts = [a.to_dict() for a in repair.attempts]
+            repair.report()
 
-            if stderr:
-                display_console(f"Execution failed. Attempting to fix via reviewer...", "Execution Error", "red")
-                fixed_code = self.code_reviewer.fix_bugs(stderr)
-                self.write_to_project_files(fixed_code)
-                return self.execute_project()  # Retry after fix
+            if not result.ok:
+                display_console(f"Giving up: {repair.stop_reason}.\n\n{result.stderr.strip()}",
+                                "Execution Failed", "red")
+                return None
 
+            stdout = result.stdout.strip()
             display_console(stdout, "Execution Output", "green")
             return stdout
 
@@ -134,36 +401,110 @@ class ProjectManager:
             display_console(f"Script execution raised an exception:\n{str(e)}", "Fatal Error", "red")
             return None
 
+    def memory_examples(self, objective):
+        """Past solutions to similar objectives, looked up once per objective."""
+        if not self.memory:
+            return ""
+        if self._examples is None or self._examples[0] != objective:
+            examples = self.memory.solution_examples(objective)
+            if examples:
+                display_console(f"Found similar past solutions:\n{examples[:500]}", "Memory", "blue")
+            self._examples = (objective, examples)
+        return self._examples[1]
+
     def call_orchestrator(self, objective, file_content, previous_results):
+        examples = self.memory_examples(objective)
+        if examples:
+            examples = f"\n\nSimilar objectives solved before (these ran cleanly; reuse what applies):\n\n{examples}"
+        if isinstance(previous_results, ContextWindow):
+            history = previous_results.render()
+        else:
+            history = f"{previous_results}"
         try:
-            response = self.client.chat(
+            # The objective goes first and never changes between iterations, so the
+            # server can reuse its cached prompt prefix while the model stays loaded
+            response_text = chat_text(
+                self.client,
                 model=self.orchestrator_model,
-                messages=[{
-                    "role": "user",
-                    "content": (
-                        f"Objective: {objective}\n"
-                        f"Previous sub-task results: {previous_results}\n"
-                        "Please break down the objective into the next sub-task, and create a prompt for a sub-agent."
-                    )
-                }]
+                messages=[
+                    {"role": "system", "content": f"Objective: {objective}{examples}"},
+                    {
+                        "role": "user",
+                        "content": (
+                            f"Previous sub-task results:\n{history}\n\n"
+                            "Please break down the objective into the next sub-task, and create a prompt for a sub-agent."
+                            + self.layout_instructions()
+                        )
+                    }
+                ],
+                title="Orchestrator Output", color="green", agent="orchestrator",
+                keep_alive=self.keep_alive
             )
-            response_text = response['message']['content']
-            display_console(response_text, "Orchestrator Output", "green")
             return response_text, file_content
-        except Exception as e:
+        except LLMError as e:
             display_console(f"Orchestrator Error: {e}", "Error", "red")
-            return None, file_content
+            raise
+
+    def summarize_result(self, text):
+        """One-line summary of an older sub-task result using the cheap summary model."""
+        return chat_text(
+            self.client,
+            model=self.summary_model,
+            messages=[{
+                "role": "user",
+                "content": (
+                    "Summarize this sub-task result in one sentence, keeping names of files, "
+                    f"functions and errors:\n\n{text}"
+                )
+            }],
+            agent="summarizer",
+            keep_alive=self.keep_alive
+        )
 
     def call_sub_agent(self, prompt):
         try:
             display_console("Calling Sub-agent...", "Sub-agent", "yellow")
-            response = self.client.chat(
+            return chat_text(
+                self.client,
                 model=self.subagent_model,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": prompt}],
+                title="Sub-agent Result", color="blue", agent="sub_agent"
             )
-            response_text = response['message']['content']
-            display_console(response_text, "Sub-agent Result", "blue")
-            return response_text
-        except Exception as e:
+        except LLMError as e:
             display_console(f"Sub-agent Error: {e}", "Error", "red")
-            return None
+            raise
+
+
+def build_project_manager(client_for, venv_manager, projects_root="Projects", base_libraries=BASE_LIBRARIES,
+                          memory=None):
+    """Creates a ProjectManager with a fresh set of agents.
+
+    ``client_for(agent_name)`` returns the LLM client each agent should use.
+    ``memory`` turns the index of past solutions on or off; by default
+    MEMORY_ENABLED decides.
+    """
+    from agentic_toolset.config import MEMORY_ENABLED
+    from agentic_toolset.agents.overseer import OverseerAgent
+    from agentic_toolset.agents.architect import ArchitectAgent
+    from agentic_toolset.agents.reviewer import CodeReviewerAgent
+    from agentic_toolset.agents.consultant import ConsultantAgent
+    from agentic_toolset.agents.coder import CoderAgent
+
+    enabled = MEMORY_ENABLED if memory is None else memory
+    memory = None
+    if enabled:
+        # Imported here so NumPy is only loaded when memory is used
+        from agentic_toolset.core.memory import open_memory
+        memory = open_memory(client_for("memory"))
+    return ProjectManager(
+        client=client_for("project_manager"),
+        overseer=OverseerAgent(client_for("overseer")),
+        architect=ArchitectAgent(),
+        code_reviewer=CodeReviewerAgent(client_for("reviewer"), memory=memory),
+        venv_manager=venv_manager,
+        consultant=ConsultantAgent(client_for("consultant")),
+        coder=CoderAgent(client_for("coder")),
+        projects_root=projects_root,
+        base_libraries=base_libraries,
+        memory=memory
+    )
@@ -0,0 +1,272 @@
+# core/project_writer.py
+
+import ast
+import hashlib
+import keyword
+import os
+import re
+import tempfile
+
+from agentic_toolset.utils.display import display_console
+from agentic_toolset.utils.tracing import span
+
+FENCE = "```"
+PYTHON_LANGUAGES = ("", "python", "python3", "py")
+DEFAULT_TARGET = os.path.join("src", "main.py")
+
+# A file path on a line of its own: "# utils/helpers.py", "File: src/main.py", "**config/settings.py**"
+_PATH_PATTERN = re.compile(r"([\w.-]+(?:/[\w.-]+)*\.py)\b")
+_PATH_COMMENT = re.compile(r"^\s*#\s*(?:file(?:name)?\s*:\s*)?`?([\w.-]+(?:/[\w.-]+)*\.py)`?\s*$", re.IGNORECASE)
+_CONTINUATION = (",", "(", "[", "{", "\\", "=", "+", "-", "*", "/")
+
+
+class CodeBlock:
+    def __init__(self, code, language="", path=None, complete=True):
+        self.code = code
+        self.language = language
+        self.path = path
+        self.complete = complete
+
+    @property
+    def is_python(self):
+        return self.language in PYTHON_LANGUAGES
+
+
+class WriteResult:
+    def __init__(self, path, changed, error=None, repaired=False):
+        self.path = path
+        self.changed = changed
+        self.error = error
+        self.repaired = repaired
+
+
+def _path_hint(text):
+    match = _PATH_PATTERN.search(text or "")
+    return match.group(1) if match else None
+
+
+def _parse_info(info):
+    """Splits a fence info string such as ``python utils/helpers.py`` into (language, path)."""
+    language, path = "", None
+    for token in info.replace("title=", " ").replace("file=", " ").split():
+        token = token.strip("\"'`:")
+        if ".py" in token or "/" in token:
+            path = path or _path_hint(token)
+        elif not language:
+            language = token.lower()
+    return language, path
+
+
+def extract_code_blocks(text):
+    """Returns every fenced block in ``text`` as a CodeBlock.
+
+    The target path comes from the fence info string, a path comment on the
+    block's first line, or a path on the line just before the fence. A final
+    unterminated fence (e.g. from an early-stopped stream) yields a block
+    with ``complete=False``. Text without fences is returned as one block.
+    """
+    lines = text.splitlines()
+    fences = [i for i, line in enumerate(lines) if line.strip().startswith(FENCE)]
+    if not fences:
+        return [CodeBlock(text, path=_first_line_path(lines))]
+
+    blocks = []
+    for start, end in zip(fences[0::2], fences[1::2] + [None]):
+        body = lines[start + 1:end if end is not None else len(lines)]
+        language, path = _parse_info(lines[start].strip()[len(FENCE):])
+        path = path or _first_line_path(body) or _preceding_path(lines, start)
+        blocks.append(CodeBlock("\n".join(body), language, path, complete=end is not None))
+    return blocks
+
+
+def _first_line_path(lines):
+    for line in lines[:2]:
+        match = _PATH_COMMENT.match(line)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _preceding_path(lines, fence_index):
+    for line in reversed(lines[max(0, fence_index - 2):fence_index]):
+        if line.strip():
+            # Only short label lines, not prose that happens to mention a file
+            return _path_hint(line) if len(line.split()) <= 4 else None
+    return None
+
+
+def syntax_error(code, filename="<generated>"):
+    """Returns a traceback-style message for the first syntax error in ``code``, or None."""
+    try:
+        ast.parse(code, filename=filename)
+    except SyntaxError as e:
+        lines = [f'  File "{e.filename}", line {e.lineno}']
+        if e.text:
+            lines.append(f"    {e.text.rstrip()}")
+            if e.offset:
+                lines.append("    " + " " * (e.offset - 1 - (len(e.text) - len(e.text.lstrip()))) + "^")
+        lines.append(f"{type(e).__name__}: {e.msg}")
+        return "\n".join(lines)
+    return None
+
+
+def _looks_like_prose(line):
+    stripped = line.strip()
+    if not stripped or line[0].isspace() or stripped.startswith(("#", "@")) or stripped.endswith(_CONTINUATION):
+        return False
+    first_word = re.split(r"\W", stripped, maxsplit=1)[0]
+    if stripped.endswith(":") and (keyword.iskeyword(first_word) or keyword.issoftkeyword(first_word)):
+        return False  # Header of a compound statement such as "for item in items:"
+    if len(stripped.split()) < 3:
+        return False
+    try:
+        ast.parse(stripped)
+        return False
+    except SyntaxError:
+        return True
+
+
+def strip_prose(code):
+    """Drops explanatory prose lines before and after the code if that makes it parse."""
+    if syntax_error(code) is None:
+        return code
+    lines = code.splitlines()
+    while lines and (not lines[0].strip() or _looks_like_prose(lines[0])):
+        lines.pop(0)
+    while lines and (not lines[-1].strip() or _looks_like_prose(lines[-1])):
+        lines.pop()
+    trimmed = "\n".join(lines)
+    return trimmed if syntax_error(trimmed) is None else code
+
+
+def fenced_files(files):
+    """Formats a mapping of relative paths to code as fenced Python blocks headed by their paths."""
+    return "\n".join(f"{FENCE}python\n# {rel}\n{code.rstrip()}\n{FENCE}" for rel, code in files.items())
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def atomic_write(path, content):
+    """Writes via a temporary file and ``os.replace`` so readers never see a partial file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ProjectWriter:
+    """Writes model output into a project's files.
+
+    Fenced blocks are mapped onto the architect's layout by their path hints;
+    an unlabelled block goes to ``src/main.py``. Python blocks are checked
+    with ``ast.parse`` (after stripping surrounding prose) and files are only
+    rewritten when their content hash changes.
+    """
+
+    def __init__(self, output_dir, layout=()):
+        self.output_dir = output_dir
+        self.layout = [os.path.relpath(p, output_dir) for p in layout]
+        self.hashes = {}
+
+    def add_layout(self, paths):
+        for path in paths:
+            rel = os.path.relpath(path, self.output_dir)
+            if rel not in self.layout:
+                self.layout.append(rel)
+
+    def _resolve(self, hint):
+        """Maps a path hint onto a layout file, or a new file inside the project."""
+        hint = os.path.normpath(hint)  # Also drops a leading "./"
+        for rel in self.layout:
+            if rel == hint or rel.endswith(os.sep + hint) or hint.endswith(os.sep + rel):
+                return rel
+        by_name = [rel for rel in self.layout if os.path.basename(rel) == os.path.basename(hint)]
+        if len(by_name) == 1:
+            return by_name[0]
+        # A new file must stay inside the project
+        if os.path.isabs(hint) or hint == os.pardir or hint.startswith(os.pardir + os.sep):
+            return None
+        return hint
+
+    def restore(self, hashes):
+        """Loads the hashes of files already on disk; returns the files that differ from ``hashes``."""
+        self.hashes = {}
+        changed = []
+        for rel_path in self.layout:
+            path = os.path.join(self.output_dir, rel_path)
+            if os.path.exists(path):
+                with open(path) as f:
+                    self.hashes[rel_path] = content_hash(f.read())
+            if rel_path in hashes and self.hashes.get(rel_path) != hashes[rel_path]:
+                changed.append(rel_path)
+        return changed
+
+    def assign(self, blocks):
+        """Returns (relative path, block) pairs for the Python blocks in ``blocks``."""
+        python_blocks = [b for b in blocks if b.is_python]
+        assigned, unlabelled = {}, []
+        for block in python_blocks:
+            target = self._resolve(block.path) if block.path else None
+            if target:
+                assigned[target] = block  # A later block for the same file wins
+            else:
+                unlabelled.append(block)
+
+        default = DEFAULT_TARGET if DEFAULT_TARGET in self.layout or not self.layout else self.layout[0]
+        if unlabelled and default not in assigned:
+            # Prefer the block with the entry point when several are unlabelled
+            entry = next((b for b in unlabelled if "__main__" in b.code), unlabelled[0])
+            assigned[default] = entry
+            unlabelled.remove(entry)
+        if unlabelled:
+            display_console(f"Ignored {len(unlabelled)} code block(s) without a target file.", "File Write", "yellow")
+        return list(assigned.items())
+
+    def write(self, rel_path, content):
+        """Atomically writes one file; returns False when its content is unchanged."""
+        path = os.path.join(self.output_dir, rel_path)
+        digest = content_hash(content)
+        if self.hashes.get(rel_path) is None and os.path.exists(path):
+            with open(path) as f:
+                self.hashes[rel_path] = content_hash(f.read())
+        if self.hashes.get(rel_path) == digest:
+            return False
+        with span("write file", "file", path=path, bytes=len(content)):
+            atomic_write(path, content)
+        self.hashes[rel_path] = digest
+        if rel_path not in self.layout:
+            self.layout.append(rel_path)
+        return True
+
+    def write_response(self, text):
+        """Writes every code block in a model response; returns a WriteResult per file."""
+        results = []
+        for rel_path, block in self.assign(extract_code_blocks(text)):
+            code = strip_prose(block.code)
+            error = syntax_error(code, rel_path)
+            if not code.endswith("\n"):
+                code += "\n"
+            changed = self.write(rel_path, code)
+            results.append(WriteResult(rel_path, changed, error, repaired=code.strip() != block.code.strip()))
+        return results
+
+    def errors(self):
+        """Syntax errors in the project's current Python files, keyed by relative path."""
+        errors = {}
+        for rel_path in self.layout:
+            path = os.path.join(self.output_dir, rel_path)
+            if rel_path.endswith(".py") and os.path.exists(path):
+                with open(path) as f:
+                    error = syntax_error(f.read(), rel_path)
+                if error:
+                    errors[rel_path] = error
+        return errors
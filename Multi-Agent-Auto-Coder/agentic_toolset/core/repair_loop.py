@@ -0,0 +1,196 @@
+# core/repair_loop.py
+
+import hashlib
+import os
+import re
+import time
+
+from agentic_toolset.config import FIX_MAX_ATTEMPTS, FIX_TOKEN_BUDGET, FIX_TIME_BUDGET
+from agentic_toolset.core.llm_client import LLMError
+from agentic_toolset.core.output_buffer import extract_traceback
+from agentic_toolset.core.project_writer import fenced_files, syntax_error
+from agentic_toolset.core.sandbox import ExecutionResult
+from agentic_toolset.core.static_gate import format_diagnostics
+from agentic_toolset.utils.display import display_console
+
+# How much of stderr is sent to the bug fixer
+MAX_ERROR_CHARS = 4000
+
+
+def error_signature(stderr):
+    """Reduces an error to the part that identifies it across attempts.
+
+    Uses the final exception line plus the innermost file/line reference,
+    with addresses and numbers that vary between runs masked out.
+    """
+    lines = [line.strip() for line in stderr.strip().splitlines() if line.strip()]
+    if not lines:
+        return ""
+    frames = [line for line in lines if line.startswith('File "')]
+    key = lines[-1] + ("|" + frames[-1] if frames else "")
+    key = re.sub(r"0x[0-9a-fA-F]+", "0x?", key)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+class RepairAttempt:
+    def __init__(self, attempt, result, static=False):
+        self.attempt = attempt
+        self.static = static  # Failed the static gate; the script was not run
+        self.exit_code = result.exit_code
+        self.run_duration = result.duration
+        self.timed_out = result.timed_out
+        self.peak_rss_kb = result.peak_rss_kb
+        self.signature = error_signature(result.stderr) if not result.ok else None
+        self.fix_tokens = 0
+        self.fix_duration = 0.0
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class RepairLoop:
+    """Runs a script and repairs it with the bug fixer until it exits cleanly.
+
+    Failure is decided by exit code (or timeout), so warnings on stderr are
+    not treated as errors. Each fix round sends both the current code and
+    the relevant part of the traceback (see ``extract_traceback``) to
+    ``fix_from_error_log``. With a ``writer`` (see ProjectWriter) the code
+    is every Python file in its layout, so an error raised in a helper
+    module can be fixed where it occurs. The loop stops when the attempt, token or
+    wall-clock budget is spent, when an error signature repeats, or when
+    the fixer returns unchanged code.
+
+    With a ``gate`` (see StaticGate), each round is checked in-process
+    first and its diagnostics go to the fixer without running the script.
+    A diagnostic that survives a fix round is run for real, so a false
+    alarm costs one round at most.
+
+    With a ``memory`` (see SolutionMemory), a fix after which its error no
+    longer occurs is stored so later fix rounds can retrieve it.
+    """
+
+    def __init__(self, venv_manager, code_reviewer, max_attempts=FIX_MAX_ATTEMPTS,
+                 token_budget=FIX_TOKEN_BUDGET, time_budget=FIX_TIME_BUDGET, paths=(), gate=None, memory=None,
+                 writer=None):
+        self.venv_manager = venv_manager
+        self.writer = writer
+        self.memory = memory
+        self.gate = gate
+        self.paths = list(paths)  # Extra import paths, e.g. the project root for multi-file projects
+        self.code_reviewer = code_reviewer
+        self.max_attempts = max_attempts
+        self.token_budget = token_budget
+        self.time_budget = time_budget
+        self.attempts = []
+        self.tokens_used = 0
+        self.stop_reason = None
+        self._static_signatures = set()
+
+    def _read(self, script_path):
+        with open(script_path) as f:
+            return f.read()
+
+    def _project_files(self, script_path):
+        """The files the fixer sees, keyed by relative path: the writer's non-empty Python files, or just the script."""
+        if self.writer is None:
+            return {os.path.basename(script_path): self._read(script_path)}
+        files = {}
+        for rel in [os.path.relpath(script_path, self.writer.output_dir)] + self.writer.layout:
+            path = os.path.join(self.writer.output_dir, rel)
+            if rel.endswith(".py") and rel not in files and os.path.isfile(path):
+                files[rel] = self._read(path)
+        # Empty files such as package __init__.py have nothing to fix
+        return {rel: code for rel, code in files.items() if code.strip()}
+
+    def _out_of_budget(self, started):
+        if len(self.attempts) > self.max_attempts:
+            return f"reached the limit of {self.max_attempts} fix attempts"
+        if self.token_budget and self.tokens_used >= self.token_budget:
+            return f"used {self.tokens_used} of {self.token_budget} budgeted tokens"
+        if self.time_budget and time.monotonic() - started >= self.time_budget:
+            return f"exceeded the {self.time_budget:.0f}s time budget"
+        return None
+
+    def _static_check(self, script_path):
+        if self.gate is not None:
+            diagnostics = self.gate.check()
+            return format_diagnostics(diagnostics) if diagnostics else None
+        error = syntax_error(self._read(script_path), script_path)
+        if error:
+            display_console(error, "Syntax Error", "red")
+            return f"Traceback (most recent call last):\n{error}"
+        return None
+
+    def _execute(self, script_path):
+        """Returns (result, static); problems found in-process skip the sandbox."""
+        error = self._static_check(script_path)
+        if error and error_signature(error) not in self._static_signatures:
+            self._static_signatures.add(error_signature(error))
+            return ExecutionResult(1, stderr=error), True
+        return self.venv_manager.execute(script_path, paths=self.paths), False
+
+    def run(self, script_path, write_code):
+        """Returns the last ExecutionResult; ``write_code(text)`` stores a fix."""
+        started = time.monotonic()
+        seen_signatures = set()
+        last_fix = None  # (signature, error, code before, code after) of the previous round
+
+        while True:
+            result, static = self._execute(script_path)
+            attempt = RepairAttempt(len(self.attempts), result, static)
+            self.attempts.append(attempt)
+            if last_fix and self.memory and attempt.signature != last_fix[0]:
+                self.memory.add_fix(*last_fix[1:])
+
+            if result.ok:
+                self.stop_reason = "succeeded"
+                return result
+
+            if attempt.signature in seen_signatures:
+                self.stop_reason = "the same error repeated, so fixes are not making progress"
+                return result
+            seen_signatures.add(attempt.signature)
+
+            self.stop_reason = self._out_of_budget(started)
+            if self.stop_reason:
+                return result
+
+            files = self._project_files(script_path)
+            code = fenced_files(files)
+            error = extract_traceback(result.stderr, self.paths, max_chars=MAX_ERROR_CHARS)
+            error = error or f"Process exited with code {result.exit_code}"
+            if result.timed_out:
+                error += "\nThe script was killed because it exceeded the time limit (possible infinite loop)."
+            display_console(
+                f"Attempt {attempt.attempt + 1} failed "
+                + ("the static check" if static else f"with exit code {result.exit_code}")
+                + ". Attempting to fix via reviewer...",
+                "Execution Error", "red"
+            )
+
+            usage = {}
+            fix_started = time.monotonic()
+            try:
+                fixed = self.code_reviewer.fix_from_error_log(code, error, usage=usage, files=len(files))
+            except LLMError as e:
+                self.stop_reason = f"the bug fixer failed: {e}"
+                return result
+            attempt.fix_duration = time.monotonic() - fix_started
+            attempt.fix_tokens = usage.get("prompt_eval_count", 0) + usage.get("eval_count", 0)
+            self.tokens_used += attempt.fix_tokens
+
+            write_code(fixed)
+            fixed_code = fenced_files(self._project_files(script_path))
+            if fixed_code == code and not static:
+                self.stop_reason = "the fixer returned unchanged code"
+                return result
+            last_fix = (attempt.signature, error, code, fixed_code)
+
+    def report(self):
+        lines = [
+            f"#{a.attempt + 1}: " + ("failed static check" if a.static else f"exit {a.exit_code}, run {a.run_duration:.2f}s")
+            + (f", fix {a.fix_duration:.1f}s / {a.fix_tokens} tokens" if a.fix_duration else "")
+            for a in self.attempts
+        ]
+        lines.append(f"Stopped: {self.stop_reason}")
+        display_console("\n".join(lines), "Repair Loop", "green" if self.stop_reason == "succeeded" else "yellow")
@@ -0,0 +1,347 @@
+# core/sandbox.py
+
+import json
+import os
+import queue
+import signal
+import subprocess
+import threading
+
+from agentic_toolset.config import (
+    SANDBOX_TIMEOUT, SANDBOX_CPU_TIME, SANDBOX_MEMORY_MB, SANDBOX_MAX_OUTPUT, SANDBOX_PRELOAD, OUTPUT_TAIL_BYTES
+)
+from agentic_toolset.core.output_buffer import omitted_marker, stream_process
+
+# Runs inside the venv's interpreter. Reads one JSON request per line on
+# stdin, forks a child per request and reports output and exit status as
+# JSON events on its original stdout.
+_WORKER_SOURCE = r'''
+import atexit, importlib, json, os, resource, runpy, selectors, signal, sys, time, traceback
+
+protocol = os.fdopen(os.dup(1), "w", buffering=1)
+for name in sys.argv[1:]:
+    try:
+        importlib.import_module(name)
+    except Exception:
+        pass
+
+def send(event):
+    protocol.write(json.dumps(event) + "\n")
+
+def child(request, out_w, err_w):
+    os.setsid()
+    os.close(protocol.fileno())
+    if request.get("memory"):
+        limit = request["memory"] * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if request.get("cpu"):
+        resource.setrlimit(resource.RLIMIT_CPU, (request["cpu"], request["cpu"] + 1))
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(out_w, 1)
+    os.dup2(err_w, 2)
+    sys.stdin = open(0, closefd=False)
+    sys.stdout = open(1, "w", closefd=False)
+    sys.stderr = open(2, "w", buffering=1, closefd=False)
+    script = request["script"]
+    os.chdir(request.get("cwd") or os.getcwd())
+    sys.argv = [script]
+    sys.path[0] = os.path.dirname(os.path.abspath(script))
+    sys.path[1:1] = request.get("paths") or []
+    code = 0
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        if e.code is not None and not isinstance(e.code, int):
+            print(e.code, file=sys.stderr)
+    except BaseException:
+        # Hide the worker's own frames so the traceback matches `python script.py`
+        etype, value, tb = sys.exc_info()
+        while tb is not None and tb.tb_frame.f_code.co_filename != script:
+            tb = tb.tb_next
+        traceback.print_exception(etype, value, tb)
+        code = 1
+    try:
+        # Shut down like the interpreter would: join non-daemon threads, then run atexit hooks
+        if "threading" in sys.modules:
+            sys.modules["threading"]._shutdown()
+        atexit._run_exitfuncs()
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(code)
+
+def reap(pid, deadline):
+    # Polls rather than blocks, so a child that outlives its pipes or left its process group can't hang the worker
+    while deadline is None or time.monotonic() < deadline:
+        waited, status, usage = os.wait4(pid, 0 if deadline is None else os.WNOHANG)
+        if waited:
+            return status, usage, False
+        time.sleep(0.01)
+    for kill in (os.killpg, os.kill):
+        try:
+            kill(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    _, status, usage = os.wait4(pid, 0)
+    return status, usage, True
+
+def run(request):
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    started = time.monotonic()
+    pid = os.fork()
+    if pid == 0:
+        os.close(out_r)
+        os.close(err_r)
+        child(request, out_w, err_w)
+    os.close(out_w)
+    os.close(err_w)
+    send({"event": "started", "pid": pid})
+
+    selector = selectors.DefaultSelector()
+    selector.register(out_r, selectors.EVENT_READ, "stdout")
+    selector.register(err_r, selectors.EVENT_READ, "stderr")
+    deadline = started + request["timeout"] if request.get("timeout") else None
+    budget = request.get("max_output") or 0
+    tail_budget = request.get("tail") or 0
+    tails = {"stdout": bytearray(), "stderr": bytearray()}  # Ring of the last bytes once the head is full
+    omitted = {"stdout": 0, "stderr": 0}
+    sent = 0
+    truncated = timed_out = False
+    open_pipes = 2
+    while open_pipes:
+        wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+        events = selector.select(wait)
+        if not events and deadline is not None and time.monotonic() >= deadline:
+            timed_out = True
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            break
+        for key, _ in events:
+            data = os.read(key.fd, 65536)
+            if not data:
+                selector.unregister(key.fd)
+                os.close(key.fd)
+                open_pipes -= 1
+                continue
+            if budget and sent + len(data) > budget:
+                keep = max(0, budget - sent)
+                overflow, data = data[keep:], data[:keep]
+                truncated = True
+                tail = tails[key.data]
+                tail += overflow
+                if len(tail) > tail_budget:
+                    omitted[key.data] += len(tail) - tail_budget
+                    del tail[:len(tail) - tail_budget]
+            if data:
+                sent += len(data)
+                send({"event": "output", "stream": key.data, "data": data.decode("utf-8", "replace")})
+    for key in list(selector.get_map().values()):
+        selector.unregister(key.fd)
+        os.close(key.fd)
+
+    # After a timeout the group was killed, so allow only a short grace period
+    status, usage, killed = reap(pid, time.monotonic() + 1.0 if timed_out else deadline)
+    timed_out = timed_out or killed
+    send({
+        "event": "exit",
+        "code": os.waitstatus_to_exitcode(status),
+        "duration": time.monotonic() - started,
+        "peak_rss_kb": usage.ru_maxrss,
+        "timed_out": timed_out,
+        "truncated": truncated,
+        "tail": {k: v.decode("utf-8", "replace") for k, v in tails.items() if v},
+        "omitted": omitted,
+    })
+
+send({"event": "ready"})
+for line in sys.stdin:
+    if line.strip():
+        run(json.loads(line))
+'''
+
+
+class ExecutionResult:
+    """Outcome of one sandboxed script run."""
+
+    def __init__(self, exit_code, stdout="", stderr="", duration=0.0, peak_rss_kb=None,
+                 timed_out=False, truncated=False):
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+        self.peak_rss_kb = peak_rss_kb
+        self.timed_out = timed_out
+        self.truncated = truncated
+
+    @property
+    def ok(self):
+        return self.exit_code == 0 and not self.timed_out
+
+    def summary(self):
+        parts = [f"Exit code: {self.exit_code}", f"Duration: {self.duration:.2f}s"]
+        if self.peak_rss_kb:
+            parts.append(f"Peak RSS: {self.peak_rss_kb / 1024:.1f} MB")
+        if self.timed_out:
+            parts.append("Timed out")
+        if self.truncated:
+            parts.append("Output truncated")
+        return " | ".join(parts)
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class SandboxWorker:
+    """Warm worker process that runs scripts for one venv interpreter.
+
+    The worker imports ``preload`` modules once and forks a fresh child per
+    run, so every run starts clean but without paying interpreter start-up
+    and import costs again. Children get wall-clock and CPU timeouts, an
+    address-space limit and a cap on captured output: the first
+    ``max_output`` bytes are streamed, and past that only the last
+    ``tail`` bytes of each stream are kept and returned at exit, so a
+    traceback after a flood of output still reaches the caller. On
+    platforms without ``fork`` each run falls back to a one-off subprocess
+    with a timeout.
+    """
+
+    def __init__(self, python_executable, preload=SANDBOX_PRELOAD):
+        self.python_executable = python_executable
+        self.preload = list(preload)
+        self.supported = hasattr(os, "fork")
+        self._process = None
+        self._events = None
+        self._child_pid = None
+        self._pid_lock = threading.Lock()  # Guards _child_pid; _lock is held for a whole run
+        self._lock = threading.Lock()
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            [self.python_executable, "-c", _WORKER_SOURCE] + self.preload,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1
+        )
+        self._events = queue.Queue()
+        threading.Thread(target=self._read_events, args=(self._process, self._events), daemon=True).start()
+        ready = self._events.get(timeout=30)
+        if ready is None or ready.get("event") != "ready":
+            self.close()
+            raise EnvironmentError("Sandbox worker failed to start.")
+
+    @staticmethod
+    def _read_events(process, events):
+        for line in process.stdout:
+            try:
+                events.put(json.loads(line))
+            except ValueError:
+                continue
+        events.put(None)  # Worker exited
+
+    def run(self, script_path, timeout=SANDBOX_TIMEOUT, cpu_time=SANDBOX_CPU_TIME, memory_mb=SANDBOX_MEMORY_MB,
+            max_output=SANDBOX_MAX_OUTPUT, tail=OUTPUT_TAIL_BYTES, on_output=None, cwd=None, paths=(),
+            cancelled=None):
+        """Runs a script and returns an ExecutionResult.
+
+        ``on_output(stream, text)`` is called with output chunks as they arrive.
+        ``paths`` are added to the script's import path, e.g. a project root.
+        A run whose ``cancelled`` event is set before it starts is skipped,
+        and one that starts as it is set is killed.
+        """
+        paths = [os.path.abspath(p) for p in paths]
+        if not self.supported:
+            return self._run_subprocess(script_path, timeout, max_output, tail, on_output, cwd, paths)
+
+        request = {
+            "script": os.path.abspath(script_path),
+            "cwd": cwd or os.getcwd(),
+            "timeout": timeout,
+            "cpu": cpu_time,
+            "memory": memory_mb,
+            "max_output": max_output,
+            "tail": tail,
+            "paths": paths,
+        }
+        with self._lock:
+            if cancelled is not None and cancelled.is_set():
+                return ExecutionResult(-1, stderr="Cancelled before it started.")
+            if self._process is None or self._process.poll() is not None:
+                self._start()
+            self._process.stdin.write(json.dumps(request) + "\n")
+            self._process.stdin.flush()
+
+            output = {"stdout": [], "stderr": []}
+            # The worker enforces the timeout; this only guards against a dead worker
+            guard = (timeout or 3600) + 30
+            while True:
+                try:
+                    event = self._events.get(timeout=guard)
+                except queue.Empty:
+                    event = None
+                if event is None:
+                    with self._pid_lock:
+                        self._child_pid = None
+                    self.close()
+                    return ExecutionResult(-1, "".join(output["stdout"]),
+                                           "".join(output["stderr"]) + "\nSandbox worker died.", timed_out=True)
+                if event["event"] == "started":
+                    with self._pid_lock:
+                        self._child_pid = event["pid"]
+                    if cancelled is not None and cancelled.is_set():
+                        self.cancel()  # Cancelled while the request was on its way to the worker
+                elif event["event"] == "output":
+                    output[event["stream"]].append(event["data"])
+                    if on_output:
+                        on_output(event["stream"], event["data"])
+                elif event["event"] == "exit":
+                    with self._pid_lock:
+                        self._child_pid = None
+                    for stream, text in event.get("tail", {}).items():
+                        if event["omitted"][stream]:
+                            text = omitted_marker(event["omitted"][stream], "bytes") + text
+                        output[stream].append(text)
+                        if on_output:
+                            on_output(stream, text)
+                    return ExecutionResult(
+                        event["code"], "".join(output["stdout"]), "".join(output["stderr"]),
+                        duration=event["duration"], peak_rss_kb=event["peak_rss_kb"],
+                        timed_out=event["timed_out"], truncated=event["truncated"]
+                    )
+
+    def cancel(self):
+        """Kills the script that is currently running, if any; its run returns a failed result."""
+        with self._pid_lock:
+            # Killed under the lock, so the pid can't be one whose exit was already handled
+            pid, self._child_pid = self._child_pid, None
+            if pid is None:
+                return
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                # The child may not have started its own process group yet
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    def _run_subprocess(self, script_path, timeout, max_output, tail, on_output, cwd, paths):
+        env = dict(os.environ)
+        if paths:
+            env["PYTHONPATH"] = os.pathsep.join(paths + [env.get("PYTHONPATH", "")]).rstrip(os.pathsep)
+        result = stream_process([self.python_executable, script_path], on_output=on_output,
+                                head=max_output, tail=tail, timeout=timeout, cwd=cwd, env=env)
+        return ExecutionResult(-1 if result.timed_out else result.returncode, result.stdout, result.stderr,
+                               duration=result.duration, timed_out=result.timed_out, truncated=result.truncated)
+
+    def close(self):
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+                self._process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+            self._process = None
@@ -0,0 +1,181 @@
+# core/speculation.py
+
+import contextvars
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from agentic_toolset.config import SPECULATIVE_CANDIDATES, SPECULATIVE_TEMPERATURES, SPECULATIVE_SEED
+from agentic_toolset.core.llm_client import LLMError
+from agentic_toolset.core.output_buffer import extract_traceback
+from agentic_toolset.core.project_writer import ProjectWriter
+from agentic_toolset.core.sandbox import SandboxWorker
+from agentic_toolset.core.static_gate import StaticGate, format_diagnostics
+from agentic_toolset.utils.display import display_console
+from agentic_toolset.utils.tracing import span
+
+# Project contents a candidate's copy doesn't need
+_SKIP_COPY = shutil.ignore_patterns(".state", "__pycache__")
+
+
+class Candidate:
+    """One speculative answer to a coder prompt and how far it got."""
+
+    def __init__(self, index, options):
+        self.index = index
+        self.options = options
+        self.response = None
+        self.diagnostics = []
+        self.result = None
+        self.error = None
+        self.cancelled = False
+
+    @property
+    def ok(self):
+        return self.result is not None and self.result.ok
+
+    @property
+    def stage(self):
+        """How far the candidate got: 0 nothing, 1 generated, 2 passed static checks, 3 executed."""
+        if self.response is None:
+            return 0
+        if self.diagnostics or self.error:
+            return 1
+        return 3 if self.result is not None else 2
+
+    def describe(self):
+        options = ", ".join(f"{k}={v}" for k, v in self.options.items())
+        if self.cancelled and not self.ok:
+            outcome = "cancelled"
+        elif self.error:
+            outcome = f"error: {self.error}"
+        elif self.diagnostics:
+            outcome = f"static check failed ({len(self.diagnostics)} problem(s))"
+        elif self.result is not None:
+            outcome = "ran cleanly" if self.result.ok else f"exit code {self.result.exit_code}"
+        else:
+            outcome = "passed static checks" if self.stage == 2 else "no response"
+        return f"#{self.index + 1} ({options}): {outcome}"
+
+    def feedback(self):
+        """Why the candidate failed, for the orchestrator's context."""
+        if self.diagnostics:
+            return format_diagnostics(self.diagnostics)
+        if self.result is not None and not self.result.ok:
+            return f"{self.result.summary()}\n{extract_traceback(self.result.stderr)}"
+        return self.error or ""
+
+
+def candidate_options(count, temperatures=SPECULATIVE_TEMPERATURES, seed=SPECULATIVE_SEED):
+    """Sampling options per candidate: distinct seeds, temperatures cycled."""
+    temperatures = temperatures or [0.8]
+    return [{"seed": seed + i, "temperature": temperatures[i % len(temperatures)]} for i in range(count)]
+
+
+class SpeculativeCoder:
+    """Best-of-N code generation for one sub-task.
+
+    ``count`` candidates are sampled from the coder concurrently with
+    different seeds and temperatures. Each is written into its own copy of
+    the project, passed through the static gate and run in its own sandbox
+    worker, holding one of the venv manager's execution slots (in batch
+    mode) only while it runs. The first candidate that runs cleanly wins;
+    the streams and scripts of the others are cancelled.
+    """
+
+    def __init__(self, coder, venv_manager, project_dir, layout, count=SPECULATIVE_CANDIDATES, install=True,
+                 script=os.path.join("src", "main.py")):
+        self.coder = coder
+        self.venv_manager = venv_manager
+        self.project_dir = project_dir
+        self.layout = [os.path.relpath(p, project_dir) for p in layout]
+        self.count = max(1, count)
+        self.install = install
+        self.script = script
+        self.cancelled = threading.Event()
+        self.candidates = []
+        self._workers = []
+        self._lock = threading.Lock()
+        self._install_lock = threading.Lock()  # Candidates share the venv; pip must not run twice at once
+
+    def _sandbox(self):
+        worker = SandboxWorker(self.venv_manager.python_executable)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _evaluate(self, candidate, prompt, files):
+        with span("candidate", "speculation", index=candidate.index, **candidate.options):
+            candidate.response = self.coder.generate_code(prompt, files=files, options=candidate.options,
+                                                          title=None, cancelled=self.cancelled)
+            if self.cancelled.is_set():
+                candidate.cancelled = True
+                return candidate
+
+            workdir = tempfile.mkdtemp(prefix=f"candidate{candidate.index + 1}_")
+            try:
+                project = os.path.join(workdir, os.path.basename(os.path.abspath(self.project_dir)))
+                shutil.copytree(self.project_dir, project, ignore=_SKIP_COPY)
+                writer = ProjectWriter(project, [os.path.join(project, rel) for rel in self.layout])
+                writer.write_response(candidate.response)
+
+                with self._install_lock:
+                    gate = StaticGate(project, writer.layout, self.venv_manager, install=self.install)
+                    candidate.diagnostics = gate.check()
+                if candidate.diagnostics or self.cancelled.is_set():
+                    candidate.cancelled = self.cancelled.is_set()
+                    return candidate
+
+                worker = self._sandbox()
+                with self.venv_manager.execution_slot():
+                    candidate.result = worker.run(os.path.join(project, self.script), cwd=project, paths=[project],
+                                                  cancelled=self.cancelled)
+                candidate.cancelled = self.cancelled.is_set() and not candidate.result.ok
+                return candidate
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    def cancel(self):
+        self.cancelled.set()
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.cancel()
+
+    def run(self, prompt, files=1):
+        """Returns the winning Candidate, or the one that got furthest when none ran cleanly."""
+        self.candidates = [Candidate(i, options) for i, options in enumerate(candidate_options(self.count))]
+        display_console(f"Sampling {self.count} candidates in parallel...", "Speculation", "blue")
+        winner = None
+        errors = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.count) as pool:
+                # Each candidate reports to the caller's display listeners
+                futures = {pool.submit(contextvars.copy_context().run, self._evaluate, c, prompt, files): c
+                           for c in self.candidates}
+                for future in as_completed(futures):
+                    candidate = futures[future]
+                    try:
+                        future.result()
+                    except LLMError as e:
+                        candidate.error = str(e)
+                        errors.append(e)
+                    except Exception as e:
+                        candidate.error = f"{type(e).__name__}: {e}"
+                    if candidate.ok and winner is None:
+                        winner = candidate
+                        self.cancel()
+        finally:
+            with self._lock:
+                workers, self._workers = self._workers, []
+            for worker in workers:
+                worker.close()
+
+        display_console("\n".join(c.describe() for c in self.candidates), "Speculation", "green" if winner else "yellow")
+        if winner is not None:
+            return winner
+        if errors and all(c.response is None for c in self.candidates):
+            raise errors[0]
+        return max(self.candidates, key=lambda c: (c.stage, -c.index))
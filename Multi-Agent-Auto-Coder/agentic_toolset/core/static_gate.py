@@ -0,0 +1,313 @@
+# core/static_gate.py
+
+import ast
+import builtins
+import os
+import sys
+
+from agentic_toolset.utils.display import display_console
+from agentic_toolset.utils.tracing import span
+
+MODULE_NAMES = {"__name__", "__file__", "__doc__", "__spec__", "__loader__", "__package__", "__builtins__",
+                "__annotations__", "__path__", "__cached__", "__dict__"}
+BUILTIN_NAMES = set(dir(builtins)) | MODULE_NAMES
+IMPORT_ERRORS = {"ImportError", "ModuleNotFoundError", "Exception", "BaseException"}
+
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef)
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+
+class Diagnostic:
+    def __init__(self, path, line, kind, message, source=None):
+        self.path = path
+        self.line = line
+        self.kind = kind
+        self.message = message
+        self.source = source
+
+    def format(self):
+        lines = [f'  File "{self.path}", line {self.line}']
+        if self.source:
+            lines.append(f"    {self.source.strip()}")
+        lines.append(f"{self.kind}: {self.message}")
+        return "\n".join(lines)
+
+
+def format_diagnostics(diagnostics):
+    """Renders diagnostics like a traceback so the bug fixer can read them."""
+    return "Static check failed before running the script:\n" + "\n".join(d.format() for d in diagnostics)
+
+
+def _scope_nodes(body):
+    """Yields the nodes evaluated in the scope owning ``body``, without entering nested scopes."""
+    stack = list(reversed(body))
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, _FUNCTIONS + (ast.Lambda,)):
+            # Decorators and defaults run in the enclosing scope
+            stack.extend(getattr(node, "decorator_list", []))
+            stack.extend(node.args.defaults)
+            stack.extend(d for d in node.args.kw_defaults if d is not None)
+        elif isinstance(node, ast.ClassDef):
+            stack.extend(node.decorator_list)
+            stack.extend(node.bases)
+            stack.extend(k.value for k in node.keywords)
+        elif isinstance(node, _COMPREHENSIONS):
+            stack.append(node.generators[0].iter)
+            # Walrus targets inside a comprehension bind in the enclosing scope
+            stack.extend(n.target for n in ast.walk(node) if isinstance(n, ast.NamedExpr))
+        else:
+            stack.extend(ast.iter_child_nodes(node))
+
+
+def _bindings(body, module_names):
+    """Names bound anywhere in a scope; ``global`` names are also added to ``module_names``."""
+    names, star = set(), False
+    for node in _scope_nodes(body):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, _FUNCTIONS + (ast.ClassDef,)):
+            names.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name == "*":
+                    star = True
+                else:
+                    names.add(alias.asname or alias.name.split(".")[0])
+        elif isinstance(node, ast.Global):
+            names.update(node.names)
+            module_names.update(node.names)
+        elif isinstance(node, ast.Nonlocal):
+            names.update(node.names)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            names.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            names.add(node.rest)
+    return names, star
+
+
+def _arg_names(args):
+    every = args.posonlyargs + args.args + args.kwonlyargs + [a for a in (args.vararg, args.kwarg) if a]
+    return {a.arg for a in every}
+
+
+class _UndefinedNames(ast.NodeVisitor):
+    """Reports loads of names that no enclosing scope or builtin defines.
+
+    Bindings are collected per scope before checking, so (like pyflakes)
+    use-before-assignment is not reported, and class scopes are invisible
+    to the functions nested in them.
+    """
+
+    def __init__(self):
+        self.scopes = []  # (kind, names) from outermost to innermost
+        self.star_import = False
+        self.undefined = []
+
+    def _push(self, kind, names):
+        self.scopes.append((kind, names))
+
+    def _defined(self, name):
+        if self.star_import or name in BUILTIN_NAMES:
+            return True
+        for index, (kind, names) in enumerate(reversed(self.scopes)):
+            if kind == "class" and index > 0:
+                continue
+            if name in names:
+                return True
+        return False
+
+    def visit_Module(self, node):
+        module_names = set()
+        names, self.star_import = _bindings(node.body, module_names)
+        self._push("module", names | module_names)
+        self.module_names = self.scopes[0][1]
+        for child in node.body:
+            self.visit(child)
+
+    def _visit_function(self, node, body):
+        for default in node.args.defaults + [d for d in node.args.kw_defaults if d is not None]:
+            self.visit(default)
+        names, _ = _bindings(body if isinstance(body, list) else [body], self.module_names)
+        self._push("function", names | _arg_names(node.args) | {"__class__"})
+        for child in body if isinstance(body, list) else [body]:
+            self.visit(child)
+        self.scopes.pop()
+
+    def visit_FunctionDef(self, node):
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        annotations = [a.annotation for a in node.args.posonlyargs + node.args.args + node.args.kwonlyargs]
+        annotations += [node.returns] + [a.annotation for a in (node.args.vararg, node.args.kwarg) if a]
+        for annotation in annotations:
+            if annotation is not None:
+                self.visit(annotation)
+        self._visit_function(node, node.body)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        self._visit_function(node, node.body)
+
+    def visit_ClassDef(self, node):
+        for child in node.decorator_list + node.bases + [k.value for k in node.keywords]:
+            self.visit(child)
+        names, _ = _bindings(node.body, self.module_names)
+        self._push("class", names)
+        for child in node.body:
+            self.visit(child)
+        self.scopes.pop()
+
+    def _visit_comprehension(self, node, results):
+        self.visit(node.generators[0].iter)
+        targets = {n.id for g in node.generators for n in ast.walk(g.target) if isinstance(n, ast.Name)}
+        self._push("comprehension", targets)
+        for index, generator in enumerate(node.generators):
+            if index:
+                self.visit(generator.iter)
+            for condition in generator.ifs:
+                self.visit(condition)
+        for result in results:
+            self.visit(result)
+        self.scopes.pop()
+
+    def visit_ListComp(self, node):
+        self._visit_comprehension(node, [node.elt])
+
+    visit_SetComp = visit_GeneratorExp = visit_ListComp
+
+    def visit_DictComp(self, node):
+        self._visit_comprehension(node, [node.key, node.value])
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load) and not self._defined(node.id):
+            self.undefined.append(node)
+
+
+def undefined_names(tree):
+    """Name nodes in ``tree`` that are loaded but never defined."""
+    checker = _UndefinedNames()
+    checker.visit(tree)
+    return checker.undefined
+
+
+def _optional_imports(tree):
+    """Import nodes guarded by ``try: ... except ImportError``; they are allowed to be missing."""
+    optional = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Try):
+            continue
+        caught = set()
+        for handler in node.handlers:
+            if handler.type is None:
+                caught.add("Exception")
+            for expr in ast.walk(handler.type) if handler.type is not None else ():
+                if isinstance(expr, ast.Name):
+                    caught.add(expr.id)
+        if caught & IMPORT_ERRORS:
+            for statement in node.body:
+                optional.update(id(n) for n in ast.walk(statement) if isinstance(n, (ast.Import, ast.ImportFrom)))
+    return optional
+
+
+def imported_modules(tree):
+    """(top-level module, line) for every absolute, non-optional import in ``tree``."""
+    optional = _optional_imports(tree)
+    modules = []
+    for node in ast.walk(tree):
+        if id(node) in optional:
+            continue
+        if isinstance(node, ast.Import):
+            modules += [(alias.name.split(".")[0], node.lineno) for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.append((node.module.split(".")[0], node.lineno))
+    return modules
+
+
+class StaticGate:
+    """In-process checks that run before a generated project is executed.
+
+    Every Python file is compiled with ``ast``, scanned for undefined names,
+    and its third-party imports are installed into the venv with a single
+    ``install_libraries`` call. Problems come back as Diagnostics that read
+    like a traceback, so they can go straight to the bug fixer.
+    """
+
+    def __init__(self, project_dir, files, venv_manager=None, install=True):
+        self.project_dir = project_dir
+        self.files = files  # Paths relative to project_dir; may grow as the writer adds files
+        self.venv_manager = venv_manager
+        self.install = install
+
+    def _local_modules(self):
+        local = set()
+        for rel_path in self.files:
+            parts = rel_path.replace(os.sep, "/").split("/")
+            local.add(parts[0][:-3] if parts[0].endswith(".py") else parts[0])
+            local.add(os.path.splitext(parts[-1])[0])  # Siblings are importable from the script's directory
+        for entry in os.listdir(self.project_dir) if os.path.isdir(self.project_dir) else ():
+            local.add(os.path.splitext(entry)[0])
+        return local
+
+    def _parse(self):
+        trees, diagnostics = {}, []
+        for rel_path in self.files:
+            path = os.path.join(self.project_dir, rel_path)
+            if not rel_path.endswith(".py") or not os.path.exists(path):
+                continue
+            with open(path) as f:
+                source = f.read()
+            try:
+                trees[rel_path] = (ast.parse(source, filename=rel_path), source.splitlines())
+            except SyntaxError as e:
+                diagnostics.append(Diagnostic(rel_path, e.lineno, type(e).__name__, e.msg, e.text))
+        return trees, diagnostics
+
+    def _check_names(self, trees):
+        diagnostics = []
+        for rel_path, (tree, lines) in trees.items():
+            for node in undefined_names(tree):
+                source = lines[node.lineno - 1] if node.lineno <= len(lines) else None
+                diagnostics.append(Diagnostic(rel_path, node.lineno, "NameError",
+                                              f"name '{node.id}' is not defined", source))
+        return diagnostics
+
+    def _check_imports(self, trees):
+        local = self._local_modules()
+        first_use = {}
+        for rel_path, (tree, lines) in trees.items():
+            for module, line in imported_modules(tree):
+                if module in local or module in sys.stdlib_module_names or module == "__future__":
+                    continue
+                first_use.setdefault(module, (rel_path, line, lines[line - 1] if line <= len(lines) else None))
+        if not first_use or self.venv_manager is None or not self.install:
+            return []
+
+        modules = sorted(first_use)
+        try:
+            with span("install imports", "venv", modules=",".join(modules)):
+                self.venv_manager.install_libraries(modules)
+            return []
+        except EnvironmentError as e:
+            failure = str(e).splitlines()[0]
+        missing = self.venv_manager.resolver.missing(modules)
+        return [
+            Diagnostic(*first_use[m][:2], "ModuleNotFoundError",
+                       f"No module named '{m}' and it could not be installed ({failure})", first_use[m][2])
+            for m in missing
+        ]
+
+    def check(self):
+        """Returns a list of Diagnostics; empty when the project may run."""
+        with span("static gate", "check", files=len(self.files)):
+            trees, diagnostics = self._parse()
+            diagnostics += self._check_names(trees)
+            if not diagnostics:
+                # Only install dependencies for code that can actually run
+                diagnostics += self._check_imports(trees)
+        if diagnostics:
+            display_console(format_diagnostics(diagnostics), "Static Check", "red")
+        return diagnostics
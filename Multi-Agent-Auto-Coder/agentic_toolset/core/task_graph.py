@@ -0,0 +1,139 @@
+# core/task_graph.py
+
+import asyncio
+import contextvars
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agentic_toolset.config import MODEL_CONCURRENCY, MODEL_CONCURRENCY_DEFAULT
+from agentic_toolset.utils.display import display_console
+
+
+class TaskStep:
+    def __init__(self, name, func, deps=(), model=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.model = model
+        self.started = None
+        self.finished = None
+
+    @property
+    def duration(self):
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+class TaskGraph:
+    """Runs agent steps as a dependency DAG, overlapping independent steps.
+
+    Steps are zero-argument callables. Coroutine functions (e.g. ones using
+    ``ollama.AsyncClient`` or asyncio subprocesses) are awaited directly;
+    blocking callables run on worker threads so synchronous agents overlap
+    too. Steps tagged with a model share a per-model concurrency limit.
+    Results are available by step name in ``results``.
+    """
+
+    def __init__(self, model_limits=None, default_limit=MODEL_CONCURRENCY_DEFAULT):
+        self.steps = {}
+        self.results = {}
+        self.model_limits = dict(MODEL_CONCURRENCY if model_limits is None else model_limits)
+        self.default_limit = default_limit
+        self._semaphores = {}
+
+    def add(self, name, func, deps=(), model=None):
+        if name in self.steps:
+            raise ValueError(f"Duplicate step name: {name}")
+        self.steps[name] = TaskStep(name, func, deps, model)
+        return self.steps[name]
+
+    def _validate(self):
+        for step in self.steps.values():
+            missing = [d for d in step.deps if d not in self.steps]
+            if missing:
+                raise ValueError(f"Step '{step.name}' depends on unknown steps: {missing}")
+
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle detected at step '{name}'")
+            visiting.add(name)
+            for dep in self.steps[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.steps:
+            visit(name)
+
+    def _semaphore(self, model):
+        if model not in self._semaphores:
+            limit = self.model_limits.get(model, self.default_limit)
+            self._semaphores[model] = asyncio.Semaphore(max(1, limit))
+        return self._semaphores[model]
+
+    async def _run_step(self, step, dep_tasks):
+        if dep_tasks:
+            await asyncio.gather(*dep_tasks)
+
+        async def call():
+            step.started = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(step.func):
+                    return await step.func()
+                return await asyncio.to_thread(step.func)
+            finally:
+                step.finished = time.perf_counter()
+
+        if step.model:
+            async with self._semaphore(step.model):
+                result = await call()
+        else:
+            result = await call()
+        self.results[step.name] = result
+        return result
+
+    async def run_async(self):
+        self._validate()
+        self._semaphores = {}
+        tasks = {}
+
+        def schedule(name):
+            if name not in tasks:
+                step = self.steps[name]
+                dep_tasks = [schedule(dep) for dep in step.deps]
+                tasks[name] = asyncio.ensure_future(self._run_step(step, dep_tasks))
+            return tasks[name]
+
+        for name in self.steps:
+            schedule(name)
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return self.results
+
+    def run(self):
+        """Runs the graph to completion and returns the results by step name."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.run_async())
+        # Already inside an event loop (e.g. Jupyter), so use a helper thread with this context
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(contextvars.copy_context().run, asyncio.run, self.run_async()).result()
+
+    def report(self, title="Task Graph"):
+        lines = []
+        for step in sorted(self.steps.values(), key=lambda s: s.started or 0):
+            if step.duration is not None:
+                deps = f" (after {', '.join(step.deps)})" if step.deps else ""
+                lines.append(f"{step.name}: {step.duration:.2f}s{deps}")
+        display_console("\n".join(lines) or "No steps were run.", title, "blue")
@@ -4,11 +4,22 @@ import os
 import subprocess
 import shutil
 import ensurepip
-from agentic_toolset.utils.display import display_console
+from contextlib import nullcontext
+from agentic_toolset.config import WHEEL_CACHE_DIR
+from agentic_toolset.core.venv_pool import pip_install
+from agentic_toolset.core.dependency_resolver import DependencyResolver
+from agentic_toolset.core.sandbox import SandboxWorker
+from agentic_toolset.utils.display import display_console, stream_console
+from agentic_toolset.utils.tracing import span
 
 class VenvManagerAgent:
-    def __init__(self):
-        self.venv_path = "project_venv"
+    def __init__(self, venv_path="project_venv", pool=None, wheel_cache=WHEEL_CACHE_DIR):
+        self.venv_path = venv_path
+        self.pool = pool  # Optional VenvPool to check environments out of
+        self.wheel_cache = pool.wheel_cache if pool is not None else wheel_cache
+        self.checked_out = False
+        self.sandbox = None
+        self.last_result = None
         self.python_executable = self._find_python_executable()
         self.pip_command = [self.python_executable, "-m", "pip"]
         display_console(f"Initialized VenvManager with python executable: {self.python_executable}", "Venv Init", "blue")
@@ -23,61 +34,108 @@ class VenvManagerAgent:
         else:
             return "python"  # fallback if venv doesn't exist yet
 
-    def create_venv(self):
+    def create_venv(self, requirements=()):
+        if self.pool is not None:
+            if not self.checked_out:
+                with span("venv checkout", "venv", requirements=",".join(requirements)):
+                    self.venv_path = self.pool.checkout(requirements)
+                self.checked_out = True
+            self.python_executable = self._find_python_executable()
+            self.pip_command = [self.python_executable, "-m", "pip"]
+            return
+
         if not os.path.exists(self.venv_path):
             display_console("Creating virtual environment...", "VenvManager", "yellow")
             python_cmd = shutil.which("python3") or shutil.which("python") or "python"
-            result = subprocess.run([python_cmd, "-m", "venv", self.venv_path])
+            with span("create venv", "subprocess", venv=self.venv_path):
+                result = subprocess.run([python_cmd, "-m", "venv", self.venv_path])
             if result.returncode != 0:
                 raise EnvironmentError("Failed to create virtual environment.")
 
+        # Point at the venv's interpreter now that it exists
+        self.python_executable = self._find_python_executable()
+        self.pip_command = [self.python_executable, "-m", "pip"]
+
         if not self._check_pip():
             display_console("Installing pip via ensurepip.", "VenvManager", "yellow")
-            result = subprocess.run([self.python_executable, "-m", "ensurepip", "--upgrade"])
+            with span("ensurepip", "subprocess", venv=self.venv_path):
+                result = subprocess.run([self.python_executable, "-m", "ensurepip", "--upgrade"])
             if result.returncode != 0:
                 raise EnvironmentError("Failed to install pip.")
 
+    @property
+    def resolver(self):
+        return DependencyResolver(self.venv_path, self.python_executable)
+
     def _check_pip(self):
-        try:
-            subprocess.run(self.pip_command + ["--version"], check=True, capture_output=True)
-            return True
-        except subprocess.CalledProcessError:
-            return False
+        return self.resolver.is_installed("pip")
 
     def install_libraries(self, libraries):
-        for lib in libraries:
-            if not self._is_library_installed(lib):
-                display_console(f"Installing library: {lib}", "VenvManager", "yellow")
-                result = subprocess.run(self.pip_command + ["install", lib], capture_output=True, text=True)
-                if result.returncode == 0:
-                    display_console(f"Installed: {lib}", "VenvManager", "green")
-                else:
-                    display_console(f"Error installing {lib}: {result.stderr}", "VenvManager", "red")
-                    raise EnvironmentError(f"Failed to install {lib}: {result.stderr}")
+        resolver = self.resolver
+        missing = resolver.missing(libraries)
+        if not missing:
+            return
+        # Install by distribution name, e.g. "yaml" -> "PyYAML"
+        packages = list(dict.fromkeys(resolver.distribution_for(lib) for lib in missing))
+        names = ", ".join(packages)
+        display_console(f"Installing libraries: {names}", "VenvManager", "yellow")
+        result = pip_install(self.python_executable, packages, self.wheel_cache)
+        resolver.invalidate()
+        if result.returncode == 0:
+            display_console(f"Installed: {names}", "VenvManager", "green")
+        else:
+            # pip's own summary lines say why; the rest of stderr is already on the display
+            lines = result.stderr.strip().splitlines()
+            reason = "\n".join([line for line in lines if line.startswith("ERROR:")] or lines[-5:])
+            display_console(f"Error installing {names}: {reason}", "VenvManager", "red")
+            raise EnvironmentError(f"Failed to install {names}: {reason}")
 
     def _is_library_installed(self, library):
-        result = subprocess.run([self.python_executable, "-c", f"import {library}"], capture_output=True, text=True)
-        return result.returncode == 0
+        return self.resolver.is_installed(library)
 
-    def run_script(self, script_path):
-        display_console(f"Running script: {script_path}", "VenvManager", "cyan")
-        result = subprocess.run(
-            [self.python_executable, script_path],
-            capture_output=True,
-            text=True
-        )
+    def _sandbox(self):
+        # One warm worker per venv interpreter
+        if self.sandbox is None or self.sandbox.python_executable != self.python_executable:
+            if self.sandbox is not None:
+                self.sandbox.close()
+            self.sandbox = SandboxWorker(self.python_executable)
+        return self.sandbox
 
-        stdout = result.stdout.strip()
-        stderr = result.stderr.strip()
+    def execute(self, script_path, **limits):
+        """Runs a script in the sandbox, streaming its output, and returns an ExecutionResult."""
+        display_console(f"Running script: {script_path}", "VenvManager", "cyan")
+        console = stream_console("Script Output", "green")
+        try:
+            with span("run script", "subprocess", script=script_path) as call:
+                result = self._sandbox().run(script_path, on_output=lambda stream, text: console.write(text), **limits)
+                call.set(exit_code=result.exit_code, peak_rss_kb=result.peak_rss_kb, timed_out=result.timed_out)
+        finally:
+            console.close()
+        self.last_result = result
+        display_console(result.summary(), "Script Finished", "green" if result.ok else "red")
+        return result
 
-        if stdout:
-            display_console(stdout, "Script Output", "green")
-        if stderr:
-            display_console(stderr, "Script Error", "red")
+    def execution_slot(self):
+        """Held around a script run that bypasses ``execute``; unbounded here."""
+        return nullcontext()
 
-        return stdout, stderr
+    def run_script(self, script_path):
+        result = self.execute(script_path)
+        return result.stdout.strip(), result.stderr.strip()
 
     def cleanup(self):
+        if self.sandbox is not None:
+            self.sandbox.close()
+            self.sandbox = None
+
+        if self.pool is not None:
+            # Pooled environments are reset and reused, never deleted here
+            if self.checked_out:
+                display_console("Returning virtual environment to pool...", "VenvManager", "yellow")
+                self.pool.release(self.venv_path)
+                self.checked_out = False
+            return
+
         if os.path.exists(self.venv_path):
             display_console("Cleaning up virtual environment...", "VenvManager", "red")
             shutil.rmtree(self.venv_path, ignore_errors=True)
@@ -0,0 +1,268 @@
+# core/venv_pool.py
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+
+from agentic_toolset.config import VENV_POOL_DIR, WHEEL_CACHE_DIR, VENV_POOL_MAX_IDLE
+from agentic_toolset.core.output_buffer import stream_process
+from agentic_toolset.utils.display import display_console, stream_console
+from agentic_toolset.utils.tracing import span
+
+BASELINE_FILE = ".baseline.json"
+CHECKOUT_FILE = ".checked_out"
+
+
+def venv_python(venv_path):
+    unix_path = os.path.join(venv_path, "bin", "python")
+    windows_path = os.path.join(venv_path, "Scripts", "python")
+    return windows_path if os.path.exists(windows_path) and not os.path.exists(unix_path) else unix_path
+
+
+def site_packages(venv_path):
+    matches = glob.glob(os.path.join(venv_path, "lib", "python*", "site-packages"))
+    matches += glob.glob(os.path.join(venv_path, "Lib", "site-packages"))
+    return matches[0] if matches else None
+
+
+def _bin_dir(venv_path):
+    return os.path.join(venv_path, "Scripts" if os.name == "nt" else "bin")
+
+
+def _dist_version(info_dir):
+    """The Version field of a .dist-info directory's METADATA, or None."""
+    try:
+        with open(os.path.join(info_dir, "METADATA"), encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("Version:"):
+                    return line.split(":", 1)[1].strip()
+                if not line.strip():
+                    break
+    except OSError:
+        pass
+    return None
+
+
+def _run(command, name):
+    """Runs a pip or venv command, streaming its output to the display as it arrives."""
+    console = stream_console(name, "yellow")
+    try:
+        with span(name, "subprocess", command=" ".join(command[1:])) as call:
+            result = stream_process(command, on_output=lambda stream, text: console.write(text))
+            call.set(exit_code=result.returncode, truncated=result.truncated)
+    finally:
+        console.close()
+    return result
+
+
+def pip_install(python_executable, packages, wheel_cache=WHEEL_CACHE_DIR):
+    """Installs ``packages`` with a single pip call, preferring the local wheel cache.
+
+    Packages missing from the cache are built into it with ``pip wheel`` once,
+    so later installs of the same set never touch the network.
+    """
+    packages = list(packages)
+    if not packages:
+        return subprocess.CompletedProcess([], 0, "", "")
+    pip = [python_executable, "-m", "pip"]
+    if not wheel_cache:
+        return _run(pip + ["install"] + packages, "pip install")
+
+    os.makedirs(wheel_cache, exist_ok=True)
+    offline = pip + ["install", "--no-index", "--find-links", wheel_cache] + packages
+    result = _run(offline, "pip install (wheel cache)")
+    if result.returncode == 0:
+        return result
+
+    fill = _run(pip + ["wheel", "--wheel-dir", wheel_cache] + packages, "pip wheel")
+    if fill.returncode != 0:
+        # Fall back to a plain install, e.g. for sdists that fail to build as wheels
+        return _run(pip + ["install"] + packages, "pip install")
+    return _run(offline, "pip install (wheel cache)")
+
+
+class VenvPool:
+    """Pool of pre-built virtual environments keyed by their dependency set.
+
+    Each dependency set gets one template venv, built once with its packages
+    installed from the wheel cache. Working environments are copies of the
+    template that are checked out per run and, on release, reset by deleting
+    whatever was installed on top of the template baseline. An environment
+    whose baseline packages were upgraded, downgraded or removed can't be
+    reset that way and is cloned from the template again.
+    """
+
+    def __init__(self, root=VENV_POOL_DIR, wheel_cache=WHEEL_CACHE_DIR, max_idle=VENV_POOL_MAX_IDLE):
+        self.root = root
+        self.wheel_cache = wheel_cache
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def pool_key(requirements):
+        normalized = sorted({r.strip().lower() for r in requirements if r.strip()})
+        return hashlib.sha256("\n".join(normalized).encode("utf-8")).hexdigest()[:16]
+
+    def _key_dir(self, requirements):
+        return os.path.join(self.root, self.pool_key(requirements))
+
+    def _template(self, requirements):
+        template = os.path.join(self._key_dir(requirements), "template")
+        if os.path.exists(os.path.join(template, BASELINE_FILE)):
+            return template
+
+        display_console(f"Building pooled venv template for: {', '.join(requirements) or 'no packages'}",
+                        "VenvPool", "yellow")
+        staging = f"{template}.{uuid.uuid4().hex[:8]}.tmp"
+        python_cmd = shutil.which("python3") or shutil.which("python") or "python"
+        result = _run([python_cmd, "-m", "venv", staging], "create venv")
+        if result.returncode != 0:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise EnvironmentError(f"Failed to create pooled virtual environment: {result.stderr}")
+
+        result = pip_install(venv_python(staging), requirements, self.wheel_cache)
+        if result.returncode != 0:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise EnvironmentError(f"Failed to install {requirements} into pooled venv: {result.stderr}")
+
+        self._write_baseline(staging)
+        try:
+            os.rename(staging, template)
+        except OSError:
+            # Another process finished the same template first
+            shutil.rmtree(staging, ignore_errors=True)
+        return template
+
+    def _write_baseline(self, venv_path):
+        packages_dir = site_packages(venv_path)
+        names = sorted(os.listdir(packages_dir))
+        baseline = {
+            "site_packages": names,
+            "bin": sorted(os.listdir(_bin_dir(venv_path))),
+            "dist_info": {name: _dist_version(os.path.join(packages_dir, name))
+                          for name in names if name.endswith(".dist-info")},
+        }
+        with open(os.path.join(venv_path, BASELINE_FILE), "w") as f:
+            json.dump(baseline, f)
+
+    def _claim(self, venv_path):
+        """Atomically marks an environment as checked out; False if taken."""
+        marker = os.path.join(venv_path, CHECKOUT_FILE)
+        try:
+            fd = os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if not self._owner_alive(marker):
+                os.remove(marker)
+                return self._claim(venv_path)
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+
+    @staticmethod
+    def _owner_alive(marker):
+        try:
+            with open(marker) as f:
+                pid = int(f.read().strip() or 0)
+            if pid == os.getpid():
+                return True
+            os.kill(pid, 0)
+            return True
+        except (ValueError, ProcessLookupError):
+            return False
+        except (PermissionError, FileNotFoundError):
+            return True
+
+    def _idle_envs(self, requirements):
+        envs_dir = os.path.join(self._key_dir(requirements), "envs")
+        if not os.path.isdir(envs_dir):
+            return []
+        return [os.path.join(envs_dir, name) for name in sorted(os.listdir(envs_dir))
+                if not os.path.exists(os.path.join(envs_dir, name, CHECKOUT_FILE))]
+
+    def checkout(self, requirements=()):
+        """Returns the path of a ready environment with ``requirements`` installed."""
+        requirements = list(requirements)
+        with self._lock:
+            template = self._template(requirements)
+            for venv_path in self._idle_envs(requirements):
+                if self._claim(venv_path):
+                    display_console(f"Reusing pooled venv: {venv_path}", "VenvPool", "green")
+                    return venv_path
+
+            venv_path = os.path.join(self._key_dir(requirements), "envs", uuid.uuid4().hex[:12])
+            shutil.copytree(template, venv_path, symlinks=True)
+            self._claim(venv_path)
+            display_console(f"Cloned pooled venv: {venv_path}", "VenvPool", "green")
+            return venv_path
+
+    def reset(self, venv_path):
+        """Removes packages and scripts installed on top of the template baseline.
+
+        Returns False, leaving the environment untouched, when a baseline
+        distribution is missing or changed version: pip replaced it, so the
+        package's files no longer match the baseline's metadata.
+        """
+        with open(os.path.join(venv_path, BASELINE_FILE)) as f:
+            baseline = json.load(f)
+        packages_dir = site_packages(venv_path)
+        for name, version in baseline.get("dist_info", {}).items():
+            info_dir = os.path.join(packages_dir, name)
+            if not os.path.isdir(info_dir) or _dist_version(info_dir) != version:
+                return False
+        for directory, keep in ((site_packages(venv_path), baseline["site_packages"]),
+                                (_bin_dir(venv_path), baseline["bin"])):
+            keep = set(keep)
+            for name in os.listdir(directory):
+                if name in keep:
+                    continue
+                path = os.path.join(directory, name)
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+        return True
+
+    def release(self, venv_path):
+        """Resets an environment and returns it to the pool."""
+        with self._lock:
+            try:
+                clean = self.reset(venv_path)
+            except (OSError, KeyError, ValueError) as e:
+                display_console(f"Discarding pooled venv that failed to reset: {e}", "VenvPool", "red")
+                shutil.rmtree(venv_path, ignore_errors=True)
+                return
+            if not clean:
+                display_console(f"Baseline packages changed in {venv_path}; cloning it from the template again.",
+                                "VenvPool", "yellow")
+                template = os.path.join(os.path.dirname(os.path.dirname(venv_path)), "template")
+                staging = f"{venv_path}.{uuid.uuid4().hex[:8]}.tmp"
+                try:
+                    shutil.copytree(template, staging, symlinks=True)
+                    self._claim(staging)  # Stays checked out until the marker is removed below
+                    shutil.rmtree(venv_path, ignore_errors=True)
+                    os.rename(staging, venv_path)
+                except OSError as e:
+                    display_console(f"Discarding pooled venv that failed to re-clone: {e}", "VenvPool", "red")
+                    shutil.rmtree(staging, ignore_errors=True)
+                    shutil.rmtree(venv_path, ignore_errors=True)
+                    return
+
+            envs_dir = os.path.dirname(venv_path)
+            idle = [n for n in os.listdir(envs_dir)
+                    if not os.path.exists(os.path.join(envs_dir, n, CHECKOUT_FILE))]
+            if len(idle) >= self.max_idle:
+                shutil.rmtree(venv_path, ignore_errors=True)
+                return
+            os.remove(os.path.join(venv_path, CHECKOUT_FILE))
+
+    def prewarm(self, requirements=(), count=1):
+        """Builds the template and up to ``count`` idle environments ahead of time."""
+        paths = [self.checkout(requirements) for _ in range(count)]
+        for path in paths:
+            self.release(path)
@@ -1,14 +1,306 @@
 # utils/display.py
 
-from IPython.display import clear_output
-from rich.console import Console
-from rich.panel import Panel
+import atexit
+import contextvars
+import itertools
+import json
+import queue
+import sys
+import threading
 import time
 
+from agentic_toolset.config import DISPLAY_MODE, DISPLAY_DELAY, DISPLAY_QUEUE_SIZE, HEADLESS
+
+DISPLAY_MODES = ("rich", "plain", "json", "silent")
+
+
+class RichSink:
+    """Renders panels on a single shared Rich console."""
+
+    def __init__(self, stream=None):
+        from rich.console import Console
+        self.console = Console(file=stream)
+        self.clear_output = self._notebook_clear_output()
+
+    def _notebook_clear_output(self):
+        # Only clear cell output when running inside a Jupyter kernel
+        try:
+            from IPython import get_ipython
+            from IPython.display import clear_output
+        except ImportError:
+            return None
+        shell = get_ipython()
+        if shell is None or not hasattr(shell, "kernel"):
+            return None
+        return clear_output
+
+    def emit(self, event):
+        kind = event.get("kind", "panel")
+        color = event["color"]
+        if kind == "token":
+            self.console.print(event["text"], end="", style=color, markup=False, highlight=False)
+            return
+        if kind == "stream_end":
+            self.console.print()
+            self.console.rule(style=color)
+            return
+
+        if self.clear_output:
+            self.clear_output(wait=True)
+        title = f"[bold {color}]{event['title']}[/bold {color}]"
+        if kind == "stream_start":
+            self.console.rule(title, style=color)
+            return
+        from rich.panel import Panel
+        self.console.print(Panel(event["text"], title=title, border_style=color))
+
+
+class PlainSink:
+    """Writes '[title] text' lines, suitable for log files and CI output."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def emit(self, event):
+        kind = event.get("kind", "panel")
+        if kind == "stream_start":
+            self.stream.write(f"[{event['title']}] ")
+        elif kind == "token":
+            self.stream.write(event["text"])
+        elif kind == "stream_end":
+            self.stream.write("\n")
+        else:
+            self.stream.write(f"[{event['title']}] {event['text']}\n")
+        self.stream.flush()
+
+
+class JsonLinesSink:
+    """Writes one JSON object per event for machine consumption."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def emit(self, event):
+        self.stream.write(json.dumps(event) + "\n")
+        self.stream.flush()
+
+
+class SilentSink:
+    def emit(self, event):
+        pass
+
+
+SINKS = {
+    "rich": RichSink,
+    "plain": PlainSink,
+    "json": JsonLinesSink,
+    "silent": SilentSink,
+}
+
+
+class DisplayPipeline:
+    """Background writer that renders display events off the caller's thread.
+
+    Callers only ever enqueue; when the bounded queue is full the oldest
+    pending event is dropped so agents never wait on rendering.
+    """
+
+    def __init__(self, sink, max_queue=DISPLAY_QUEUE_SIZE, delay=DISPLAY_DELAY):
+        self.sink = sink
+        self.delay = delay
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, name="display-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, event):
+        if self._closed:
+            return
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _writer(self):
+        while True:
+            event = self._queue.get()
+            try:
+                if event is None:
+                    return
+                try:
+                    self.sink.emit(event)
+                except Exception as e:
+                    # Never let a bad render kill the writer thread
+                    sys.stderr.write(f"[{event.get('title')}] {event.get('text')} (display error: {e})\n")
+                if self.delay:
+                    time.sleep(self.delay)
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Blocks until every queued event has been rendered."""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+_pipeline = None
+_pipeline_lock = threading.RLock()
+# Callbacks that also receive the events of the current context, e.g. one daemon job
+_listeners = contextvars.ContextVar("display_listeners", default=())
+
+
+def configure_display(mode=None, delay=None, headless=None, stream=None):
+    """Replaces the active display pipeline.
+
+    Headless mode falls back to plain output (unless another non-rich mode
+    was requested) and removes any artificial delay.
+    """
+    global _pipeline
+    headless = HEADLESS if headless is None else headless
+    mode = mode or DISPLAY_MODE
+    delay = DISPLAY_DELAY if delay is None else delay
+    if headless:
+        delay = 0
+        if mode == "rich":
+            mode = "plain"
+    if mode not in SINKS:
+        raise ValueError(f"Unknown display mode '{mode}'. Choose from: {', '.join(DISPLAY_MODES)}")
+
+    sink = SINKS[mode]() if mode == "silent" else SINKS[mode](stream)
+    with _pipeline_lock:
+        old, _pipeline = _pipeline, DisplayPipeline(sink, delay=delay)
+    if old is not None:
+        old.close()
+    return _pipeline
+
+
+def get_display():
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                configure_display()
+    return _pipeline
+
+
+def flush_display():
+    if _pipeline is not None:
+        _pipeline.flush()
+
+
+def _submit(event):
+    for listener in _listeners.get():
+        try:
+            listener(event)
+        except Exception:
+            pass
+    get_display().submit(event)
+
+
+class display_listener:
+    """Context manager that also sends this context's display events to ``callback(event)``.
+
+    Threads started with a copy of the context (see ``TaskGraph``) report to
+    the same listener.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._token = None
+
+    def __enter__(self):
+        self._token = _listeners.set(_listeners.get() + (self.callback,))
+        return self
+
+    def __exit__(self, *exc):
+        _listeners.reset(self._token)
+
+
 def display_console(text, title="Agent Log", color="green"):
-    """Displays agent messages in a styled Rich console panel."""
-    clear_output(wait=True)
-    console = Console()
-    panel = Panel(text, title=f"[bold {color}]{title}[/bold {color}]", border_style=color)
-    console.print(panel)
-    time.sleep(1)  # Add delay for readability
+    """Queues an agent message for rendering as a styled console panel."""
+    _submit({
+        "kind": "panel",
+        "time": time.time(),
+        "title": title,
+        "color": color,
+        "text": "" if text is None else str(text),
+    })
+
+
+_stream_ids = itertools.count(1)
+
+
+class ConsoleStream:
+    """Incremental display of streamed text, e.g. LLM tokens.
+
+    Tokens are coalesced into chunks (on newline, size or age) before being
+    queued so a fast model does not flood the display queue.
+    """
+
+    def __init__(self, title, color="green", flush_chars=80, flush_interval=0.05):
+        self.title = title
+        self.color = color
+        self.flush_chars = flush_chars
+        self.flush_interval = flush_interval
+        self.stream_id = next(_stream_ids)
+        self._buffer = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        self.closed = False
+        self._submit("stream_start", "")
+
+    def _submit(self, kind, text):
+        _submit({
+            "kind": kind,
+            "stream": self.stream_id,
+            "time": time.time(),
+            "title": self.title,
+            "color": self.color,
+            "text": text,
+        })
+
+    def write(self, text):
+        if self.closed or not text:
+            return
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if ("\n" in text or self._buffered >= self.flush_chars
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._submit("token", "".join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self._submit("stream_end", "")
+        self.closed = True
+
+
+def stream_console(title="Agent Log", color="green"):
+    """Opens a ConsoleStream; call write() per token and close() when done."""
+    return ConsoleStream(title, color)
+
+
+atexit.register(flush_display)
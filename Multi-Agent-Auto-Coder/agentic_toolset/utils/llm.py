@@ -0,0 +1,138 @@
+# utils/llm.py
+
+import httpx
+from ollama import ResponseError
+
+from agentic_toolset.config import STREAM_RESPONSES
+from agentic_toolset.core.llm_client import to_llm_error
+from agentic_toolset.utils.display import display_console, stream_console
+from agentic_toolset.utils.tracing import span
+
+FENCE = "```"
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token) for budgeting prompts."""
+    return len(text) // 4 + 1
+
+
+USAGE_KEYS = ("prompt_eval_count", "eval_count", "eval_duration", "load_duration")
+
+
+def _record_usage(usage, response):
+    for key in USAGE_KEYS:
+        try:
+            value = response.get(key)
+        except AttributeError:
+            value = None
+        if value:
+            usage[key] = usage.get(key, 0) + value
+
+
+def chat_text(client, model, messages, title=None, color="green", stream=None, stop_when=None, usage=None,
+              agent=None, cancelled=None, **kwargs):
+    """Runs a chat completion and returns the response text.
+
+    When streaming, tokens are shown on the display as they arrive and
+    ``stop_when(partial_text)`` is checked after every chunk; once it returns
+    True the stream is closed, which ends generation on the server, and the
+    text so far counts as the complete answer (a caching client stores it).
+    Setting the ``cancelled`` event also closes the stream, but the partial
+    text is never treated as an answer.
+    Without streaming the full response is shown as a single panel.
+    If a ``usage`` dict is passed, the server's prompt_eval_count and
+    eval_count are added to it. Every call is traced under ``agent``.
+    Client failures are raised as ``LLMError`` subclasses.
+    """
+    stream = STREAM_RESPONSES if stream is None else stream
+    call_usage = {}
+
+    with span("chat", "llm", agent=agent, model=model, stream=stream) as call:
+        try:
+            response_text = _chat(client, model, messages, title, color, stream, stop_when, cancelled, call, call_usage,
+                                  **kwargs)
+        except (ResponseError, ConnectionError, httpx.HTTPError) as e:
+            raise to_llm_error(e) from e
+        call.set(**call_usage)
+
+    if usage is not None:
+        for key, value in call_usage.items():
+            usage[key] = usage.get(key, 0) + value
+    if title and not stream:
+        display_console(response_text, title, color)
+    return response_text
+
+
+def _chat(client, model, messages, title, color, stream, stop_when, cancelled, call, call_usage, **kwargs):
+    if not stream:
+        response = client.chat(model=model, messages=messages, **kwargs)
+        call.mark_first_token()
+        _record_usage(call_usage, response)
+        return response['message']['content']
+
+    response_text, stopped_early = _stream_chat(
+        client, model, messages, title, color, stop_when, cancelled, call, call_usage, **kwargs
+    )
+    if stopped_early:
+        # The final chunk carrying token counts never arrives; estimate them
+        call_usage["prompt_eval_count"] = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+        call_usage["eval_count"] = estimate_tokens(response_text)
+        call.set(stopped_early=True)
+    return response_text
+
+
+def _stream_chat(client, model, messages, title, color, stop_when, cancelled, call, call_usage, **kwargs):
+    chunks = client.chat(model=model, messages=messages, stream=True, **kwargs)
+    console = stream_console(title, color) if title else None
+    parts = []
+    try:
+        for chunk in chunks:
+            _record_usage(call_usage, chunk)
+            token = chunk['message']['content']
+            if not token:
+                continue
+            call.mark_first_token()
+            parts.append(token)
+            if console:
+                console.write(token)
+            if cancelled is not None and cancelled.is_set():
+                return "".join(parts), True
+            if stop_when and stop_when("".join(parts)):
+                if hasattr(chunks, "complete"):
+                    chunks.complete()
+                return "".join(parts), True
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+        if console:
+            console.close()
+    return "".join(parts), False
+
+
+def _fence_lines(text):
+    return [i for i, line in enumerate(text.splitlines()) if line.strip().startswith(FENCE)]
+
+
+def code_block_complete(text):
+    """True once ``text`` contains at least one opened and closed code fence."""
+    return len(_fence_lines(text)) >= 2
+
+
+def code_blocks_complete(count):
+    """Stop condition that waits for ``count`` closed code blocks, e.g. one per project file."""
+    return lambda text: len(_fence_lines(text)) >= 2 * count
+
+
+def extract_code_block(text):
+    """Returns the body of the first fenced code block in ``text``.
+
+    Works on partial output: an unterminated fence yields everything after
+    it. Text without any fence is returned unchanged.
+    """
+    lines = text.splitlines()
+    fences = _fence_lines(text)
+    if not fences:
+        return text
+    start = fences[0] + 1
+    end = fences[1] if len(fences) > 1 else len(lines)
+    return "\n".join(lines[start:end])
@@ -0,0 +1,155 @@
+# utils/tracing.py
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from agentic_toolset.utils.display import display_console
+
+MAX_SPANS = 100000
+
+
+class Span:
+    def __init__(self, name, category, attrs):
+        self.name = name
+        self.category = category
+        self.attrs = dict(attrs)
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.end = None
+        self.first_token = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def mark_first_token(self):
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+
+    @property
+    def duration(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    @property
+    def time_to_first_token(self):
+        return None if self.first_token is None else self.first_token - self.start
+
+
+class Tracer:
+    """Collects timed spans for LLM calls, subprocesses and file writes.
+
+    Spans can be exported as a Chrome trace (``chrome://tracing`` / Perfetto)
+    and summarised per agent and model.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, category, **attrs):
+        span = Span(name, category, attrs)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.end = time.perf_counter()
+            with self._lock:
+                if len(self.spans) < MAX_SPANS:
+                    self.spans.append(span)
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+            self.origin = time.perf_counter()
+
+    def chrome_trace(self):
+        pid = os.getpid()
+        events = []
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            args = dict(span.attrs)
+            if span.time_to_first_token is not None:
+                args["time_to_first_token_ms"] = round(span.time_to_first_token * 1000, 3)
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1e6, 1),
+                "dur": round(span.duration * 1e6, 1),
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        return path
+
+    def llm_summary(self):
+        """Aggregates LLM spans by (agent, model)."""
+        rows = defaultdict(lambda: {"calls": 0, "wall": 0.0, "ttft": [], "prompt_tokens": 0,
+                                    "completion_tokens": 0, "eval_seconds": 0.0})
+        with self._lock:
+            spans = [s for s in self.spans if s.category == "llm"]
+        for span in spans:
+            row = rows[(span.attrs.get("agent") or "-", span.attrs.get("model") or "-")]
+            row["calls"] += 1
+            row["wall"] += span.duration
+            if span.time_to_first_token is not None:
+                row["ttft"].append(span.time_to_first_token)
+            row["prompt_tokens"] += span.attrs.get("prompt_eval_count") or 0
+            completion = span.attrs.get("eval_count") or 0
+            row["completion_tokens"] += completion
+            # Prefer the server's own generation time; fall back to wall time after the first token
+            eval_ns = span.attrs.get("eval_duration")
+            if eval_ns:
+                row["eval_seconds"] += eval_ns / 1e9
+            elif completion:
+                row["eval_seconds"] += span.duration - (span.time_to_first_token or 0)
+        return rows
+
+    def category_summary(self):
+        totals = defaultdict(lambda: [0, 0.0])
+        with self._lock:
+            spans = [s for s in self.spans if s.category != "llm"]
+        for span in spans:
+            totals[(span.category, span.name)][0] += 1
+            totals[(span.category, span.name)][1] += span.duration
+        return totals
+
+    def summary_table(self):
+        lines = [f"{'Agent':<14}{'Model':<22}{'Calls':>6}{'Wall s':>9}{'TTFT s':>8}"
+                 f"{'Prompt':>9}{'Compl.':>8}{'Tok/s':>8}"]
+        for (agent, model), row in sorted(self.llm_summary().items()):
+            ttft = sum(row["ttft"]) / len(row["ttft"]) if row["ttft"] else 0.0
+            rate = row["completion_tokens"] / row["eval_seconds"] if row["eval_seconds"] else 0.0
+            lines.append(f"{agent[:13]:<14}{model[:21]:<22}{row['calls']:>6}{row['wall']:>9.2f}{ttft:>8.2f}"
+                         f"{row['prompt_tokens']:>9}{row['completion_tokens']:>8}{rate:>8.1f}")
+        other = self.category_summary()
+        if other:
+            lines.append("")
+            lines.append(f"{'Category':<14}{'Operation':<28}{'Count':>6}{'Total s':>9}")
+            for (category, name), (count, total) in sorted(other.items()):
+                lines.append(f"{category[:13]:<14}{name[:27]:<28}{count:>6}{total:>9.2f}")
+        return "\n".join(lines)
+
+    def display_summary(self):
+        display_console(self.summary_table(), "Run Timings", "blue")
+
+
+tracer = Tracer()
+
+
+def span(name, category, **attrs):
+    """Times a block on the global tracer: ``with span("pip install", "subprocess"):``."""
+    return tracer.span(name, category, **attrs)
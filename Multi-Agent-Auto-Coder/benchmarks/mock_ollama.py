@@ -0,0 +1,255 @@
+# benchmarks/mock_ollama.py
+
+"""Deterministic stand-in for the Ollama HTTP API.
+
+Serves scripted chat responses with configurable latency so the pipeline
+can be benchmarked without a GPU or network access. A scenario file holds
+an ordered list of rules; the first rule whose ``match`` substrings all
+appear in the request's messages answers it. Requests with a ``format``
+(structured output) get the rule's ``json`` value when it has one.
+Embedding requests get a hashed bag-of-words vector, so texts that share
+words are similar and identical texts match exactly.
+
+Run standalone with:  python benchmarks/mock_ollama.py --scenario benchmarks/scenario.json
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import threading
+from collections import deque
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RESPONSE = "OK."
+EMBED_DIM = 64
+
+
+def embed_text(text, dim=EMBED_DIM):
+    vector = [0.0] * dim
+    for word in re.findall(r"[a-z0-9_]+", text.lower()):
+        digest = int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16)
+        vector[digest % dim] += 1.0 if digest & (1 << 64) else -1.0
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class Scenario:
+    def __init__(self, rules, default=DEFAULT_RESPONSE):
+        self.rules = rules
+        self.default = default
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data.get("rules", []), data.get("default", DEFAULT_RESPONSE))
+
+    def respond(self, messages, structured=False):
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        for rule in self.rules:
+            match = rule["match"] if isinstance(rule["match"], list) else [rule["match"]]
+            if all(m in prompt for m in match):
+                if structured and "json" in rule:
+                    return json.dumps(rule["json"])
+                return rule["response"]
+        return self.default
+
+
+class MockOllama:
+    """Threaded HTTP server implementing /api/chat, /api/ps and /api/tags.
+
+    ``latency`` is paid once per request before the first token,
+    ``token_latency`` per streamed chunk, and ``load_latency`` whenever a
+    request names a different model than the previous one (a model swap).
+    Like Ollama with room for one model, requests are admitted in arrival
+    order and a swap waits until requests for the loaded model have finished,
+    so interleaved models thrash.
+    """
+
+    def __init__(self, scenario, host="127.0.0.1", port=0, latency=0.0, token_latency=0.0, load_latency=0.0):
+        self.scenario = scenario
+        self.latency = latency
+        self.token_latency = token_latency
+        self.load_latency = load_latency
+        self.requests = 0
+        self.model_swaps = 0
+        self.loaded_model = None
+        self.active = 0
+        self._queue = deque()
+        self._lock = threading.Condition()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _load(self, model):
+        with self._lock:
+            self.requests += 1
+            ticket = object()
+            self._queue.append(ticket)
+            while self._queue[0] is not ticket or (self.loaded_model not in (None, model) and self.active):
+                self._lock.wait()
+            self._queue.popleft()
+            self._lock.notify_all()
+            load = self.loaded_model != model
+            if load and self.loaded_model is not None:
+                self.model_swaps += 1
+            self.loaded_model = model
+            self.active += 1
+            if load and self.load_latency:
+                # Loading blocks the server, as it does on a single GPU
+                time.sleep(self.load_latency)
+                return self.load_latency
+        return 0.0
+
+    def _done(self):
+        with self._lock:
+            self.active -= 1
+            self._lock.notify_all()
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/api/ps":
+                    models = [{"name": mock.loaded_model, "model": mock.loaded_model}] if mock.loaded_model else []
+                    self._send_json({"models": models})
+                elif self.path == "/api/tags":
+                    self._send_json({"models": []})
+                else:
+                    self._send_json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/chat":
+                    self._chat(request)
+                elif self.path == "/api/embed":
+                    texts = request.get("input", "")
+                    texts = [texts] if isinstance(texts, str) else texts
+                    self._send_json({"model": request.get("model", ""), "embeddings": [embed_text(t) for t in texts]})
+                else:
+                    self._send_json({"error": "not found"}, 404)
+
+            def _chat(self, request):
+                model = request.get("model", "")
+                load_seconds = mock._load(model)
+                try:
+                    self._respond(request, model, load_seconds)
+                finally:
+                    mock._done()
+
+            def _respond(self, request, model, load_seconds):
+                text = mock.scenario.respond(request.get("messages", []), structured=bool(request.get("format")))
+                if mock.latency:
+                    time.sleep(mock.latency)
+                prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in request.get("messages", []))
+                tokens = list(_chunks(text))
+                final = {
+                    "model": model,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "done": True,
+                    "done_reason": "stop",
+                    "load_duration": int(load_seconds * 1e9),
+                    "prompt_eval_count": prompt_tokens,
+                    "eval_count": len(tokens),
+                    "eval_duration": int(len(tokens) * mock.token_latency * 1e9),
+                }
+
+                if not request.get("stream", True):
+                    time.sleep(mock.token_latency * len(tokens))
+                    self._send_json(dict(final, message={"role": "assistant", "content": text}))
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for piece in tokens:
+                        if mock.token_latency:
+                            time.sleep(mock.token_latency)
+                        self._write_chunk({
+                            "model": model,
+                            "created_at": final["created_at"],
+                            "message": {"role": "assistant", "content": piece},
+                            "done": False,
+                        })
+                    self._write_chunk(dict(final, message={"role": "assistant", "content": ""}))
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading early (e.g. a complete code block arrived)
+                    self.close_connection = True
+
+            def _write_chunk(self, payload):
+                data = (json.dumps(payload) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def _chunks(text):
+    """Splits text into word-sized pieces that join back to the original."""
+    piece = ""
+    for char in text:
+        piece += char
+        if char in " \n":
+            yield piece
+            piece = ""
+    if piece:
+        yield piece
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scripted mock of the Ollama chat API.")
+    parser.add_argument("--scenario", required=True, help="Scenario JSON file with response rules.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before the first token.")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds per streamed token.")
+    parser.add_argument("--load-latency", type=float, default=0.0, help="Seconds to 'load' a different model.")
+    args = parser.parse_args()
+
+    mock = MockOllama(Scenario.load(args.scenario), args.host, args.port,
+                      args.latency, args.token_latency, args.load_latency)
+    print(f"Mock Ollama listening on {mock.url}")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
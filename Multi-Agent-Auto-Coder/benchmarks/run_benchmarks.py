@@ -0,0 +1,212 @@
+# benchmarks/run_benchmarks.py
+
+"""Offline end-to-end benchmark of ProjectManager.manage_task.
+
+Starts the mock Ollama server, runs every objective in the scenario through
+the real pipeline (scaffolding, pooled venv, sandboxed execution, repair
+loop) and reports where the time went. Results are compared against a
+stored baseline so performance changes can be measured on a laptop.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --latency 0.2 --token-latency 0.01
+    python benchmarks/run_benchmarks.py --update-baseline
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agentic_toolset.core.llm_client import PooledClient
+from agentic_toolset.core.model_scheduler import ModelScheduler
+from agentic_toolset.core.project_manager import build_project_manager
+from agentic_toolset.core.venv_manager import VenvManagerAgent
+from agentic_toolset.core.venv_pool import VenvPool
+from agentic_toolset.utils.display import configure_display, flush_display, DISPLAY_MODES
+from agentic_toolset.utils.tracing import tracer
+from mock_ollama import MockOllama, Scenario
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCENARIO = os.path.join(BENCH_DIR, "scenario.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Metrics where larger is worse; timings get the relative tolerance plus a small absolute slack
+TIMING_METRICS = ("total_s", "llm_s", "venv_s", "execution_s", "orchestration_overhead_s")
+COUNT_METRICS = ("llm_calls", "iterations", "fix_attempts", "model_swaps")
+VENV_SPANS = ("venv checkout", "create venv", "ensurepip", "pip install", "pip install (wheel cache)", "pip wheel",
+              "import probe")
+# Distinct model per role for --multi-model, to measure swapping
+MULTI_MODEL_ROLES = {
+    "orchestrator": "mock-orchestrator",
+    "reviewer": "mock-reviewer",
+    "bugfixer": "mock-bugfixer",
+    "coder": "mock-coder",
+}
+
+
+def _peak_rss_mb(who):
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _assign_models(project_manager):
+    project_manager.orchestrator_model = MULTI_MODEL_ROLES["orchestrator"]
+    project_manager.code_reviewer.reviewer_model = MULTI_MODEL_ROLES["reviewer"]
+    project_manager.code_reviewer.bugfixer_model = MULTI_MODEL_ROLES["bugfixer"]
+    project_manager.coder.coder_model = MULTI_MODEL_ROLES["coder"]
+
+
+def measure(objective, client, pool, projects_root, mock, multi_model=False):
+    tracer.reset()
+    venv_manager = VenvManagerAgent(pool=pool)
+    # Memory would let repeated runs reuse the first run's solution
+    project_manager = build_project_manager(lambda agent: client, venv_manager,
+                                            projects_root=projects_root, base_libraries=[], memory=False)
+    if multi_model:
+        _assign_models(project_manager)
+    swaps_before = mock.model_swaps
+    started = time.perf_counter()
+    try:
+        output = project_manager.manage_task(objective)
+        status = "ok" if output is not None else "failed"
+    except Exception as e:
+        output, status = str(e), "error"
+    finally:
+        venv_manager.cleanup()
+    total = time.perf_counter() - started
+
+    spans = list(tracer.spans)
+    llm = sum(s.duration for s in spans if s.category == "llm")
+    venv = sum(s.duration for s in spans if s.name in VENV_SPANS)
+    execution = sum(s.duration for s in spans if s.name == "run script")
+    script_rss = max((a.get("peak_rss_kb") or 0 for a in project_manager.repair_attempts), default=0)
+    return {
+        "status": status,
+        "total_s": round(total, 4),
+        "llm_s": round(llm, 4),
+        "venv_s": round(venv, 4),
+        "execution_s": round(execution, 4),
+        "orchestration_overhead_s": round(max(0.0, total - llm - venv - execution), 4),
+        "llm_calls": sum(1 for s in spans if s.category == "llm"),
+        "iterations": len(project_manager.task_log) + 1,
+        "fix_attempts": max(0, len(project_manager.repair_attempts) - 1),
+        "model_swaps": mock.model_swaps - swaps_before,
+        "script_peak_rss_mb": round(script_rss / 1024, 1),
+    }
+
+
+def compare(results, baseline, tolerance, slack):
+    regressions = []
+    for objective_id, metrics in results.items():
+        base = baseline.get(objective_id)
+        if not base:
+            continue
+        for metric in TIMING_METRICS:
+            if metric in base and metrics[metric] > base[metric] * (1 + tolerance) + slack:
+                regressions.append(f"{objective_id}.{metric}: {metrics[metric]:.3f}s vs baseline {base[metric]:.3f}s")
+        for metric in COUNT_METRICS:
+            if metric in base and metrics[metric] > base[metric]:
+                regressions.append(f"{objective_id}.{metric}: {metrics[metric]} vs baseline {base[metric]}")
+        if base.get("status") == "ok" and metrics["status"] != "ok":
+            regressions.append(f"{objective_id}.status: {metrics['status']} (baseline ok)")
+    return regressions
+
+
+def print_table(results, baseline):
+    header = (f"{'Objective':<14}{'Status':<8}{'Total':>8}{'LLM':>8}{'Venv':>8}{'Exec':>8}"
+              f"{'Overhead':>10}{'Calls':>6}{'Iter':>5}{'Fixes':>6}{'Swaps':>6}{'vs base':>9}")
+    print(header)
+    print("-" * len(header))
+    for objective_id, m in results.items():
+        base = baseline.get(objective_id, {}).get("total_s")
+        delta = f"{(m['total_s'] / base - 1) * 100:+.0f}%" if base else "n/a"
+        print(f"{objective_id:<14}{m['status']:<8}{m['total_s']:>8.3f}{m['llm_s']:>8.3f}{m['venv_s']:>8.3f}"
+              f"{m['execution_s']:>8.3f}{m['orchestration_overhead_s']:>10.3f}{m['llm_calls']:>6}"
+              f"{m['iterations']:>5}{m['fix_attempts']:>6}{m.get('model_swaps', 0):>6}{delta:>9}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the agent pipeline against a mock LLM.")
+    parser.add_argument("--scenario", default=DEFAULT_SCENARIO, help="Scenario JSON with objectives and responses.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against.")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run.")
+    parser.add_argument("--output", help="Also write the results as JSON to this path.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per objective; the fastest is kept.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock seconds before the first token.")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Mock seconds per streamed token.")
+    parser.add_argument("--load-latency", type=float, default=0.0, help="Mock seconds per model swap.")
+    parser.add_argument("--multi-model", action="store_true", help="Give each agent role its own model.")
+    parser.add_argument("--no-scheduler", action="store_true", help="Bypass the model residency scheduler.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before flagging.")
+    parser.add_argument("--slack", type=float, default=0.05, help="Allowed absolute slowdown in seconds.")
+    parser.add_argument("--display", choices=DISPLAY_MODES, default="silent", help="Pipeline output sink.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    configure_display(mode=args.display, headless=True)
+
+    with open(args.scenario) as f:
+        objectives = json.load(f)["objectives"]
+    mock = MockOllama(Scenario.load(args.scenario), latency=args.latency,
+                      token_latency=args.token_latency, load_latency=args.load_latency).start()
+    client = PooledClient([mock.url])
+    scheduled = client if args.no_scheduler else ModelScheduler(client)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="agentic_bench_") as workdir:
+        pool = VenvPool(root=os.path.join(workdir, "venv_pool"), wheel_cache=None)
+        pool.prewarm([], count=1)  # Measure warm runs, not the one-off template build
+        projects_root = os.path.join(workdir, "Projects")
+        for item in objectives:
+            runs = [measure(item["objective"], scheduled, pool, projects_root, mock, args.multi_model)
+                    for _ in range(max(1, args.repeat))]
+            results[item["id"]] = min(runs, key=lambda m: m["total_s"])
+    client.close()
+    mock.stop()
+    flush_display()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", {})
+
+    print_table(results, baseline)
+    print(f"\nMock requests: {mock.requests} | Model swaps: {mock.model_swaps} | "
+          f"Harness peak RSS: {_peak_rss_mb(resource.RUSAGE_SELF):.1f} MB | "
+          f"Children peak RSS: {_peak_rss_mb(resource.RUSAGE_CHILDREN):.1f} MB")
+
+    report = {
+        "settings": {"latency": args.latency, "token_latency": args.token_latency,
+                     "load_latency": args.load_latency, "multi_model": args.multi_model,
+                     "scheduler": not args.no_scheduler, "python": sys.version.split()[0]},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.slack)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,23 @@
 # main.py
 
 import argparse
-from agentic_toolset.config import OLLAMA_HOST
+import os
+import time
+from agentic_toolset.config import (
+    LLM_CACHE_ENABLED, LLM_CACHE_EXCLUDE, VENV_POOL_ENABLED, MODEL_SCHEDULER_ENABLED, DAEMON_HOST, DAEMON_PORT,
+    DAEMON_PREWARM
+)
 from agentic_toolset.core.venv_manager import VenvManagerAgent
-from agentic_toolset.core.project_manager import ProjectManager
-from agentic_toolset.agents.overseer import OverseerAgent
-from agentic_toolset.agents.architect import ArchitectAgent
-from agentic_toolset.agents.reviewer import CodeReviewerAgent
-from agentic_toolset.agents.consultant import ConsultantAgent
-from agentic_toolset.agents.coder import CoderAgent
-from agentic_toolset.utils.display import display_console
-
-from ollama import Client
+from agentic_toolset.core.venv_pool import VenvPool
+from agentic_toolset.core.project_manager import build_project_manager, BASE_LIBRARIES
+from agentic_toolset.core.llm_cache import ResponseCache, CachedClient
+from agentic_toolset.core.llm_client import PooledClient
+from agentic_toolset.core.model_scheduler import ModelScheduler
+from agentic_toolset.core.batch import BatchScheduler, load_objectives
+from agentic_toolset.core.checkpoint import find_checkpoint
+from agentic_toolset.core.daemon import AgentDaemon, serve
+from agentic_toolset.utils.display import display_console, configure_display, DISPLAY_MODES
+from agentic_toolset.utils.tracing import tracer
 
 
 def parse_args():
@@ -21,6 +27,42 @@ def parse_args():
         type=str,
         help="Describe the coding task or project objective.",
     )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        metavar="OBJECTIVES_JSONL",
+        help="Run every objective in a JSON lines file in parallel.",
+    )
+    parser.add_argument(
+        "--batch-output",
+        type=str,
+        default="batch_results.jsonl",
+        help="Where batch mode writes per-objective results (JSON lines).",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a daemon that takes jobs over a local HTTP API, keeping clients and venvs warm.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DAEMON_PORT,
+        help="Port for --serve (on DAEMON_HOST, localhost by default).",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        metavar="PATH",
+        help="Serve on a Unix socket instead of TCP.",
+    )
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const="",
+        metavar="PROJECT",
+        help="Continue an interrupted run from its checkpoint (a project name or directory; default: the latest).",
+    )
     parser.add_argument(
         "--no-cleanup",
         action="store_true",
@@ -31,33 +73,145 @@ def parse_args():
         action="store_true",
         help="Don't execute generated code; just display it.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the model instead of reusing cached responses.",
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        metavar="TRACE_JSON",
+        help="Write a Chrome trace (chrome://tracing, Perfetto) of LLM calls, subprocesses and file writes.",
+    )
+    parser.add_argument(
+        "--display",
+        choices=DISPLAY_MODES,
+        help="Output sink: rich panels, plain text, JSON lines, or silent.",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="CI mode: plain output and no artificial display delay.",
+    )
     return parser.parse_args()
 
 
 def main():
     args = parse_args()
+    configure_display(mode=args.display, headless=args.headless or None)
+
+    client = PooledClient()
+    scheduler = ModelScheduler(client) if MODEL_SCHEDULER_ENABLED else None
+    cache = ResponseCache() if LLM_CACHE_ENABLED and not args.no_cache else None
+
+    def client_for(agent_name):
+        # Cache hits never reach the scheduler, so they don't hold up other models
+        scheduled = scheduler or client
+        if cache is None or agent_name in LLM_CACHE_EXCLUDE:
+            return scheduled
+        return CachedClient(scheduled, cache)
+
+    def runtime_stats():
+        stats = {"llm_hosts": client.stats()}
+        if scheduler is not None:
+            stats["model_scheduler"] = scheduler.stats()
+        if cache is not None:
+            stats["llm_cache"] = cache.stats()
+        return stats
 
-    client = Client(host=OLLAMA_HOST)
-    venv_manager = VenvManagerAgent()
-
-    overseer = OverseerAgent(client)
-    architect = ArchitectAgent()
-    reviewer = CodeReviewerAgent(client)
-    consultant = ConsultantAgent(client)
-    coder = CoderAgent(client)
-
-    project_manager = ProjectManager(
-        client=client,
-        overseer=overseer,
-        architect=architect,
-        code_reviewer=reviewer,
-        venv_manager=venv_manager,
-        consultant=consultant,
-        coder=coder
+    try:
+        if args.serve:
+            run_daemon(args, client_for, runtime_stats)
+        elif args.batch:
+            run_batch(args, client_for)
+        else:
+            run_single(args, client_for)
+
+    finally:
+        tracer.display_summary()
+        if args.trace:
+            display_console(f"Trace written to: {tracer.export(args.trace)}", "Trace", "blue")
+        if cache is not None:
+            stats = cache.stats()
+            display_console(
+                f"Hits: {stats['hits']} (disk: {stats['disk_hits']}) | Misses: {stats['misses']} | "
+                f"Hit rate: {stats['hit_rate']:.0%}",
+                "LLM Cache", "blue"
+            )
+            cache.close()
+        if scheduler is not None:
+            scheduler.report()
+        if len(client.hosts) > 1 or any(h["failures"] for h in client.stats()):
+            display_console(
+                "\n".join(f"{h['host']}: {h['state']}, {h['requests']} requests, {h['failures']} failed, "
+                          f"avg {h['latency']:.1f}s" for h in client.stats()),
+                "LLM Hosts", "blue"
+            )
+        client.close()
+
+
+def run_daemon(args, client_for, stats):
+    pool = VenvPool() if VENV_POOL_ENABLED else None
+    if pool is not None and DAEMON_PREWARM:
+        # Build the base venvs now so the first jobs don't pay for them
+        pool.prewarm(BASE_LIBRARIES, count=DAEMON_PREWARM)
+
+    daemon = AgentDaemon(
+        client_for,
+        output_root=os.path.join("Projects", "daemon"),
+        venv_pool=pool,
+        stats=stats,
+        dry_run=args.dry_run,
+        cleanup=not args.no_cleanup
     )
+    server = serve(daemon, DAEMON_HOST, args.port, args.socket)
+    daemon.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        display_console("Shutting down; waiting for running jobs to finish...", "Daemon", "yellow")
+    finally:
+        server.server_close()
+        daemon.shutdown()
+
+
+def run_batch(args, client_for):
+    jobs = load_objectives(args.batch)
+    if not jobs:
+        print("⚠️ No objectives found in batch file. Exiting.")
+        return
 
-    # 🔽 Objective input
-    objective = args.objective or input("🧠 What is your project goal or coding task? > ").strip()
+    output_root = os.path.join("Projects", time.strftime("batch_%Y%m%d_%H%M%S"))
+    scheduler = BatchScheduler(
+        client_for,
+        output_root=output_root,
+        results_path=args.batch_output,
+        dry_run=args.dry_run,
+        cleanup=not args.no_cleanup,
+        venv_pool=VenvPool() if VENV_POOL_ENABLED else None
+    )
+    scheduler.run(jobs)
+
+
+def run_single(args, client_for):
+    venv_manager = VenvManagerAgent(pool=VenvPool() if VENV_POOL_ENABLED else None)
+    project_manager = build_project_manager(client_for, venv_manager)
+
+    # 🔽 Objective input, or the checkpoint of an earlier run
+    resume = None
+    if args.resume is not None:
+        store = find_checkpoint(args.resume, project_manager.projects_root)
+        resume = store.load() if store else None
+        if resume is None:
+            print("⚠️ No resumable run found. Exiting.")
+            return
+        if resume.get("status") == "completed":
+            print(f"✅ {store.project_dir} already completed. Nothing to resume.")
+            return
+        objective = resume["objective"]
+    else:
+        objective = args.objective or input("🧠 What is your project goal or coding task? > ").strip()
 
     if not objective:
         print("⚠️ No objective provided. Exiting.")
@@ -65,7 +219,7 @@ def main():
 
     # 🔽 Run the project workflow
     try:
-        final_output = project_manager.manage_task(objective, dry_run=args.dry_run)
+        final_output = project_manager.manage_task(objective, dry_run=args.dry_run, resume=resume)
 
         if args.dry_run:
             display_console("Dry run mode enabled. Code generated, not executed.", "Dry Run", "yellow")
@@ -74,11 +228,17 @@ def main():
 
         if args.no_cleanup:
             display_console("Skipping venv cleanup (--no-cleanup set).", "Cleanup", "yellow")
+        elif final_output is None and venv_manager.pool is None:
+            # A pooled venv is rebuilt cheaply on resume; a private one is kept as is
+            display_console("Keeping the venv so the run can be continued with --resume.", "Cleanup", "yellow")
         else:
             venv_manager.cleanup()
 
     except Exception as e:
         display_console(f"An error occurred:\n{str(e)}", "Fatal Error", "red")
+        if project_manager.checkpoint is not None:
+            display_console(f"Progress is saved; continue with: --resume {project_manager.output_dir}",
+                            "Checkpoint", "yellow")
 
 
 if __name__ == "__main__":